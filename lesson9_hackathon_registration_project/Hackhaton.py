@@ -1,55 +1,28 @@
-import json 
-import os
+import storage
+from credentials import get_admin_store  # the admins of every app share one store
+from fuzzy_names import compact, find_similar
+from menus import read_choice, run_menus
+from models import Participant
+from record_cache import get_record_cache
+from team_keys import (  # noqa: F401  re-exported for the API server
+    contact_key, member_key, name_grams, name_key, participant_keys, team_contact, team_key, team_members,
+)
+from text_folding import normalize_name
+from validation import is_valid_email, is_valid_team_size, max_team_size, min_team_size
 
 print("Hello World")
 
-admin_login = "admin01"
-admin_password = "1111"
+participants_file = "participants.json"  # or "participants.jsonl" / "hackathon.db" after converting the data
+page_size = 10  # teams shown at once in the admin menu
 
 
-class JsonManager:
+class JsonManager(storage.JsonManager):
     """
-    This class is applied to manage working with json files
+    This class is applied to manage working with the participants file
     """
 
-    def __init__(self, file_name) -> None:
-        self.file_name = file_name
+    index_keys = participant_keys
 
-
-    def check_existance(self):
-        """
-        This method checks the existance of the file and if the file is not empty
-        """
-        return os.path.exists(self.file_name) and os.path.getsize(self.file_name) != 0
-
-
-    def read_file(self):
-        """
-        This method reads the data of the file
-        """
-        if self.check_existance():
-                with open(self.file_name, mode="r") as file:
-                    return json.load(file)
-        return []
-        
-
-    def write_file(self, all_data):
-        """
-        This method writes all data into the file
-        """
-        with open(self.file_name, mode= "w") as file:
-            json.dump(all_data, file, indent=4)
-            return "Data is written to a file"
-
-
-    def add_onedata_to_file(self, data: dict):
-        """
-        This method writes one given data into the the file
-        """
-        all_data = self.read_file()
-        all_data.append(data)
-        return self.write_file(all_data)
-    
     def get_all_participants(self):
         """
         This method retrieves all participants from the file
@@ -57,51 +30,44 @@ class JsonManager:
         return self.read_file()
     
     def removing_participants(self, team_name):
-        all_data = self.read_file()
-        updated_data = []
+        """
+        This method removes a team by its name using the indexed record cache
+        """
+        if self.remove_where('Team_name', team_name):
+            return True
+        print("There is no such team in the list. Please try again later.")
+        return False
 
-        for participant in all_data:
-            if participant.get('Team_name') != team_name:
-                updated_data.append(participant)
 
-        if len(updated_data) < len(all_data):
-            self.write_file(updated_data)
-            return True
-        else:
-            print("There is no such team in the list. Please try again later.")
-            return False
-
-
-class Participant(JsonManager):
-    """
-    This class is applied to manage participant info
-
-    Attributes:
-        - full_name (str): gets full name of the group leader
-        - contact (str): gets a contact of the group leader
-        - team_name (str): gets a team name
-        - file_name (json): inherits file_name attribute from JsonManager class.
-    """
-    def __init__(self, full_name, contact, team_name, file_name="participants.json"):
-        super().__init__(file_name)
-        self.full_name = full_name
-        self.contact = contact
-        self.team_name = team_name
-        self.participants = []
-
-    def add_team_member(self, member_name):
-        """This method is used to add other team members to the list"""
-        self.participants.append(member_name)
-
-    def formatting_team(self):
-        """This method is used to format input data in dict format"""
-        return {
-            'Leader_name': self.full_name,
-            'Leader_contact': self.contact,
-            'Team_name': self.team_name,
-            'Other_participants': self.participants
-        }
-    
+def get_json_manager(file_name=None):
+    """
+    This function returns the storage manager that matches the file extension
+    (.jsonl - JSON Lines, .db - SQLite, anything else - JsonManager)
+    """
+    return storage.get_manager(file_name or participants_file, table="participants", manager_class=JsonManager)
+
+
+def get_participants_cache():
+    """
+    This function returns the in-memory indexed cache of all teams
+    """
+    return get_record_cache(get_json_manager(), participant_keys)
+
+
+def find_member_team(name):
+    """
+    This function returns the team a person is in (by normalized name) or None
+    """
+    found = get_participants_cache().find('member', normalize_name(name))
+    return found[0] if found else None
+
+
+def find_similar_teams(team_name, limit=5):
+    """
+    This function returns up to limit (score, team) pairs of teams whose names look like team_name, best first
+    """
+    return find_similar(get_participants_cache(), name_grams, team_name, limit=limit)
+
 
 def register_participants():
     """
@@ -109,33 +75,63 @@ def register_participants():
     """
     print("\nParticipant registration:\n")
     full_name = input("Enter your full name: ").title().strip()
+    team = find_member_team(full_name)
+    if team is not None:
+        print(f"{full_name} is already registered in team '{team['Team_name']}'!")
+        return "main"
     
     while True:  # Validating email format
         user_email = input("Enter your email: ").strip()
-        if user_email.endswith('@gmail.com') or user_email.endswith('@mail.ru') or user_email.endswith('@yahoo.com'):
+        if is_valid_email(user_email):
             break
         else:
             print("Invalid input, enter an email again!")
+
+    if get_participants_cache().exists('contact', user_email.casefold()):
+        print("This email has already registered a team!")
+        return "main"
     
-    team_name = input("Enter your team name: ").title().strip()
+    while True:  # Team names and leader contacts must be unique, "CodeNinjas" is taken by "Code Ninjas"
+        team_name = input("Enter your team name: ").title().strip()
+        if get_participants_cache().exists('Team_name', team_name) or get_participants_cache().exists('team_key', compact(team_name)):
+            print("This team name is already taken, choose another one!")
+            continue
+        similar = find_similar_teams(team_name, limit=3)
+        if not similar:
+            break
+        print(f"'{team_name}' looks like " + ", ".join(f"'{team['Team_name']}'" for _, team in similar) + ".")
+        if input("Is it a different team? (y/n): ").strip().lower() == "y":
+            break
     
     while True:  # Adjusting maximum participants upto 5 including the leader
-        participant_quantity = int(input("How many people do you want to add (including yourself)? "))
-        if participant_quantity >= 3 and participant_quantity <= 5:  
+        participant_quantity = read_choice("How many people do you want to add (including yourself)? ")
+        if participant_quantity is not None and is_valid_team_size(participant_quantity):
             break
         else:
-            print("Please enter between 3 to 5 participants (including yourself).")
+            print(f"Please enter between {min_team_size} to {max_team_size} participants (including yourself).")
 
     participant = Participant(full_name=full_name, contact=user_email, team_name=team_name)  # Making an object from  Participant class
     
-    for i in range(participant_quantity - 1):  # Looping to add team members
-        member_name = input(f"Enter participant {i+1} name: ").title().strip()
+    members = {normalize_name(full_name)}
+    for i in range(participant_quantity - 1):  # Looping to add team members, a person can be in one team only
+        while True:
+            member_name = input(f"Enter participant {i+1} name: ").title().strip()
+            team = find_member_team(member_name)
+            if not normalize_name(member_name):
+                print("Please enter a name.")
+            elif normalize_name(member_name) in members:
+                print(f"{member_name} is already in your team, enter another name!")
+            elif team is not None:
+                print(f"{member_name} is already registered in team '{team['Team_name']}', enter another name!")
+            else:
+                break
+        members.add(normalize_name(member_name))
         participant.add_team_member(member_name)
 
-    participant.add_onedata_to_file(participant.formatting_team())
+    get_participants_cache().add(participant.formatting_team())
 
     print("Data about your team has been saved successfully!")
-    return display_menu()
+    return "main"
 
 
 def ckecking_admin():
@@ -145,41 +141,72 @@ def ckecking_admin():
     login  = input("Enter your login: ").strip()
     password = input("Enter your password: ").strip()
 
-    if login == admin_login and password == admin_password:
-        return display_admin_menu()
+    if get_admin_store().authenticate(login, password):
+        return "admin"
     print("Something went wrong with login or password. Note that only admins can log in!")
-    return display_menu()
+    return "main"
 
 def printing_all_prticipants():
     """
-    This function is used to print all teams
+    This function is used to print all teams page by page
     """
-    json_manager = JsonManager(file_name="participants.json")
-    participants = json_manager.get_all_participants()
-    
-    if participants:
+    pages = storage.paginate(get_json_manager().iter_records(), page_size)
+    page = next(pages, None)
+
+    if page:
         print("\nAll Teams:\n")
-        for participant in participants:
-            print(f"Team: {participant['Team_name']}")
-            print(f"Leader: {participant['Leader_name']} ({participant['Leader_contact']})")
-            if participant['Other_participants']:
-                print("Other Participants:")
-                for name in participant['Other_participants']:
-                    print(f"- {name}")
-            print("--------------------")
+        while page:
+            for participant in page:
+                print(f"Team: {participant['Team_name']}")
+                print(f"Leader: {participant['Leader_name']} ({participant['Leader_contact']})")
+                if participant['Other_participants']:
+                    print("Other Participants:")
+                    for name in participant['Other_participants']:
+                        print(f"- {name}")
+                print("--------------------")
+
+            page = next(pages, None)
+            if page and input("Press Enter to see more teams or 'q' to stop: ").strip().lower() == "q":
+                break
     else:
         print("No participants found.")
-    return display_admin_menu()
+    return "admin"
 
 def remove_team_by_name():
     """
     This function is used to remove teams by their name
     """
-    json_manager = JsonManager(file_name="participants.json")
     team_name = input("Enter the team name you want to remove: ").title().strip()
-    json_manager.removing_participants(team_name)
-    print(f"Team '{team_name}' has been removed successfully!")
-    return display_admin_menu()
+    teams = get_participants_cache().find('team_key', compact(team_name))
+    if not teams:
+        similar = find_similar_teams(team_name)
+        if not similar:
+            print("There is no such team in the list. Please try again later.")
+            return "admin"
+        print("There is no such team. Did you mean:")
+        for number, (_, team) in enumerate(similar, start=1):
+            print(f"{number}. {team['Team_name']} (leader {team['Leader_name']})")
+        choice = read_choice(f"Choose a team to remove (1-{len(similar)}, anything else - none): ")
+        if choice is None or not 1 <= choice <= len(similar):
+            return "admin"
+        teams = [similar[choice - 1][1]]
+
+    for name in dict.fromkeys(team['Team_name'] for team in teams):
+        get_participants_cache().remove('Team_name', name)
+        print(f"Team '{name}' has been removed successfully!")
+    return "admin"
+
+def find_participant():
+    """
+    This function is used to find the team of a participant by name
+    """
+    name = input("Enter the name of the participant: ")
+    team = find_member_team(name)
+    if team is None:
+        print("There is no such participant.")
+    else:
+        print(f"{name.title().strip()} is in team '{team['Team_name']}' led by {team['Leader_name']} ({team['Leader_contact']}).")
+    return "admin"
 
 def display_admin_menu():
     """
@@ -188,20 +215,23 @@ def display_admin_menu():
     text = """
     1. See all teams.
     2. Remove teams.
-    3. Exit. """
+    3. Find a participant.
+    4. Exit. """
 
     print(text)
 
-    user_input = int(input("Choose a number from menu: "))
+    user_input = read_choice()
 
     if user_input == 1:
-        printing_all_prticipants()
+        return "teams"
     elif user_input == 2:
-        remove_team_by_name()
+        return "remove"
     elif user_input == 3:
-        return display_menu()
-    else:
-        print("Choose a proper number!")
+        return "find"
+    elif user_input == 4:
+        return "main"
+    print("Choose a proper number!")
+    return "admin"
 
 def display_menu():
     """
@@ -216,23 +246,39 @@ def display_menu():
 
     print(text)
 
-    user_input = int(input("Choose a number from menu: "))
+    user_input = read_choice()
 
     if user_input == 1:
-        participant = register_participants()
-        print(participant.formatting_team())
+        return "register"
     elif user_input == 2:
-        if ckecking_admin():
-            display_admin_menu()
+        return "login"
     elif user_input == 3:
         yes_no_input = input("Would you like to quit? (y/n): ")
         if yes_no_input.lower() == "y":
             print("You quitted the program. See you!")
-        else:
-            return display_menu()
-    else:
-        print("Choose a proper number! ")
-        return display_menu()
-    
+            return None
+        return "main"
+    print("Choose a proper number! ")
+    return "main"
+
+
+screens = {
+    "main": display_menu,
+    "register": register_participants,
+    "login": ckecking_admin,
+    "admin": display_admin_menu,
+    "teams": printing_all_prticipants,
+    "remove": remove_team_by_name,
+    "find": find_participant,
+}
+
+
+def main():
+    """
+    This function runs the hackathon menus until the user quits
+    """
+    run_menus(screens, "main")
+
+
 if __name__ == "__main__":
-    display_menu()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,709 @@
+"""
+HTTP/JSON API of the hackathon, scooter and taxi apps
+
+One asyncio process serves many clients at once with the same domain code
+as the console menus. Reading files, checking passwords and querying
+indexes run in a thread pool, so a slow disk or scrypt never blocks the
+event loop. Every write goes through one writer task: it takes all writes
+that are waiting, checks them in order and commits the records of each
+file with one bulk write, so concurrent requests never interleave commits
+and a burst of requests costs one atomic write (one data file fsync) per
+file.
+
+Endpoints (JSON bodies, HTTP Basic auth where an account is needed):
+    POST   /teams                       register a team
+    GET    /teams?offset=&limit=        list teams (admin)
+    DELETE /teams/<team name>           remove a team (admin)
+    GET    /scooters?lat=&lon=&k=&min_battery=&offset=&limit=
+                                        available scooters, nearest first if lat/lon are given
+    POST   /scooters                    add a scooter (scooter owner)
+    POST   /scooters/<id>/rent          reserve a scooter and start the ride (client)
+    POST   /rentals/<id>/end            end a ride and get its cost (client)
+    POST   /announcements/taxi          post a taxi announcement, it seats the waiting clients of its route
+                                        (taxi app user)
+    POST   /announcements/client        post a client announcement and book seats in the cheapest matching taxi
+                                        (taxi app user)
+    GET    /announcements/taxi?from=&to=&max_price=&min_seats=&limit=
+    GET    /announcements/client?from=&to=&min_price=&limit=
+
+Usage: python api_server.py [--host 127.0.0.1] [--port 8080] [--workers 16]
+(run it from this folder, the data files are the ones the console apps use)
+"""
+import argparse
+import asyncio
+import base64
+import binascii
+import concurrent.futures
+import os
+import re
+import sys
+import urllib.parse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxi_project"))
+
+import Hackhaton  # noqa: E402
+import storage  # noqa: E402
+from announcement_index import get_announcement_index, sweep_expired  # noqa: E402
+from announcement_models import ClientAnnouncement, TaxiAnnouncement  # noqa: E402
+from batch_import import announcement_schema, different_regions, region_choices, schema_fields, scooter_row_schema  # noqa: E402
+from credentials import get_credential_store  # noqa: E402
+from matching import find_match, get_ride_matcher  # noqa: E402
+from rental_engine import RentalError  # noqa: E402
+from scooter import Client, ScooterOwner, get_rental_engine, get_scooter_manager, get_scooters_cache, scooter_ids  # noqa: E402
+from scooter_index import get_scooter_index, update_scooter_index  # noqa: E402
+from serializer import DecodeError, dumps, loads  # noqa: E402
+from validation import Field, Schema, team_schema  # noqa: E402
+
+taxi_users_file = os.path.join("taxi_project", "users.json")
+taxi_announcements_file = os.path.join("taxi_project", "announcements.json")
+client_announcements_file = os.path.join("taxi_project", "client_announcements.json")
+
+max_body_size = 1 << 20
+max_headers = 100
+max_batch = 512  # writes committed together at most
+default_page_size = 50
+max_page_size = 1000
+expiry_interval = 60  # seconds between two archivings of expired announcements
+
+reasons = {
+    200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+client_announcement_schema = Schema("client announcement", (
+    Field('from_place', choices=region_choices, clean=str.strip),
+    Field('to_place', choices=region_choices, clean=str.strip),
+    Field('price', kind="number", low=0),
+    Field('expire_time', kind="number", low=0),
+    Field('seats', kind=int, required=False, low=1, high=50),
+), checks=(different_regions,))
+
+
+class HttpError(Exception):
+    """
+    This exception is turned into an error response with its status
+    """
+
+    def __init__(self, status, message) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """
+    This class is applied to keep one parsed HTTP request
+
+    Attributes:
+        - method (str): GET, POST, DELETE...
+        - path (str): decoded path without the query string
+        - query (dict): query parameter -> its last value
+        - headers (dict): lower-case header name -> value
+        - body (bytes): request body
+    """
+
+    def __init__(self, method, target, headers, body) -> None:
+        parts = urllib.parse.urlsplit(target)
+        self.method = method
+        self.path = urllib.parse.unquote(parts.path)
+        self.query = dict(urllib.parse.parse_qsl(parts.query))
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        """
+        This method returns the JSON object of the body, HttpError 400 if it is not one
+        """
+        try:
+            data = loads(self.body.decode("utf-8"))
+        except (DecodeError, UnicodeDecodeError) as error:
+            raise HttpError(400, f"The body is not valid JSON: {error}") from None
+        if not isinstance(data, dict):
+            raise HttpError(400, "The body must be a JSON object.")
+        return data
+
+    def number(self, name, default=None, kind=float, low=None, high=None):
+        """
+        This method returns a number from the query string, HttpError 400 if it is not a number
+        """
+        value = self.query.get(name)
+        if value is None or value == "":
+            return default
+        try:
+            number = kind(value)
+        except ValueError:
+            raise HttpError(400, f"{name} must be a number, got {value!r}") from None
+        if number != number or low is not None and number < low or high is not None and number > high:
+            limits = [f"at least {low}" if low is not None else "", f"at most {high}" if high is not None else ""]
+            raise HttpError(400, f"{name} must be {' and '.join(limit for limit in limits if limit)}, got {value!r}")
+        return number
+
+    def page(self):
+        """
+        This method returns (offset, limit) from the query string
+        """
+        return self.number('offset', 0, int, low=0), self.number('limit', default_page_size, int, low=1, high=max_page_size)
+
+
+async def read_request(reader):
+    """
+    This function reads one request of a keep-alive connection, None when the client has closed it
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line.") from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= max_headers:
+            raise HttpError(400, "Too many headers.")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise HttpError(400, "Bad Content-Length.")
+    if length > max_body_size:
+        raise HttpError(413, f"The body must be at most {max_body_size} bytes.")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method, target, headers, body)
+
+
+def response_bytes(status, payload, keep_alive=True, extra_headers=()):
+    """
+    This function returns a complete HTTP response with a JSON body
+    """
+    body = dumps(payload).encode("utf-8")
+    head = [
+        f"HTTP/1.1 {status} {reasons.get(status, 'Unknown')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(body)}",
+        "Connection: keep-alive" if keep_alive else "Connection: close",
+        *extra_headers,
+    ]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+class Append:
+    """
+    This class is applied to add one record to a data file through the writer task
+
+    Appends to the same file that are waiting together are committed with
+    one add_many() call.
+
+    Attributes:
+        - manager: storage manager of the file
+        - record (dict): record to add
+    """
+
+    def __init__(self, manager, record) -> None:
+        self.manager = manager
+        self.record = record
+
+    def group(self):
+        """
+        This method returns the key of the appends that can be committed together
+        """
+        return (type(self), os.path.abspath(self.manager.file_name))
+
+    def prepare(self, earlier):
+        """
+        This method checks the record right before the commit, earlier are the accepted appends of its group
+        """
+
+    def result(self):
+        return self.record
+
+    @staticmethod
+    def commit(manager, appends):
+        """
+        This method writes the records of a group with one bulk write
+        """
+        manager.add_many([append.record for append in appends])
+
+
+class TeamAppend(Append):
+    """
+    This class is applied to register a team, team names, leader contacts and members must be unique
+    """
+
+    checks = (
+        ('Team_name', lambda team: [team['Team_name']], "The team name {!r} is already taken."),
+        ('team_key', Hackhaton.team_key, "A team with the same name ({!r}) is already registered."),
+        ('contact', Hackhaton.team_contact, "The email {!r} has already registered a team."),
+        ('member', Hackhaton.team_members, "{!r} is already registered in a team."),
+    )
+
+    def prepare(self, earlier):
+        cache = Hackhaton.get_participants_cache()
+        members = Hackhaton.team_members(self.record)
+        if len(set(members)) < len(members):
+            raise HttpError(400, "A person can be named only once in a team.")
+        for key, values, message in self.checks:
+            taken = {value for append in earlier for value in values(append.record)}
+            for value in values(self.record):
+                if value in taken or cache.exists(key, value):
+                    raise HttpError(409, message.format(value))
+
+    @staticmethod
+    def commit(manager, appends):
+        Hackhaton.get_participants_cache().add_many([append.record for append in appends])
+
+
+class ScooterAppend(Append):
+    """
+    This class is applied to add a scooter, it gets its id when it is committed
+    """
+
+    def prepare(self, earlier):
+        if 'id' not in self.record:
+            self.record = {'id': scooter_ids.next_id(), **self.record}
+        elif get_scooters_cache().exists('id', self.record['id']) or any(
+                append.record['id'] == self.record['id'] for append in earlier):
+            raise HttpError(409, f"Scooter id {self.record['id']} already exists.")
+
+    @staticmethod
+    def commit(manager, appends):
+        previous_signature = storage.file_signature(manager.file_name)
+        Append.commit(manager, appends)
+        engine = get_rental_engine()
+        for append in appends:  # the nearest-scooter index and the rental engine learn the new scooters
+            update_scooter_index(manager, append.record, previous_signature)
+            previous_signature = storage.file_signature(manager.file_name)
+            engine.add_scooter(append.record)
+
+
+class TaxiAnnouncementAppend(Append):
+    """
+    This class is applied to post a taxi announcement, it seats the clients waiting on its route
+
+    The announcements waiting together are saved with one write of each
+    announcement file through the process-wide RideMatcher.
+    """
+
+    def __init__(self, manager, record, matcher) -> None:
+        super().__init__(manager, record)
+        self.matcher = matcher
+        self.matches = []
+
+    def result(self):
+        return {**self.record, "clients_booked": [dict(match['client']) for match in self.matches]}
+
+    @staticmethod
+    def commit(manager, appends):
+        matches = appends[0].matcher.post(taxis=[append.record for append in appends])
+        for append in appends:
+            append.matches = [match for match in matches if match['taxi'] is append.record]
+
+
+class ClientAnnouncementAppend(Append):
+    """
+    This class is applied to post a client announcement and book seats for it in the cheapest matching taxi
+
+    A client without a taxi waits in the RideMatcher queue and gets the first
+    new taxi of its route that fits. A served announcement is stored
+    inactive, so drivers do not see it any more.
+    """
+
+    def __init__(self, manager, record, matcher) -> None:
+        super().__init__(manager, record)
+        self.matcher = matcher
+        self.match = None
+
+    def result(self):
+        taxi = None if self.match is None else {**self.match['taxi'], "seats_booked": self.match['seats']}
+        return {"announcement": dict(self.record), "taxi": taxi}  # copies, the matcher keeps changing its dicts
+
+    @staticmethod
+    def commit(manager, appends):
+        matches = appends[0].matcher.post(clients=[append.record for append in appends])
+        for append in appends:
+            append.match = find_match(matches, append.record)
+
+
+class Call:
+    """
+    This class is applied to run any other write (removal, end of a ride) through the writer task
+    """
+
+    def __init__(self, function) -> None:
+        self.function = function
+
+    def run(self):
+        return self.function()
+
+
+def commit_batch(writes):
+    """
+    This function commits a batch of writes in order and returns the result or exception of each
+
+    Appends are collected per file and written with one bulk write. Before a
+    Call runs, the collected appends are written, so the order stays the order
+    the requests came in.
+    """
+    results = [None] * len(writes)
+    groups = {}  # group key -> list of (position, append)
+
+    def flush():
+        for pending in groups.values():
+            appends = [append for _, append in pending]
+            try:
+                type(appends[0]).commit(appends[0].manager, appends)
+                for position, append in pending:
+                    results[position] = append.result()
+            except Exception as error:  # noqa: BLE001  every request of the group gets the error
+                for position, _ in pending:
+                    results[position] = error
+        groups.clear()
+
+    for position, write in enumerate(writes):
+        if isinstance(write, Call):
+            flush()
+            try:
+                results[position] = write.run()
+            except Exception as error:  # noqa: BLE001
+                results[position] = error
+            continue
+        pending = groups.setdefault(write.group(), [])
+        try:
+            write.prepare([append for _, append in pending])
+        except Exception as error:  # noqa: BLE001
+            results[position] = error
+            continue
+        pending.append((position, write))
+    flush()
+    return results
+
+
+class CommitWriter:
+    """
+    This class is applied to serialize all commits in one task
+
+    Attributes:
+        - executor: thread pool the batches are written in
+        - queue (asyncio.Queue): (write, future) pairs waiting for the writer
+    """
+
+    def __init__(self, executor) -> None:
+        self.executor = executor
+        self.queue = asyncio.Queue()
+        self.task = None
+        self.batches = 0
+        self.writes = 0
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self.run())
+        return self.task
+
+    async def submit(self, write):
+        """
+        This method queues a write and returns its result once it is committed
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((write, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                results = await loop.run_in_executor(self.executor, commit_batch, [write for write, _ in batch])
+            except Exception as error:  # noqa: BLE001
+                results = [error] * len(batch)
+            self.batches += 1
+            self.writes += len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue  # the client went away
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def validated(schema, data):
+    """
+    This function validates request data with a schema, HttpError 400 if it is wrong
+    """
+    try:
+        return schema_fields(schema, schema.validate(data))
+    except ValueError as error:
+        raise HttpError(400, str(error)) from None
+
+
+class ApiServer:
+    """
+    This class is applied to serve the API on one event loop
+
+    Attributes:
+        - executor (ThreadPoolExecutor): runs blocking file I/O, password checks and index queries
+        - writer (CommitWriter): the only task that commits writes
+        - routes (list): (method, compiled path pattern, handler)
+    """
+
+    def __init__(self, workers=16) -> None:
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self.writer = CommitWriter(self.executor)
+        self.server = None
+        self.sweeper = None
+        self.teams = Hackhaton.get_json_manager()
+        self.owners = ScooterOwner(None, None)
+        self.scooters = get_scooter_manager()
+        self.clients = Client(None, None)
+        self.taxi_users = storage.JsonManager(taxi_users_file)
+        self.taxi_announcements = storage.get_manager(taxi_announcements_file, table="taxi_announcements")
+        self.client_announcements = storage.get_manager(client_announcements_file, table="client_announcements")
+        self.routes = [
+            ("POST", re.compile(r"/teams"), self.post_team),
+            ("GET", re.compile(r"/teams"), self.get_teams),
+            ("DELETE", re.compile(r"/teams/(?P<name>[^/]+)"), self.delete_team),
+            ("GET", re.compile(r"/scooters"), self.get_scooters),
+            ("POST", re.compile(r"/scooters"), self.post_scooter),
+            ("POST", re.compile(r"/scooters/(?P<scooter_id>[^/]+)/rent"), self.rent_scooter),
+            ("POST", re.compile(r"/rentals/(?P<rental_id>\d+)/end"), self.end_ride),
+            ("POST", re.compile(r"/announcements/taxi"), self.post_taxi_announcement),
+            ("POST", re.compile(r"/announcements/client"), self.post_client_announcement),
+            ("GET", re.compile(r"/announcements/taxi"), self.get_taxi_announcements),
+            ("GET", re.compile(r"/announcements/client"), self.get_client_announcements),
+        ]
+
+    async def blocking(self, function, *args):
+        """
+        This method runs a blocking function in the thread pool
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def start(self, host="127.0.0.1", port=8080):
+        self.writer.start()
+        self.sweeper = asyncio.get_running_loop().create_task(self.sweep_expired())
+        self.server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        return self.server
+
+    async def sweep_expired(self, interval=expiry_interval):
+        """
+        This method moves expired announcements to the archive files every interval seconds
+
+        The archiving rewrites the announcement files, so it runs as a Call
+        through the writer task like every other write.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            for manager in (self.taxi_announcements, self.client_announcements):
+                try:
+                    await self.writer.submit(Call(lambda manager=manager: sweep_expired(manager)))
+                except Exception as error:  # noqa: BLE001  a failed sweep is retried next time
+                    print(f"archiving expired announcements of {manager.file_name} failed: {error}", file=sys.stderr)
+
+    async def handle_connection(self, reader, writer):
+        """
+        This method serves the requests of one keep-alive connection
+        """
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as error:
+                    writer.write(response_bytes(error.status, {"error": error.message}, keep_alive=False))
+                    break
+                if request is None:
+                    break
+                keep_alive = request.headers.get('connection', '').lower() != "close"
+                status, payload, extra_headers = await self.dispatch(request)
+                writer.write(response_bytes(status, payload, keep_alive, extra_headers))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request):
+        """
+        This method calls the handler of a request and returns (status, payload, extra headers)
+        """
+        allowed = []
+        for method, pattern, handler in self.routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+            try:
+                status, payload = await handler(request, **match.groupdict())
+                return status, payload, ()
+            except HttpError as error:
+                extra = ('WWW-Authenticate: Basic realm="api"',) if error.status == 401 else ()
+                return error.status, {"error": error.message}, extra
+            except Exception as error:  # noqa: BLE001  one bad request must not stop the server
+                return 500, {"error": f"{type(error).__name__}: {error}"}, ()
+        if allowed:
+            return 405, {"error": f"Use {', '.join(allowed)} for {request.path}."}, (f"Allow: {', '.join(allowed)}",)
+        return 404, {"error": f"There is no {request.path}."}, ()
+
+    async def authenticate(self, request, store):
+        """
+        This method checks the Basic auth of a request against a credential store and returns the username
+        """
+        header = request.headers.get('authorization', '')
+        scheme, _, encoded = header.partition(" ")
+        if scheme.lower() != "basic":
+            raise HttpError(401, "Log in with HTTP Basic auth.")
+        try:
+            username, _, password = base64.b64decode(encoded, validate=True).decode("utf-8").partition(":")
+        except (binascii.Error, UnicodeDecodeError):
+            raise HttpError(401, "Malformed Basic auth.") from None
+        if not await self.blocking(store.authenticate, username, password):
+            raise HttpError(401, "Incorrect username or password.")
+        return username
+
+    # teams
+
+    async def post_team(self, request):
+        data = request.json()
+        if isinstance(data.get('Other_participants'), list):
+            data['Other_participants'] = [str(name).title().strip() for name in data['Other_participants'] if str(name).strip()]
+        team = validated(team_schema, data)
+        return 201, await self.writer.submit(TeamAppend(self.teams, team))
+
+    async def get_teams(self, request):
+        await self.authenticate(request, Hackhaton.get_admin_store())
+        offset, limit = request.page()
+        teams = await self.blocking(Hackhaton.get_participants_cache().all)
+        return 200, {"total": len(teams), "teams": teams[offset:offset + limit]}
+
+    async def delete_team(self, request, name):
+        await self.authenticate(request, Hackhaton.get_admin_store())
+        if not await self.writer.submit(Call(lambda: Hackhaton.get_participants_cache().remove('Team_name', name))):
+            raise HttpError(404, f"There is no team {name!r}.")
+        return 200, {"removed": name}
+
+    # scooters
+
+    async def get_scooters(self, request):
+        offset, limit = request.page()
+        latitude = request.number('lat', low=-90, high=90)
+        longitude = request.number('lon', low=-180, high=180)
+        min_battery = request.number('min_battery', 0, low=0, high=100)
+        engine = await self.blocking(get_rental_engine)
+
+        if latitude is not None and longitude is not None:
+            k = request.number('k', 5, int, low=1, high=max_page_size)
+            radius = request.number('radius_m', low=0)
+            index = await self.blocking(get_scooter_index, self.scooters)
+            found = await self.blocking(index.nearest, latitude, longitude, k, min_battery, radius)
+            return 200, {"scooters": [dict(scooter, distance_m=round(distance)) for distance, scooter in found]}
+
+        scooters = await self.blocking(engine.available_scooters, min_battery)
+        return 200, {"total": len(scooters), "scooters": scooters[offset:offset + limit]}
+
+    async def post_scooter(self, request):
+        await self.authenticate(request, get_credential_store(self.owners))
+        scooter = validated(scooter_row_schema, request.json())
+        return 201, await self.writer.submit(ScooterAppend(self.scooters, scooter))
+
+    async def rent_scooter(self, request, scooter_id):
+        client = await self.authenticate(request, get_credential_store(self.clients))
+        scooter_id = int(scooter_id) if scooter_id.isdigit() else scooter_id
+        engine = await self.blocking(get_rental_engine)
+        try:
+            rental = engine.start(engine.reserve(scooter_id, client))
+        except RentalError as error:
+            raise HttpError(404 if engine.state_of(scooter_id) is None else 409, str(error)) from None
+        return 201, rental.formatting_rental()
+
+    async def end_ride(self, request, rental_id):
+        client = await self.authenticate(request, get_credential_store(self.clients))
+        engine = await self.blocking(get_rental_engine)
+        rental = engine.rentals.get(int(rental_id))
+        if rental is None or rental.client != client:
+            raise HttpError(404, f"You have no active ride {rental_id}.")
+        try:
+            cost = await self.writer.submit(Call(lambda: engine.end(rental)))
+        except RentalError as error:
+            raise HttpError(409, str(error)) from None
+        return 200, dict(rental.formatting_rental(), cost=cost)
+
+    # taxi announcements
+
+    async def post_taxi_announcement(self, request):
+        await self.authenticate(request, get_credential_store(self.taxi_users))
+        row = validated(announcement_schema, request.json())
+        taxi = TaxiAnnouncement(
+            row['from_place'], row['to_place'], str(row['price']), row['car_name'],
+            row.get('comment', ''), str(row['expire_time']), str(row['seats']),
+        )
+        matcher = get_ride_matcher(self.taxi_announcements, self.client_announcements)
+        return 201, await self.writer.submit(TaxiAnnouncementAppend(self.taxi_announcements, taxi.formatting_announcement(), matcher))
+
+    async def post_client_announcement(self, request):
+        await self.authenticate(request, get_credential_store(self.taxi_users))
+        row = validated(client_announcement_schema, request.json())
+        seats = row.get('seats', 1)
+        client = ClientAnnouncement(row['from_place'], row['to_place'], str(row['price']), str(row['expire_time']), str(seats))
+        matcher = get_ride_matcher(self.taxi_announcements, self.client_announcements)
+        append = ClientAnnouncementAppend(self.client_announcements, client.formatting_announcement(), matcher)
+        return 201, await self.writer.submit(append)
+
+    def route(self, request):
+        places = []
+        for name in ('from', 'to'):
+            place = region_choices.get(request.query.get(name, "").strip())
+            if place is None:
+                raise HttpError(400, f"{name} must be a region number or name.")
+            places.append(place)
+        return places
+
+    async def get_taxi_announcements(self, request):
+        from_place, to_place = self.route(request)
+        max_price, min_seats = request.number('max_price', low=0), request.number('min_seats', low=0)
+        limit = request.page()[1]
+        index = await self.blocking(get_announcement_index, self.taxi_announcements)
+        found = await self.blocking(lambda: index.query(from_place, to_place, max_price=max_price, min_seats=min_seats, limit=limit))
+        return 200, {"announcements": found}
+
+    async def get_client_announcements(self, request):
+        from_place, to_place = self.route(request)
+        min_price = request.number('min_price', low=0)
+        limit = request.page()[1]
+        index = await self.blocking(get_announcement_index, self.client_announcements)
+        found = await self.blocking(lambda: index.query(from_place, to_place, min_price=min_price, order="newest", limit=limit))
+        return 200, {"announcements": found}
+
+
+async def serve(host, port, workers):
+    api = ApiServer(workers)
+    server = await api.start(host, port)
+    print(f"Serving on http://{host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the hackathon, scooter and taxi apps over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=16, help="threads for file I/O and password checks")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+from serializer import dumps
+
+
+def fsync_directory(directory):
+    """
+    This function flushes a directory entry so a rename survives a power loss
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # some platforms (e.g. Windows) cannot open directories
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write(file_name, text, durable=True):
+    """
+    This function replaces a file with the given text without ever leaving it half-written
+
+    The text goes to a temporary file in the same directory, which is fsynced
+    and then renamed over the target with os.replace.
+    """
+    directory = os.path.dirname(os.path.abspath(file_name))
+    mode = os.stat(file_name).st_mode & 0o777 if os.path.exists(file_name) else 0o644
+    fd, temp_name = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(file_name))
+    try:
+        with os.fdopen(fd, mode="w", encoding="utf-8") as file:
+            file.write(text)
+            file.flush()
+            if durable:
+                os.fsync(file.fileno())
+        os.chmod(temp_name, mode)
+        os.replace(temp_name, file_name)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+        raise
+    if durable:
+        fsync_directory(directory)
+
+
+def atomic_write_json(file_name, all_data, pretty=False, durable=True):
+    """
+    This function atomically writes data into a JSON file
+    """
+    atomic_write(file_name, dumps(all_data, pretty=pretty), durable=durable)
@@ -0,0 +1,281 @@
+"""
+Batch import of teams, scooters and taxi announcements from CSV or JSON Lines
+
+Rows are streamed from the input file and checked with the same rules as the
+interactive menus. All valid rows are written with one bulk commit, rows with
+errors are reported with their line number and skipped.
+
+Usage: python batch_import.py teams|scooters|announcements INPUT [--target FILE] [--dry-run]
+
+CSV columns:
+    - teams: Leader_name, Leader_contact, Team_name, Other_participants (names separated by ';')
+    - scooters: battery, location, model_name, price_per_minute, optional id, latitude, longitude
+    - announcements: from_place, to_place (region number or name), price, expire_time,
+      car_name, seats, comment
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxi_project"))
+
+import storage  # noqa: E402
+from announcement_models import TaxiAnnouncement  # noqa: E402
+from fuzzy_names import find_similar  # noqa: E402
+from record_cache import RecordIndex, get_record_cache  # noqa: E402
+from regions import region_names, regions  # noqa: E402
+from serializer import DecodeError, loads  # noqa: E402
+from team_keys import name_grams, participant_keys, team_contact, team_key, team_members  # noqa: E402
+from validation import Field, Schema, scooter_schema, team_schema  # noqa: E402
+
+targets = {
+    "teams": ("participants.json", "participants"),
+    "scooters": ("scooter_owners.json", "scooters"),
+    "announcements": (os.path.join("taxi_project", "announcements.json"), "taxi_announcements"),
+}
+
+
+class TeamRows:
+    """
+    This class is applied to turn team rows into participant records
+
+    A row passes the checks of the registration menu: its members, leader
+    contact and team name (without case, spaces and punctuation) are not
+    taken by a stored team or a row imported before, and its name does not
+    look like the name of a stored team or of a row imported before. The
+    menu asks whether such a team is a different one; an import reports the
+    row instead. The accepted rows are indexed by the same keys as the
+    stored teams.
+    """
+
+    def __init__(self, manager) -> None:
+        self.cache = get_record_cache(manager, participant_keys)
+        self.accepted = RecordIndex(participant_keys)
+
+    def taken(self, key, value):
+        """
+        This method returns the stored team or accepted row that has the value under a key, None if there is none
+        """
+        found = self.cache.find(key, value) or self.accepted.find(key, value)
+        return found[0] if found else None
+
+    def convert(self, row):
+        """
+        This method validates one row and returns the team record
+        """
+        others = row.get('Other_participants') or []
+        if isinstance(others, str):
+            others = others.split(';')
+        row = dict(row, Other_participants=[str(name).title().strip() for name in others if str(name).strip()])
+        team = schema_fields(team_schema, team_schema.validate(row))
+
+        members = team_members(team)
+        if len(set(members)) < len(members):
+            raise ValueError("a person is listed twice in the team")
+        for name, member in zip([team['Leader_name'], *team['Other_participants']], members):
+            found = self.taken('member', member)
+            if found is not None:
+                raise ValueError(f"{name} is already registered in team {found['Team_name']!r}")
+
+        contact, = team_contact(team)
+        if self.taken('contact', contact) is not None:
+            raise ValueError(f"email {team['Leader_contact']!r} has already registered a team")
+
+        if self.taken('Team_name', team['Team_name']) is not None or any(
+                self.taken('team_key', key) is not None for key in team_key(team)):
+            raise ValueError(f"team name {team['Team_name']!r} is already taken")
+        similar = [data for index in (self.cache, self.accepted)
+                   for _, data in find_similar(index, name_grams, team['Team_name'], limit=3)]
+        if similar:
+            names = ", ".join(repr(data['Team_name']) for data in similar[:3])
+            raise ValueError(f"team name {team['Team_name']!r} looks like {names}, register it in the menu if it is a different team")
+
+        self.accepted.add(team)
+        return team
+
+    def finish(self, records):
+        return records
+
+
+class ScooterRows:
+    """
+    This class is applied to turn scooter rows into scooter records
+
+    Rows without an id get one from the shared scooter id counter when the
+    batch is written, one block for the whole batch. The counter is moved
+    past the largest imported id, so it never hands out an imported id again.
+    """
+
+    def __init__(self, manager) -> None:
+        self.ids = {data['id'] for data in manager.iter_records() if 'id' in data}
+
+    def convert(self, row):
+        """
+        This method validates one row and returns the scooter record
+        """
+        scooter = schema_fields(scooter_row_schema, scooter_row_schema.validate(row))
+        if 'id' in scooter:
+            if scooter['id'] in self.ids:
+                raise ValueError(f"scooter id {scooter['id']} already exists")
+            self.ids.add(scooter['id'])
+        return scooter
+
+    def finish(self, records):
+        """
+        This method gives ids to the records that came without one and reserves the imported ids
+        """
+        from scooter import scooter_ids
+
+        imported = [scooter['id'] for scooter in records if 'id' in scooter]
+        if imported:
+            scooter_ids.reserve(max(imported))
+        without_id = [scooter for scooter in records if 'id' not in scooter]
+        if without_id:
+            for scooter, scooter_id in zip(without_id, scooter_ids.allocate(len(without_id))):
+                scooter['id'] = scooter_id
+        # keep the key order the owner menu writes
+        return [{'id': scooter.pop('id'), **scooter} for scooter in records]
+
+
+class AnnouncementRows:
+    """
+    This class is applied to turn taxi announcement rows into announcement records
+    """
+
+    def __init__(self, manager) -> None:
+        pass
+
+    def convert(self, row):
+        """
+        This method validates one row and returns the announcement record
+        """
+        row = announcement_schema.validate(row)
+        taxi = TaxiAnnouncement(
+            row['from_place'], row['to_place'], str(row['price']), row['car_name'],
+            row.get('comment', ''), str(row['expire_time']), str(row['seats']),
+        )
+        return taxi.formatting_announcement()
+
+    def finish(self, records):
+        return records
+
+
+def different_regions(row):
+    if row['from_place'] == row['to_place']:
+        raise ValueError("Wrong regions selected")
+
+
+region_choices = dict(regions, **{name: name for name in region_names})
+announcement_schema = Schema("taxi announcement", (
+    Field('from_place', choices=region_choices, clean=str.strip),
+    Field('to_place', choices=region_choices, clean=str.strip),
+    Field('price', kind="number", low=0),
+    Field('expire_time', kind="number", low=0),
+    Field('car_name', clean=str.strip),
+    Field('seats', kind=int, low=1, high=50),
+    Field('comment', required=False),
+), checks=(different_regions,))
+scooter_row_schema = Schema("scooter row", (  # an id is given out when the batch is written if it is missing
+    Field('id', kind=int, required=False, low=1),
+    *(field for field in scooter_schema.fields if field.name != 'id'),
+))
+
+
+def schema_fields(schema, record):
+    """
+    This function keeps only the keys of a schema, in the schema's order
+    """
+    return {field.name: record[field.name] for field in schema.fields if field.name in record}
+
+
+converters = {"teams": TeamRows, "scooters": ScooterRows, "announcements": AnnouncementRows}
+
+
+def read_rows(file_name):
+    """
+    This function yields (line number, row dict) pairs from a CSV or JSON Lines file
+    """
+    with open(file_name, mode="r", encoding="utf-8", newline="") as file:
+        if file_name.endswith((".jsonl", ".ndjson")):
+            for number, line in enumerate(file, start=1):
+                if line.strip():
+                    try:
+                        yield number, loads(line)
+                    except DecodeError as error:
+                        yield number, error
+        else:
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def import_rows(kind, input_file, target=None, dry_run=False):
+    """
+    This function validates every row of input_file and writes the valid ones with one commit
+
+    Returns a report dict with the counts, the errors as (line, message)
+    pairs and the number of rows checked per second.
+    """
+    default_target, table = targets[kind]
+    manager = storage.get_manager(target or default_target, table=table)
+    converter = converters[kind](manager)
+
+    started = time.perf_counter()
+    records = []
+    errors = []
+    rows = 0
+    for line, row in read_rows(input_file):
+        rows += 1
+        try:
+            if isinstance(row, Exception):
+                raise ValueError(f"broken JSON: {row}")
+            if not isinstance(row, dict):
+                raise ValueError("a row must be an object")
+            records.append(converter.convert(row))
+        except ValueError as error:
+            errors.append((line, str(error)))
+
+    written = 0
+    if records and not dry_run:
+        written = manager.add_many(converter.finish(records))
+    seconds = time.perf_counter() - started
+
+    return {
+        "rows": rows,
+        "written": written,
+        "errors": errors,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else 0.0,
+    }
+
+
+def print_report(report, max_errors=20):
+    """
+    This function prints the import report and the first max_errors errors
+    """
+    print(f"Rows read: {report['rows']}, written: {report['written']}, errors: {len(report['errors'])}")
+    print(f"Time: {report['seconds']:.2f} s ({report['rows_per_second']:,.0f} rows/sec)")
+    for line, message in report['errors'][:max_errors]:
+        print(f"  line {line}: {message}")
+    if len(report['errors']) > max_errors:
+        print(f"  ... and {len(report['errors']) - max_errors} more")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import teams, scooters or taxi announcements from CSV or JSON Lines.")
+    parser.add_argument("kind", choices=sorted(targets))
+    parser.add_argument("input_file", help="a .csv file, or a .jsonl file with one record per line")
+    parser.add_argument("--target", help="data file to import into (.json, .jsonl or .db), default: the app's file")
+    parser.add_argument("--dry-run", action="store_true", help="only validate the rows")
+    parser.add_argument("--max-errors", type=int, default=20, help="how many row errors to print")
+    args = parser.parse_args(argv)
+
+    report = import_rows(args.kind, args.input_file, args.target, args.dry_run)
+    print_report(report, args.max_errors)
+    return 1 if report['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
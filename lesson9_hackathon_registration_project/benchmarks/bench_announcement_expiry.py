@@ -0,0 +1,75 @@
+"""
+Benchmark of announcement expiry: with most announcements expired, route
+queries on the index (expired rows evicted through the deadline heap) take
+as long as on an index of only the active rows, while filtering expired rows
+at query time gets slower with the total number of rows.
+
+Usage: python benchmarks/bench_announcement_expiry.py [announcements] [active_share]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project)
+sys.path.insert(0, os.path.join(project, "taxi_project"))
+
+from announcement_index import AnnouncementIndex  # noqa: E402
+from expiry import announcement_deadline  # noqa: E402
+from regions import region_names  # noqa: E402
+
+
+def make_announcement(now, active):
+    hours_ago = random.uniform(0, 5) if active else random.uniform(6, 72)
+    return {
+        "from_place": "Andijan" if random.random() < 0.5 else random.choice(region_names),
+        "to_place": "Fergana",
+        "price": str(random.randrange(50_000, 300_000, 5_000)),
+        "expire_time": "6",
+        "is_active": True,
+        "created_at": str(now - timedelta(hours=hours_ago)),
+        "seats": str(random.randint(1, 4)),
+    }
+
+
+def time_queries(query, repeats=200):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        query()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    random.seed(5)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    active_share = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    now = datetime.now()
+    announcements = [make_announcement(now, random.random() < active_share) for _ in range(size)]
+    active = [a for a in announcements if announcement_deadline(a) > now.timestamp()]
+
+    mixed = AnnouncementIndex()
+    mixed.add_many(dict(a) for a in announcements)
+    start = time.perf_counter()
+    evicted = mixed.evict_expired()
+    eviction = time.perf_counter() - start
+
+    only_active = AnnouncementIndex()
+    only_active.add_many(dict(a) for a in active)
+
+    def filter_at_query_time():
+        deadline_now = time.time()
+        return [
+            a for a in announcements
+            if a["from_place"] == "Andijan" and a["to_place"] == "Fergana" and announcement_deadline(a) > deadline_now
+        ]
+
+    print(f"{size} announcements, {len(active)} active, {evicted} evicted in {eviction * 1000:.0f} ms")
+    print(f"index, expired evicted:     {time_queries(lambda: mixed.query('Andijan', 'Fergana')):.3f} ms/query")
+    print(f"index of active rows only:  {time_queries(lambda: only_active.query('Andijan', 'Fergana')):.3f} ms/query")
+    print(f"skip expired at query time: {time_queries(filter_at_query_time, repeats=5):.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
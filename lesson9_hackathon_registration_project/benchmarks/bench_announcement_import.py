@@ -0,0 +1,46 @@
+"""
+Benchmark of importing the taxi announcement modules: every module is
+imported in a fresh interpreter and the import cost is taken from
+python -X importtime (cumulative microseconds of the module). That the
+imports read no input and print nothing is checked by
+tests/test_announcement_import.py.
+
+Usage: python benchmarks/bench_announcement_import.py [repeats]
+"""
+import os
+import subprocess
+import sys
+
+TAXI_PROJECT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "taxi_project")
+MODULES = ("announcement_models", "announcments", "main")
+
+
+def import_time_us(module):
+    """
+    This function imports a module in a fresh interpreter and returns its cumulative import time
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=TAXI_PROJECT, stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=30,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"no importtime line for {module}")
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for module in MODULES:
+        times = sorted(import_time_us(module) for _ in range(repeats))
+        print(f"{module:20} imported, median {times[len(times) // 2] / 1000:7.2f} ms "
+              f"(best {times[0] / 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
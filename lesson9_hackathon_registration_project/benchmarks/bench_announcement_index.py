@@ -0,0 +1,82 @@
+"""
+Benchmark of the route index for taxi announcements against a full scan:
+"taxis from A to B under X per seat with at least N seats" over the 13
+regions and a few hundred thousand announcements.
+
+Usage: python benchmarks/bench_announcement_index.py [announcements]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project)
+sys.path.insert(0, os.path.join(project, "taxi_project"))
+
+from announcement_index import AnnouncementIndex, to_number  # noqa: E402
+from expiry import announcement_deadline  # noqa: E402
+from regions import region_names  # noqa: E402
+
+
+def make_announcement(number, now):
+    from_place, to_place = random.sample(region_names, 2)
+    return {
+        "from_place": from_place,
+        "to_place": to_place,
+        "price": str(random.randrange(50_000, 300_000, 5_000)),
+        "expire_time": "5",
+        "is_active": True,
+        "created_at": str(now - timedelta(seconds=number % 14_400)),  # within the last 4 of its 5 hours
+        "car_name": "Cobalt",
+        "comment": "",
+        "seats": str(random.randint(1, 4)),
+    }
+
+
+def full_scan(announcements, from_place, to_place, max_price, min_seats):
+    now = time.time()
+    found = [
+        announcement for announcement in announcements
+        if announcement["from_place"] == from_place and announcement["to_place"] == to_place
+        and to_number(announcement["price"]) <= max_price and to_number(announcement["seats"]) >= min_seats
+        and announcement_deadline(announcement) > now  # the index evicts expired rows before every query
+    ]
+    return sorted(found, key=lambda announcement: (to_number(announcement["price"]), announcement["created_at"]))
+
+
+def main():
+    random.seed(3)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    now = datetime.now()
+    announcements = [make_announcement(number, now) for number in range(size)]
+    queries = [(*random.sample(region_names, 2), random.randrange(60_000, 150_000, 5_000), random.randint(1, 3))
+               for _ in range(200)]
+
+    start = time.perf_counter()
+    index = AnnouncementIndex()
+    index.add_many(announcements)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [index.query(a, b, max_price=price, min_seats=seats, limit=20) for a, b, price, seats in queries]
+    per_index = (time.perf_counter() - start) / len(queries) * 1000
+
+    scan_queries = queries[:20]
+    start = time.perf_counter()
+    scanned = [full_scan(announcements, a, b, price, seats)[:20] for a, b, price, seats in scan_queries]
+    per_scan = (time.perf_counter() - start) / len(scan_queries) * 1000
+
+    for expected, got in zip(scanned, indexed):
+        assert [to_number(a["price"]) for a in expected] == [to_number(a["price"]) for a in got]
+
+    print(f"{size} announcements over {len(region_names)} regions")
+    print(f"index build:       {build:.2f} s")
+    print(f"indexed query:     {per_index:.3f} ms")
+    print(f"full scan query:   {per_scan:.3f} ms")
+    print(f"speed-up:          {per_scan / per_index:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark of JsonManager.write_file: the old truncate-and-dump path against
+the atomic temp-file + fsync + os.replace path and the group-commit journal.
+os.fsync is counted, so the table also shows the fsyncs (files and
+directories) of one atomic write and of one journaled burst of 100 records.
+
+Usage: python benchmarks/bench_atomic_writes.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from atomic_file import atomic_write_json  # noqa: E402
+from journal import GroupCommitJournal  # noqa: E402
+
+
+class FileManager:
+    def __init__(self, file_name):
+        self.file_name = file_name
+
+    def read_file(self):
+        with open(self.file_name, mode="r") as file:
+            return json.load(file)
+
+    def write_file(self, all_data):
+        atomic_write_json(self.file_name, all_data)
+
+
+def make_team(number):
+    return {
+        "Leader_name": f"Leader {number}",
+        "Leader_contact": f"leader{number}@gmail.com",
+        "Team_name": f"Team {number}",
+        "Other_participants": [f"Member {number}-{i}" for i in range(3)],
+    }
+
+
+def truncate_and_dump(file_name, all_data):
+    with open(file_name, mode="w") as file:
+        json.dump(all_data, file, indent=4)
+
+
+fsync_count = 0
+
+
+def counted_fsync(fd, fsync=os.fsync):
+    global fsync_count
+    fsync_count += 1
+    fsync(fd)
+
+
+os.fsync = counted_fsync
+
+
+def fsyncs_of(function):
+    """
+    This function returns how many times a call of function fsyncs
+    """
+    before = fsync_count
+    function()
+    return fsync_count - before
+
+
+def rate(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return repeats / (time.perf_counter() - start)
+
+
+def main():
+    burst = 100
+    print(f"{'records':>8} {'truncate+dump w/s':>18} {'atomic+fsync w/s':>17} {'fsyncs/write':>13} "
+          f"{'journal teams/s':>16} {'fsyncs/burst':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "participants.json")
+        for size in (1_000, 10_000, 100_000):
+            all_data = [make_team(i) for i in range(size)]
+            repeats = max(3, 30_000 // size)
+            old = rate(lambda: truncate_and_dump(file_name, all_data), repeats)
+            new = rate(lambda: atomic_write_json(file_name, all_data), repeats)
+            write_fsyncs = fsyncs_of(lambda: atomic_write_json(file_name, all_data))
+
+            truncate_and_dump(file_name, all_data)
+            manager = FileManager(file_name)
+            start, before = time.perf_counter(), fsync_count
+            with GroupCommitJournal(manager) as journal:
+                for i in range(burst):
+                    journal.add(make_team(size + i))
+            grouped = burst / (time.perf_counter() - start)
+            burst_fsyncs = fsync_count - before
+
+            print(f"{size:>8} {old:>18.1f} {new:>17.1f} {write_fsyncs:>13} {grouped:>16.1f} {burst_fsyncs:>13}")
+
+
+if __name__ == "__main__":
+    main()
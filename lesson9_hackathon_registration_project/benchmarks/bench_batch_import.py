@@ -0,0 +1,98 @@
+"""
+Benchmark of the batch import: generates team, scooter and taxi announcement
+files (CSV and JSON Lines, one row in 50 broken on purpose) in a temporary
+directory and imports each into a .json, .jsonl and .db target with one bulk
+commit per import.
+
+Usage: python benchmarks/bench_batch_import.py [rows]
+"""
+import csv
+import os
+import random
+import string
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_import  # noqa: E402
+from serializer import dumps  # noqa: E402
+
+
+def team_row(number):
+    row = {
+        "Leader_name": f"leader {number}",
+        "Leader_contact": f"leader{number}@gmail.com",
+        "Team_name": "".join(random.choices(string.ascii_lowercase, k=12)),  # unlike the other names, see fuzzy_names
+        "Other_participants": ";".join(f"member {number}-{i}" for i in range(random.randint(2, 4))),
+    }
+    if number % 50 == 0:
+        row["Leader_contact"] = f"leader{number}@example.com"
+    return row
+
+
+def scooter_row(number):
+    row = {
+        "id": number + 1,
+        "battery": random.randint(0, 100),
+        "location": "Tashkent",
+        "model_name": "m12",
+        "price_per_minute": random.randrange(500, 3000, 100),
+        "latitude": round(random.uniform(41.2, 41.4), 6),
+        "longitude": round(random.uniform(69.1, 69.4), 6),
+    }
+    if number % 50 == 0:
+        row["battery"] = "full"
+    return row
+
+
+def announcement_row(number):
+    row = {
+        "from_place": random.randint(1, 13),
+        "to_place": random.randint(1, 13),
+        "price": random.randrange(50_000, 300_000, 5_000),
+        "expire_time": 6,
+        "car_name": "Cobalt",
+        "seats": random.randint(1, 4),
+        "comment": "",
+    }
+    if row["to_place"] == row["from_place"]:
+        row["to_place"] = row["from_place"] % 13 + 1
+    if number % 50 == 0:
+        row["from_place"] = 14
+    return row
+
+
+def write_input(file_name, rows):
+    with open(file_name, mode="w", encoding="utf-8", newline="") as file:
+        if file_name.endswith(".jsonl"):
+            for row in rows:
+                file.write(dumps(row) + "\n")
+        else:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def main():
+    random.seed(15)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    makers = {"teams": team_row, "scooters": scooter_row, "announcements": announcement_row}
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)  # the scooter id counter and lock files go here
+        for kind, make_row in makers.items():
+            rows = [make_row(number) for number in range(size)]
+            for input_format in ("csv", "jsonl"):
+                input_file = os.path.join(directory, f"{kind}.{input_format}")
+                write_input(input_file, rows)
+                for target_format in ("json", "jsonl", "db"):
+                    target = os.path.join(directory, f"{kind}-{input_format}.{target_format}")
+                    report = batch_import.import_rows(kind, input_file, target)
+                    print(f"{kind:13} {input_format:5} -> {target_format:5}: {report['written']:7} written, "
+                          f"{len(report['errors']):5} errors, {report['seconds']:6.2f} s, "
+                          f"{report['rows_per_second']:9,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
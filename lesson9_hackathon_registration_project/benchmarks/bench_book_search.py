@@ -0,0 +1,104 @@
+"""
+Benchmark of book search over a generated catalog of 1M titles: the word
+index and prefix trie of BookIndex against a linear scan that checks
+`query in title.lower()` for every book and stops at the first limit matches.
+Queries range from common words to rare and missing ones, with unfinished
+last words as a user types them. Also times incremental adds and removes.
+
+Usage: python benchmarks/bench_book_search.py [books] [repeats]
+"""
+import itertools
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_catalog import BookIndex, fold  # noqa: E402
+
+limit = 10
+accented = ["Ötkan", "Kunlar", "Misérables", "Señor", "Über", "Ça", "Øresund", "Mehrobdan", "Chayon", "O‘zbek"]
+
+
+def make_vocabulary(size):
+    words = set(accented)
+    while len(words) < size:
+        words.add("".join(random.choices(string.ascii_lowercase, k=random.randint(3, 10))).title())
+    return sorted(words)
+
+
+def make_book(number, vocabulary, cumulative_weights):
+    return {
+        "id": number,
+        "title": " ".join(random.choices(vocabulary, cum_weights=cumulative_weights, k=random.randint(2, 6))),
+        "author": "",
+        "price": 10,
+        "quantity": 1,
+    }
+
+
+def linear_search(books, query):
+    query = query.lower()
+    found = []
+    for book in books:
+        if query in book['title'].lower():
+            found.append(book)
+            if len(found) >= limit:
+                break
+    return found
+
+
+def timed(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = function()
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+
+def main():
+    random.seed(21)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    vocabulary = make_vocabulary(50_000)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]  # a few words are very common
+    random.shuffle(weights)
+    weights = list(itertools.accumulate(weights))
+    books = [make_book(number, vocabulary, weights) for number in range(1, size + 1)]
+
+    start = time.perf_counter()
+    index = BookIndex()
+    index.add_many(books)
+    print(f"{size:,} books, {len(index.trie):,} distinct words, index built in {time.perf_counter() - start:.1f} s")
+
+    by_frequency = sorted(index.postings, key=lambda word: len(index.postings[word]))
+    common, rare = by_frequency[-1], by_frequency[len(by_frequency) // 2]
+    queries = [
+        (common, "common word"),
+        (common[:2], "prefix of a common word"),
+        (rare, "rare word"),
+        (rare[:-2], "unfinished rare word"),
+        (f"{common} {rare[:4]}", "two words, second unfinished"),
+        ("kunlar", "accented title word"),
+        ("qqqzz", "missing word"),
+    ]
+    print(f"{'query':44} {'linear scan':>12} {'index':>10} {'speedup':>9}")
+    for query, name in queries:
+        linear_ms, _ = timed(lambda: linear_search(books, query), 1)
+        index_ms, found = timed(lambda: index.search(query, limit), repeats)
+        words = fold(query).split()
+        assert all(any(word.startswith(words[-1]) for word in index.words[book['id']]) for book in found)
+        print(f"{name + ' ' + repr(query):44} {linear_ms:10.2f} ms {index_ms:7.3f} ms {linear_ms / index_ms:8.0f}x")
+
+    complete_ms, _ = timed(lambda: index.complete(rare[:3]), repeats * 100)
+    print(f"type-ahead words for {rare[:3]!r}: {complete_ms:.3f} ms")
+
+    extra = [make_book(number, vocabulary, weights) for number in range(size + 1, size + 10_001)]
+    add_ms, _ = timed(lambda: [index.add(book) for book in extra], 1)
+    remove_ms, _ = timed(lambda: [index.remove(book['id']) for book in extra], 1)
+    print(f"incremental add: {add_ms / len(extra) * 1000:.1f} us per book, remove: {remove_ms / len(extra) * 1000:.1f} us per book")
+
+
+if __name__ == "__main__":
+    main()
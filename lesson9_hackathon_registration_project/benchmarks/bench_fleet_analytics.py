@@ -0,0 +1,98 @@
+"""
+Benchmark of fleet statistics: low-battery count, battery distribution and
+price percentiles per (location, model) over the column arrays of
+FleetAnalytics against a pure Python loop over the scooter dicts returned by
+get_all_data(). The column backend is NumPy when it is installed.
+
+Usage: python benchmarks/bench_fleet_analytics.py [scooters] [repeats]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fleet_analytics  # noqa: E402
+from fleet_analytics import FleetAnalytics, interpolate  # noqa: E402
+
+locations = ["Tashkent", "Samarkand", "Bukhara", "Andijan", "Namangan", "Fergana", "Khiva", "Nukus"]
+models = ["m12", "m14", "x1", "x2", "pro"]
+bins = (0, 20, 40, 60, 80, 100)
+
+
+def make_scooter(number):
+    return {
+        "id": number,
+        "battery": random.randint(0, 100),
+        "location": random.choice(locations),
+        "model_name": random.choice(models),
+        "price_per_minute": random.randrange(500, 3000, 100),
+    }
+
+
+def loop_statistics(scooters, threshold=20):
+    low_battery = 0
+    counts = [0] * (len(bins) - 1)
+    groups = {}
+    for scooter in scooters:
+        battery = float(scooter['battery'])
+        if battery < threshold:
+            low_battery += 1
+        for position in range(len(bins) - 1):
+            if bins[position] <= battery < bins[position + 1] or position == len(bins) - 2 and battery == bins[-1]:
+                counts[position] += 1
+                break
+        groups.setdefault((scooter['location'], scooter['model_name']), []).append(float(scooter['price_per_minute']))
+    percentiles = {}
+    for key, prices in groups.items():
+        prices.sort()
+        percentiles[key] = {percentile: interpolate(prices, percentile) for percentile in (25, 50, 75, 90)}
+    return low_battery, counts, percentiles
+
+
+def column_statistics(analytics, threshold=20):
+    return (
+        analytics.low_battery_count(threshold),
+        [count for _, _, count in analytics.battery_distribution(bins)],
+        analytics.price_percentiles(),
+    )
+
+
+def timed(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = function()
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+
+def main():
+    random.seed(18)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    scooters = [make_scooter(number) for number in range(1, size + 1)]
+
+    build_ms, analytics = timed(lambda: FleetAnalytics(scooters), 1)
+    loop_ms, loop_result = timed(lambda: loop_statistics(scooters), repeats)
+    first_ms, column_result = timed(lambda: column_statistics(analytics), 1)
+    column_ms, _ = timed(lambda: column_statistics(analytics), repeats)
+
+    assert loop_result[:2] == column_result[:2]
+    assert all(abs(loop_result[2][key][50] - column_result[2][key][50]) < 1e-6 for key in loop_result[2])
+
+    backend = "numpy" if fleet_analytics.numpy is not None else "python fallback (numpy not installed)"
+    print(f"{size:,} scooters, column backend: {backend}")
+    print(f"building the column arrays (once per file change): {build_ms:8.1f} ms")
+    print(f"python loop over get_all_data() dicts:             {loop_ms:8.1f} ms")
+    print(f"column queries, first call (sorts prices once):    {first_ms:8.1f} ms ({loop_ms / first_ms:.1f}x)")
+    print(f"column queries, later calls:                       {column_ms:8.1f} ms ({loop_ms / column_ms:.1f}x)")
+    for name, query in (
+        ("low_battery_count", lambda: analytics.low_battery_count()),
+        ("battery_distribution", lambda: analytics.battery_distribution(bins)),
+        ("price_percentiles by location+model", lambda: analytics.price_percentiles()),
+    ):
+        print(f"  {name:36} {timed(query, repeats)[0]:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
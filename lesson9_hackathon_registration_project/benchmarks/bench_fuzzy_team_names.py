@@ -0,0 +1,128 @@
+"""
+Benchmark of near-duplicate team name detection at 100k team names.
+
+Registers synthetic teams, then looks up misspelled, respaced and
+re-cased copies of some of them ("Code Ninjas" -> "Kode Ninjas",
+"CodeNinjas", "code ninjsa") with find_similar_teams(). Reports how many
+candidates the trigram blocking leaves out of N, the lookup latency, how
+often the original team is found, how many unrelated names are flagged,
+and the time of a full sweep of all N names for near duplicates against
+the estimated time of comparing every pair.
+
+Usage: python benchmarks/bench_fuzzy_team_names.py [teams] [queries]
+"""
+import math
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Hackhaton  # noqa: E402
+from fuzzy_names import compact, jaro_winkler, ngrams  # noqa: E402
+
+adjectives = ["Code", "Data", "Smart", "Quantum", "Pixel", "Cyber", "Rapid", "Silent", "Bright", "Neural", "Binary", "Cloud",
+              "Iron", "Golden", "Crimson", "Lunar", "Solar", "Hyper", "Agile", "Clever", "Electric", "Atomic", "Frozen", "Wild"]
+nouns = ["Ninjas", "Wizards", "Hackers", "Coders", "Owls", "Tigers", "Falcons", "Builders", "Dreamers", "Pioneers", "Rangers",
+         "Knights", "Panthers", "Makers", "Bytes", "Rockets", "Sharks", "Wolves", "Eagles", "Minds", "Bots", "Squad", "Crew"]
+
+
+def random_word():
+    length = random.randint(4, 9)
+    return "".join(random.choice(string.ascii_lowercase) for _ in range(length)).title()
+
+
+def make_names(size):
+    names = {}
+    while len(names) < size:
+        parts = [random.choice(adjectives), random.choice(nouns), random_word()]
+        if random.random() < 0.5:
+            parts.insert(random.randint(0, 2), random_word())
+        name = " ".join(parts)
+        names.setdefault(compact(name), name)
+    return list(names.values())
+
+
+def misspell(name):
+    """
+    This function returns the name with one typo, the spaces removed or the case changed
+    """
+    kind = random.randrange(5)
+    position = random.randrange(1, len(name) - 1)
+    if kind == 0:  # swapped letters
+        return name[:position] + name[position + 1] + name[position] + name[position + 2:]
+    if kind == 1:  # missing letter
+        return name[:position] + name[position + 1:]
+    if kind == 2:  # extra letter
+        return name[:position] + random.choice(string.ascii_lowercase) + name[position:]
+    if kind == 3:  # wrong letter
+        return name[:position] + random.choice(string.ascii_lowercase) + name[position + 1:]
+    return name.replace(" ", "") if random.random() < 0.5 else name.upper()
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def main():
+    random.seed(25)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        names = make_names(size)
+        Hackhaton.get_json_manager().add_many(
+            {"Leader_name": f"Leader {number}", "Leader_contact": f"leader{number}@gmail.com", "Team_name": name,
+             "Other_participants": [f"Member {number}-1", f"Member {number}-2"]}
+            for number, name in enumerate(names)
+        )
+        cache = Hackhaton.get_participants_cache()
+        start = time.perf_counter()
+        cache.refresh()
+        print(f"{size:,} team names, {len(cache.indexes['team_grams']):,} distinct trigrams, "
+              f"indexes built in {time.perf_counter() - start:.1f} s")
+
+        originals = random.sample(names, queries)
+        latencies, candidates, found = [], [], 0
+        for original in originals:
+            query = misspell(original)
+            grams = ngrams(compact(query))
+            candidates.append(len(cache.find_overlapping('team_grams', grams, min(math.ceil(0.6 * len(grams)), len(grams) - 3))))
+            start = time.perf_counter()
+            similar = Hackhaton.find_similar_teams(query)
+            latencies.append(time.perf_counter() - start)
+            found += any(team['Team_name'] == original for _, team in similar)
+
+        unrelated = [random.choice(adjectives) + " " + random.choice(nouns) + " " + random_word() for _ in range(queries)]
+        false_alarms = sum(bool(Hackhaton.find_similar_teams(name)) for name in unrelated)
+
+        print(f"misspelled lookups: found the original {found / queries:.1%} of the time")
+        print(f"  candidates after blocking: avg {sum(candidates) / queries:.1f}, max {max(candidates)} of {size:,}")
+        print(f"  latency p50 {percentile(latencies, 0.5) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms")
+        print(f"new unrelated names flagged as near duplicates: {false_alarms / queries:.1%}")
+
+        start = time.perf_counter()
+        pairs = set()
+        for name in names:
+            for _, team in Hackhaton.find_similar_teams(name):
+                if team['Team_name'] != name:
+                    pairs.add(frozenset((name, team['Team_name'])))
+        sweep = time.perf_counter() - start
+
+        sample = [(compact(random.choice(names)), compact(random.choice(names))) for _ in range(20_000)]
+        start = time.perf_counter()
+        for first, second in sample:
+            jaro_winkler(first, second)
+        all_pairs = (time.perf_counter() - start) / len(sample) * size * (size - 1) / 2
+        print(f"near-duplicate sweep of all {size:,} names: {sweep:.1f} s, {len(pairs):,} pairs flagged; "
+              f"comparing every pair would take ~{all_pairs / 3600:.1f} h")
+        os.chdir(os.path.dirname(directory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark of listing teams: read_file() (whole list in memory) against the
+streaming iter_records() API. Reports time to first row, total time and peak
+memory for JSON and JSON Lines files.
+
+Usage: python benchmarks/bench_iter_records.py [records]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jsonl_manager import JsonLinesManager  # noqa: E402
+from storage import JsonManager  # noqa: E402
+
+
+def make_team(number):
+    return {
+        "Leader_name": f"Leader {number}",
+        "Leader_contact": f"leader{number}@gmail.com",
+        "Team_name": f"Team {number}",
+        "Other_participants": [f"Member {number}-{i}" for i in range(3)],
+    }
+
+
+def measure(records):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_row = None
+    for _ in records():
+        if first_row is None:
+            first_row = time.perf_counter() - start
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first_row * 1000, total, peak / 1024 / 1024
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    all_data = [make_team(i) for i in range(size)]
+    print(f"{size} records")
+    print(f"{'manager':>16} {'api':>14} {'first row ms':>13} {'total s':>8} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        managers = [
+            ("JsonManager", JsonManager(os.path.join(directory, "participants.json"))),
+            ("JsonLinesManager", JsonLinesManager(os.path.join(directory, "participants.jsonl"))),
+        ]
+        for name, manager in managers:
+            manager.write_file(all_data)
+        del all_data
+
+        for name, manager in managers:
+            for api, records in (("read_file", manager.read_file), ("iter_records", manager.iter_records)):
+                first_row, total, peak = measure(records)
+                print(f"{name:>16} {api:>14} {first_row:>13.2f} {total:>8.2f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of logins against a credential store of 100k users: username lookup
+through the record cache, first logins that run scrypt (at a cheap test cost
+and at the default cost), repeat logins served by the remembered-login cache,
+and wrong passwords.
+
+The users are registered with one bulk write at the cheap cost, otherwise
+hashing 100k passwords at the default cost would take over an hour.
+
+Usage: python benchmarks/bench_logins.py [users] [logins]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from credentials import CredentialStore, default_cost  # noqa: E402
+
+cheap_cost = 2 ** 4
+
+
+def rate(function, count):
+    start = time.perf_counter()
+    results = [function(number) for number in range(count)]
+    seconds = time.perf_counter() - start
+    return count / seconds, results
+
+
+def main():
+    random.seed(19)
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    logins = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = storage.JsonManager(os.path.join(directory, "clients.json"))
+        start = time.perf_counter()
+        CredentialStore(manager, cost=cheap_cost).register_many(
+            [(f"user{number}", f"password{number}") for number in range(users)]
+        )
+        print(f"registered {users:,} users in {time.perf_counter() - start:.1f} s (cost {cheap_cost})")
+
+        store = CredentialStore(manager, cost=cheap_cost, max_sessions=users)
+        start = time.perf_counter()
+        store.find_user("user0")
+        print(f"loading the username index once: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        names = [random.randrange(users) for _ in range(logins)]
+        per_second, _ = rate(lambda n: store.find_user(f"user{names[n]}"), logins)
+        print(f"username lookups:                      {per_second:12,.0f} /s")
+
+        per_second, results = rate(lambda n: store.authenticate(f"user{names[n]}", f"password{names[n]}"), logins)
+        assert all(results)
+        print(f"first logins, scrypt N={cheap_cost:<6}          {per_second:12,.0f} /s")
+
+        per_second, results = rate(lambda n: store.authenticate(f"user{names[n]}", f"password{names[n]}"), logins)
+        assert all(results)
+        print(f"repeat logins (remembered):            {per_second:12,.0f} /s")
+
+        per_second, results = rate(lambda n: store.authenticate(f"user{names[n]}", "wrong"), logins)
+        assert not any(results)
+        print(f"wrong passwords of remembered users:   {per_second:12,.0f} /s")
+
+        slow = CredentialStore(storage.JsonManager(os.path.join(directory, "admins.json")), cost=default_cost)
+        slow.register("admin", "secret")
+        count = 20
+        per_second, results = rate(lambda n: slow.authenticate("admin", "secret") and slow.forget("admin") is None, count)
+        assert all(results)
+        print(f"first logins, scrypt N={default_cost:<6}          {per_second:12,.1f} /s")
+        per_second, _ = rate(lambda n: slow.authenticate("admin", "secret"), logins)
+        print(f"repeat logins at N={default_cost} (remembered): {per_second:12,.0f} /s")
+
+
+if __name__ == "__main__":
+    main()
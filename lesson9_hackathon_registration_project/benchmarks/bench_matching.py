@@ -0,0 +1,69 @@
+"""
+Throughput of MatchingEngine for 10k riders x 10k drivers: half of the taxis
+are posted first, then all client requests are matched as one batch, then
+the other half of the taxis arrive and serve the clients still waiting.
+
+Usage: python benchmarks/bench_matching.py [riders] [drivers]
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project)
+sys.path.insert(0, os.path.join(project, "taxi_project"))
+
+from matching import MatchingEngine  # noqa: E402
+from regions import region_names  # noqa: E402
+
+
+def make_announcement(now, with_car):
+    from_place, to_place = random.sample(region_names[:5], 2)
+    announcement = {
+        "from_place": from_place,
+        "to_place": to_place,
+        "price": str(random.randrange(80_000, 200_000, 10_000)),
+        "expire_time": "5",
+        "is_active": True,
+        "created_at": str(now),
+        "seats": str(random.randint(1, 4) if with_car else random.randint(1, 2)),
+    }
+    if with_car:
+        announcement.update(car_name="Cobalt", comment="")
+    return announcement
+
+
+def main():
+    random.seed(11)
+    riders = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    drivers = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    now = datetime.now()
+    taxis = [make_announcement(now, True) for _ in range(drivers)]
+    clients = [make_announcement(now, False) for _ in range(riders)]
+    seats_before = sum(int(taxi["seats"]) for taxi in taxis)
+
+    engine = MatchingEngine()
+    start = time.perf_counter()
+    matches = []
+    for taxi in taxis[:drivers // 2]:
+        matches.extend(engine.add_taxi(taxi))
+    matches.extend(engine.match_batch(clients))
+    for taxi in taxis[drivers // 2:]:
+        matches.extend(engine.add_taxi(taxi))
+    elapsed = time.perf_counter() - start
+
+    seats_sold = sum(match["seats"] for match in matches)
+    seats_left = sum(int(taxi["seats"]) for taxi in taxis)
+    assert seats_before - seats_left == seats_sold, "seats were lost or sold twice"
+    assert all(match["price_per_seat"] <= float(match["client"]["price"]) for match in matches)
+    assert len({id(match["client"]) for match in matches}) == len(matches), "a client was matched twice"
+
+    print(f"{riders} riders x {drivers} drivers")
+    print(f"matched: {len(matches)}, still waiting: {engine.waiting_count()}, seats sold: {seats_sold}")
+    print(f"total time: {elapsed * 1000:.0f} ms, {(riders + drivers) / elapsed:,.0f} announcements/s")
+
+
+if __name__ == "__main__":
+    main()
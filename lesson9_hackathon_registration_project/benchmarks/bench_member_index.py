@@ -0,0 +1,89 @@
+"""
+Benchmark of participant lookups at 100k teams: "which team is this person
+on?" and "has this email registered a team?" through the member and contact
+indexes of the record cache, against walking every team and every member.
+Also times registering and removing a team, and the first lookup after the
+change, which no longer reloads the file.
+
+Usage: python benchmarks/bench_member_index.py [teams] [lookups]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Hackhaton  # noqa: E402
+from text_folding import normalize_name  # noqa: E402
+
+first_names = ["Aziz", "Jane", "Bob", "Dilnoza", "Sardor", "Kamila", "Timur", "Malika", "Olim", "Zarina", "Jasur", "Nodira"]
+
+
+def make_team(number):
+    names = [f"{random.choice(first_names)} {number}-{member}" for member in range(random.randint(3, 5))]
+    return {
+        "Leader_name": names[0],
+        "Leader_contact": f"leader{number}@gmail.com",
+        "Team_name": f"Team {number}",
+        "Other_participants": names[1:],
+    }
+
+
+def linear_find(teams, name):
+    name = normalize_name(name)
+    for team in teams:
+        if normalize_name(team['Leader_name']) == name or any(normalize_name(member) == name for member in team['Other_participants']):
+            return team
+    return None
+
+
+def timed(function, count=1):
+    start = time.perf_counter()
+    for _ in range(count):
+        result = function()
+    return (time.perf_counter() - start) / count * 1000, result
+
+
+def main():
+    random.seed(24)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        teams = [make_team(number) for number in range(size)]
+        Hackhaton.get_json_manager().add_many(teams)
+        cache = Hackhaton.get_participants_cache()
+
+        load_ms, _ = timed(cache.refresh)
+        print(f"{size:,} teams, {len(cache.indexes['member']):,} members, indexes built in {load_ms:.0f} ms")
+
+        people = [random.choice([team['Leader_name'], *team['Other_participants']]).upper() for team in random.sample(teams, lookups)]
+        start = time.perf_counter()
+        found = [Hackhaton.find_member_team(person) for person in people]
+        index_us = (time.perf_counter() - start) / lookups * 1e6
+        assert all(team is not None and normalize_name(person) in Hackhaton.team_members(team) for person, team in zip(people, found))
+        miss_us = timed(lambda: Hackhaton.find_member_team("Nobody Here"), lookups)[0] * 1000
+        contact_us = timed(lambda: cache.exists('contact', "LEADER42@gmail.com".casefold()), lookups)[0] * 1000
+        scan_ms, _ = timed(lambda: linear_find(teams, "Nobody Here"))
+        print(f"member lookup (hit):           {index_us:8.2f} us")
+        print(f"member lookup (miss):          {miss_us:8.2f} us")
+        print(f"contact lookup:                {contact_us:8.2f} us")
+        print(f"walking every team and member: {scan_ms * 1000:8.0f} us ({scan_ms * 1000 / miss_us:,.0f}x slower)")
+
+        new_team = make_team(size)
+        add_ms, _ = timed(lambda: cache.add(new_team))
+        after_add_ms, team = timed(lambda: Hackhaton.find_member_team(new_team['Other_participants'][0]))
+        assert team is new_team
+        remove_ms, _ = timed(lambda: cache.remove('Team_name', new_team['Team_name']))
+        after_remove_ms, team = timed(lambda: Hackhaton.find_member_team(new_team['Other_participants'][0]))
+        assert team is None
+        print(f"register a team (file write included): {add_ms:6.1f} ms, next lookup {after_add_ms * 1000:.1f} us")
+        print(f"remove a team (file write included):   {remove_ms:6.1f} ms, next lookup {after_remove_ms * 1000:.1f} us")
+        os.chdir(os.path.dirname(directory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Memory benchmark of the in-memory record types: bytes per record, measured
+with tracemalloc, for records kept as the dicts parsed from the data files
+against __slots__ objects (Scooter, Participant, TaxiAnnouncement) and the
+columnar ScooterColumns store.
+
+Usage: python benchmarks/bench_model_memory.py [records]
+"""
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project)
+sys.path.insert(0, os.path.join(project, "taxi_project"))
+
+from announcement_models import TaxiAnnouncement  # noqa: E402
+from models import Participant, Scooter, ScooterColumns  # noqa: E402
+from regions import region_names  # noqa: E402
+from serializer import dumps, loads  # noqa: E402
+
+
+def scooter_lines(size):
+    random.seed(17)
+    for number in range(1, size + 1):
+        yield dumps({
+            "id": number,
+            "battery": str(random.randint(0, 100)),
+            "location": random.choice(["Tashkent", "Samarkand", "Bukhara"]),
+            "model_name": random.choice(["m12", "m14", "x1"]),
+            "price_per_minute": str(random.randrange(500, 3000, 100)),
+            "latitude": round(random.uniform(41.2, 41.4), 6),
+            "longitude": round(random.uniform(69.1, 69.4), 6),
+        })
+
+
+def team_lines(size):
+    random.seed(17)
+    for number in range(size):
+        yield dumps({
+            "Leader_name": f"Leader {number}",
+            "Leader_contact": f"leader{number}@gmail.com",
+            "Team_name": f"Team {number}",
+            "Other_participants": [f"Member {number}-{i}" for i in range(random.randint(2, 4))],
+        })
+
+
+def announcement_lines(size):
+    random.seed(17)
+    for _ in range(size):
+        yield dumps(TaxiAnnouncement(
+            random.choice(region_names[:6]), random.choice(region_names[6:]),
+            str(random.randrange(50_000, 300_000, 5_000)), "Cobalt", "", "6", str(random.randint(1, 4)),
+        ).formatting_announcement())
+
+
+def measure(lines, build):
+    """
+    This function returns the bytes kept by build(records parsed from lines) and the time it took
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = build(loads(line) for line in lines)
+    seconds = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current, seconds
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    cases = [
+        ("scooters", scooter_lines, "dict", list),
+        ("scooters", scooter_lines, "Scooter (__slots__)", lambda records: [Scooter.from_record(data) for data in records]),
+        ("scooters", scooter_lines, "ScooterColumns", ScooterColumns),
+        ("teams", team_lines, "dict", list),
+        ("teams", team_lines, "Participant (__slots__)", lambda records: [Participant.from_record(data) for data in records]),
+        ("announcements", announcement_lines, "dict", list),
+        ("announcements", announcement_lines, "TaxiAnnouncement (__slots__)", lambda records: [TaxiAnnouncement.from_record(data) for data in records]),
+    ]
+
+    print(f"{size:,} records of each kind")
+    for kind, make_lines, name, build in cases:
+        lines = list(make_lines(size))
+        used, seconds = measure(lines, build)
+        del lines
+        print(f"{kind:14} {name:30} {used / size:8.1f} bytes/record {used / 2 ** 20:9.1f} MiB  ({seconds:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
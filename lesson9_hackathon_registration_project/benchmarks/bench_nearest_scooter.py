@@ -0,0 +1,75 @@
+"""
+Benchmark of "K nearest scooters with battery above X within R meters":
+ScooterGridIndex against a linear scan over all scooters, like the one
+rent_scooter did over get_all_data().
+
+Usage: python benchmarks/bench_nearest_scooter.py [scooters]
+"""
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scooter_index import ScooterGridIndex, haversine_m, scooter_battery  # noqa: E402
+
+
+def make_scooter(number):
+    return {
+        "id": number,
+        "battery": str(random.randint(0, 100)),
+        "location": "Tashkent",
+        "model_name": random.choice(["m12", "m365", "pro2"]),
+        "price_per_minute": str(random.randint(500, 1500)),
+        "latitude": 41.31 + random.uniform(-0.12, 0.12),
+        "longitude": 69.27 + random.uniform(-0.16, 0.16),
+    }
+
+
+def linear_nearest(scooters, latitude, longitude, k, min_battery, radius_m):
+    found = []
+    for scooter in scooters:
+        if scooter_battery(scooter) < min_battery:
+            continue
+        distance = haversine_m(latitude, longitude, scooter["latitude"], scooter["longitude"])
+        if distance <= radius_m:
+            found.append((distance, scooter["id"]))
+    return heapq.nsmallest(k, found)
+
+
+def main():
+    random.seed(7)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    scooters = [make_scooter(i) for i in range(size)]
+    queries = [(41.31 + random.uniform(-0.1, 0.1), 69.27 + random.uniform(-0.14, 0.14)) for _ in range(200)]
+    k, min_battery, radius_m = 5, 30, 1000
+
+    start = time.perf_counter()
+    index = ScooterGridIndex()
+    for scooter in scooters:
+        index.add(scooter)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [index.nearest(lat, lon, k, min_battery, radius_m) for lat, lon in queries]
+    per_index_query = (time.perf_counter() - start) / len(queries) * 1000
+
+    linear_queries = queries[:20]
+    start = time.perf_counter()
+    linear = [linear_nearest(scooters, lat, lon, k, min_battery, radius_m) for lat, lon in linear_queries]
+    per_linear_query = (time.perf_counter() - start) / len(linear_queries) * 1000
+
+    for expected, got in zip(linear, indexed):
+        assert [scooter_id for _, scooter_id in expected] == [scooter["id"] for _, scooter in got]
+
+    print(f"{size} scooters, k={k}, battery>={min_battery}, radius={radius_m} m")
+    print(f"index build:        {build:.2f} s")
+    print(f"grid index query:   {per_index_query:.3f} ms")
+    print(f"linear scan query:  {per_linear_query:.3f} ms")
+    print(f"speed-up:           {per_linear_query / per_index_query:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Micro-benchmark of the JSON backends used by storage.JsonManager: encode and
+decode cost per 10k team records, next to the old json.dump(indent=4) path.
+
+Usage: python benchmarks/bench_serializers.py
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serializer import available_backends, dumps, loads  # noqa: E402
+
+
+def make_team(number):
+    return {
+        "Leader_name": f"Leader {number}",
+        "Leader_contact": f"leader{number}@gmail.com",
+        "Team_name": f"Team {number}",
+        "Other_participants": [f"Member {number}-{i}" for i in range(3)],
+    }
+
+
+def best_of(function, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    all_data = [make_team(i) for i in range(10_000)]
+    print(f"{'backend':>14} {'encode ms/10k':>14} {'decode ms/10k':>14} {'size KB':>8}")
+
+    text = json.dumps(all_data, indent=4)
+    encode = best_of(lambda: json.dumps(all_data, indent=4))
+    decode = best_of(lambda: json.loads(text))
+    print(f"{'json indent=4':>14} {encode:>14.2f} {decode:>14.2f} {len(text) / 1024:>8.0f}")
+
+    for backend in available_backends():
+        text = dumps(all_data, backend=backend)
+        encode = best_of(lambda: dumps(all_data, backend=backend))
+        decode = best_of(lambda: loads(text, backend=backend))
+        print(f"{backend:>14} {encode:>14.2f} {decode:>14.2f} {len(text) / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
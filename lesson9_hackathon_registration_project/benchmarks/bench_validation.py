@@ -0,0 +1,81 @@
+"""
+Benchmark of record validation: the old per-read key loop over every scooter
+record against the precompiled scooter schema, once cold and then on repeated
+reads of an unchanged file (served from the validated-records cache), plus
+the old endswith chain against the compiled email check.
+
+Usage: python benchmarks/bench_validation.py [records] [reads]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from validation import is_valid_email, scooter_schema, validated_records  # noqa: E402
+
+
+def old_validate_data(data):
+    required_keys = ['id', 'battery', 'location', 'model_name', 'price_per_minute']
+    for key in required_keys:
+        if key not in data:
+            return False
+    return True
+
+
+def old_is_valid_email(user_email):
+    return user_email.endswith('@gmail.com') or user_email.endswith('@mail.ru') or user_email.endswith('@yahoo.com')
+
+
+def make_record(number):
+    if number % 20 == 0:
+        return {"username": f"owner{number}", "password": "secret"}
+    return {
+        "id": number,
+        "battery": str(random.randint(0, 100)),
+        "location": "Tashkent",
+        "model_name": "m12",
+        "price_per_minute": str(random.randrange(500, 3000, 100)),
+    }
+
+
+def timed(function, repeats=1):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = function()
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+
+def main():
+    random.seed(16)
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    reads = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = storage.JsonManager(os.path.join(directory, "scooter_owners.json"))
+        manager.write_file([make_record(number) for number in range(1, size + 1)])
+
+        old_ms, old_valid = timed(lambda: [data for data in manager.read_file() if old_validate_data(data)], reads)
+        cold_ms, valid = timed(lambda: validated_records(manager, scooter_schema))
+        warm_ms, _ = timed(lambda: validated_records(manager, scooter_schema), reads)
+        records = manager.read_file()
+        batch_ms, _ = timed(lambda: scooter_schema.validate_many(records))
+
+        print(f"{size} records, {len(valid)} scooters ({len(old_valid)} with the old key check)")
+        print(f"old read + key loop per read:           {old_ms:8.1f} ms")
+        print(f"schema, first read (parse + validate):  {cold_ms:8.1f} ms")
+        print(f"schema, later reads of the same file:   {warm_ms:8.3f} ms")
+        print(f"validate_many on parsed records:        {batch_ms:8.1f} ms")
+
+    emails = [f"user{number}@{random.choice(['gmail.com', 'mail.ru', 'yahoo.com', 'example.com'])}" for number in range(size)]
+    old_ms, old_count = timed(lambda: sum(map(old_is_valid_email, emails)))
+    new_ms, new_count = timed(lambda: sum(map(is_valid_email, emails)))
+    print(f"emails, endswith chain:                 {old_ms:8.1f} ms ({old_count} valid)")
+    print(f"emails, compiled regex + frozenset:     {new_ms:8.1f} ms ({new_count} valid)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Contention benchmark of book purchases: hundreds of buyer threads, spread
+over several processes, try to buy copies of one hot title and of a few
+ordinary ones at the same time. Every process has its own Inventory over the
+same books file and ledger, like several shop terminals would. At the end
+the ledger must show exactly the sold copies, no title may be sold more
+times than it was in stock, and no process may have seen less stock than
+is really left. Reports purchases per second and p50/p99 latency of
+purchase().
+
+Usage: python benchmarks/contention_book_purchases.py [processes] [threads_per_process] [tries_per_thread]
+"""
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_catalog import BookCatalog, BookManager  # noqa: E402
+from book_inventory import Inventory, PurchaseError  # noqa: E402
+from jsonl_manager import JsonLinesManager  # noqa: E402
+
+hot_stock = 2_000
+other_titles = 20
+other_stock = 100
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def open_inventory(directory):
+    catalog = BookCatalog(BookManager(os.path.join(directory, "books.json")))
+    return Inventory(catalog, JsonLinesManager(os.path.join(directory, "inventory.jsonl")))
+
+
+def buyers(directory, process, threads, tries, results):
+    inventory = open_inventory(directory)
+    latencies = []
+    bought = []
+    start_line = threading.Barrier(threads)
+
+    def buyer(number):
+        random.seed(process * 10_000 + number)
+        my_latencies = []
+        my_bought = 0
+        start_line.wait()
+        for _ in range(tries):
+            book_id = 1 if random.random() < 0.8 else random.randint(2, other_titles + 1)  # most buyers want the hot title
+            start = time.perf_counter()
+            try:
+                inventory.purchase(f"buyer{process}-{number}", book_id)
+                my_bought += 1
+            except PurchaseError:
+                pass
+            my_latencies.append(time.perf_counter() - start)
+        latencies.extend(my_latencies)
+        bought.append(my_bought)
+
+    workers = [threading.Thread(target=buyer, args=(number,)) for number in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put((sum(bought), latencies, [inventory.stock(book_id) for book_id in range(1, other_titles + 2)]))
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    tries = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+
+    with tempfile.TemporaryDirectory() as directory:
+        catalog = open_inventory(directory).catalog
+        catalog.add_book("Hot Title", "Author", 10, hot_stock)
+        for number in range(other_titles):
+            catalog.add_book(f"Title {number}", "Author", 10, other_stock)
+
+        results = multiprocessing.Queue()
+        start = time.perf_counter()
+        workers = [
+            multiprocessing.Process(target=buyers, args=(directory, process, threads, tries, results))
+            for process in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        reports = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        seconds = time.perf_counter() - start
+
+        bought = sum(report[0] for report in reports)
+        latencies = [latency for report in reports for latency in report[1]]
+        inventory = open_inventory(directory)
+        stocks = [inventory.stock(book_id) for book_id in range(1, other_titles + 2)]
+        sold = sum(-entry['change'] for entry in JsonLinesManager(inventory.ledger.file_name).iter_records())
+
+        print(f"{processes} processes x {threads} buyer threads, {len(latencies):,} purchase attempts in {seconds:.1f} s")
+        print(f"bought {bought:,} copies ({bought / seconds:,.0f} purchases/s), ledger shows {sold:,} sold")
+        print(f"purchase() latency p50 {percentile(latencies, 0.5) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms")
+        print(f"stock left: hot title {stocks[0]} of {hot_stock}, other titles {sum(stocks[1:])} of {other_titles * other_stock}")
+
+        assert min(stocks) >= 0, "a title was oversold"
+        assert bought == sold == hot_stock + other_titles * other_stock - sum(stocks)
+        assert all(seen >= left for report in reports for seen, left in zip(report[2], stocks)), "a process saw too little stock"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Load test of api_server.py: starts the server in a separate process on a
+temporary copy of the data files and drives it with 1 to 500 concurrent
+keep-alive clients. The request mix is mostly reads (taxi route filters,
+nearest scooters) with client announcements and team registrations as
+writes. Reports requests per second and p50/p95/p99/max latency per level.
+
+Usage: python benchmarks/load_test_api.py [seconds_per_level] [levels...]
+    e.g. python benchmarks/load_test_api.py 3 1 10 50 100 250 500
+"""
+import asyncio
+import base64
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project)
+
+taxi_auth = "Basic " + base64.b64encode(b"driver:secret").decode()
+team_numbers = itertools.count()
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def seed(directory):
+    """
+    This function fills the temporary folder with accounts, scooters and taxi announcements
+    """
+    os.makedirs(os.path.join(directory, "taxi_project"))
+    os.chdir(directory)
+    import api_server
+    import storage
+    from announcement_models import TaxiAnnouncement
+    from credentials import get_credential_store
+    from regions import region_names
+    from scooter import get_scooter_manager
+
+    random.seed(23)
+    get_credential_store(storage.JsonManager(api_server.taxi_users_file)).register("driver", "secret")
+    get_scooter_manager().add_many([
+        {"id": number, "battery": random.randint(0, 100), "location": "Tashkent", "model_name": "m12",
+         "price_per_minute": 1000, "latitude": 41.2 + random.random() / 5, "longitude": 69.1 + random.random() / 5}
+        for number in range(1, 2_001)
+    ])
+    announcements = []
+    for _ in range(5_000):
+        from_place, to_place = random.sample(region_names[:4], 2)
+        announcements.append(TaxiAnnouncement(
+            from_place, to_place, str(random.randrange(40_000, 120_000, 5_000)), "Cobalt", "", "48", "4",
+        ).formatting_announcement())
+    storage.JsonManager(api_server.taxi_announcements_file).add_many(announcements)
+
+
+def next_request():
+    """
+    This function returns (method, path, body, headers) of a random request of the mix
+    """
+    draw = random.random()
+    if draw < 0.6:
+        from_place, to_place = random.sample(range(1, 5), 2)
+        return "GET", f"/announcements/taxi?from={from_place}&to={to_place}&max_price=80000&limit=10", None, {}
+    if draw < 0.8:
+        return "GET", f"/scooters?lat={41.2 + random.random() / 5:.5f}&lon={69.1 + random.random() / 5:.5f}&k=5&min_battery=20", None, {}
+    if draw < 0.9:
+        from_place, to_place = random.sample(range(1, 5), 2)
+        body = {"from_place": str(from_place), "to_place": str(to_place), "price": 70_000, "expire_time": 2}
+        return "POST", "/announcements/client", body, {"Authorization": taxi_auth}
+    number = next(team_numbers)
+    body = {"Leader_name": f"Load Test {number}", "Leader_contact": f"load{number}@gmail.com",  # a person is in one team only
+            "Team_name": f"Load Team {number}", "Other_participants": [f"Ann {number}", f"Bob {number}"]}
+    return "POST", "/teams", body, {}
+
+
+async def client(port, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            method, path, body, headers = next_request()
+            data = json.dumps(body).encode("utf-8") if body is not None else b""
+            head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n"
+            head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+            start = time.perf_counter()
+            writer.write(head.encode("latin-1") + b"\r\n" + data)
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line == b"\r\n":
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_level(port, clients, seconds):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, deadline, latencies, errors) for _ in range(clients)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    levels = [int(level) for level in sys.argv[2:]] or [1, 10, 50, 100, 250, 500]
+
+    with tempfile.TemporaryDirectory() as directory:
+        seed(directory)
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(project, "api_server.py"), "--port", str(port)],
+            cwd=directory, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        try:
+            while "Serving on" not in server.stdout.readline():
+                if server.poll() is not None:
+                    raise SystemExit("the server did not start")
+            asyncio.run(run_level(port, 1, 0.5))  # warm up: first login, indexes, rental engine
+
+            print(f"{'clients':>7} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+            for clients in levels:
+                latencies, errors, elapsed = asyncio.run(run_level(port, clients, seconds))
+                print(f"{clients:>7} {len(latencies):>9,} {len(latencies) / elapsed:>8,.0f} "
+                      f"{percentile(latencies, 0.5) * 1000:>8.2f} {percentile(latencies, 0.95) * 1000:>8.2f} "
+                      f"{percentile(latencies, 0.99) * 1000:>8.2f} {max(latencies) * 1000:>8.2f} {len(errors):>7}")
+                assert not errors, f"error responses: {sorted(set(errors))}"
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
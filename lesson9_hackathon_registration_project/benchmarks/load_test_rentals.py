@@ -0,0 +1,83 @@
+"""
+Load test of RentalEngine: many threads fire reserve/start/end requests at a
+shared fleet at the same time. Every successful reservation claims the
+scooter in a separate table, so two winners for one scooter show up as a
+conflict. Reports p50/p99 latency of reserve().
+
+Usage: python benchmarks/load_test_rentals.py [threads] [requests_per_thread] [scooters]
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rental_engine import RentalEngine, RentalError  # noqa: E402
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    fleet = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    engine = RentalEngine(
+        {"id": number, "battery": "90", "location": "Tashkent", "model_name": "m12", "price_per_minute": "1000"}
+        for number in range(fleet)
+    )
+    holders = {}
+    conflicts = []
+    latencies = []
+    rented = []
+    rejected = []
+
+    def client(number):
+        my_latencies = []
+        wins = losses = 0
+        for _ in range(requests):
+            scooter_id = random.randrange(fleet)
+            start = time.perf_counter()
+            try:
+                rental = engine.reserve(scooter_id, f"client{number}")
+            except RentalError:
+                my_latencies.append(time.perf_counter() - start)
+                losses += 1
+                continue
+            my_latencies.append(time.perf_counter() - start)
+            wins += 1
+
+            if holders.setdefault(scooter_id, number) != number:  # setdefault is atomic
+                conflicts.append(scooter_id)
+            engine.start(rental)
+            del holders[scooter_id]
+            engine.end(rental)
+        latencies.extend(my_latencies)
+        rented.append(wins)
+        rejected.append(losses)
+
+    workers = [threading.Thread(target=client, args=(number,)) for number in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    total = threads * requests
+    print(f"{threads} threads x {requests} requests on {fleet} scooters")
+    print(f"rentals: {sum(rented)}, rejected (already taken): {sum(rejected)}, conflicts: {len(conflicts)}")
+    print(f"throughput: {total / elapsed:.0f} requests/s")
+    print(f"reserve latency p50: {percentile(latencies, 0.5) * 1e6:.1f} us, p99: {percentile(latencies, 0.99) * 1e6:.1f} us")
+    leftover = [scooter_id for scooter_id in range(fleet) if engine.state_of(scooter_id) != "available"]
+    if conflicts or leftover:
+        sys.exit(f"Double-booked scooters: {conflicts}, not released: {leftover}")
+
+
+if __name__ == "__main__":
+    main()
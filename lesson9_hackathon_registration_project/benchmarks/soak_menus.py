@@ -0,0 +1,130 @@
+"""
+Soak test of the console menus: drives the hackathon and taxi menus with a
+script of menu actions (100k answers to input() by default): logins, team
+registration and removal, listings, filters, wrong numbers and cancelled
+quits. The call stack depth at every prompt and the traced memory must stay
+flat for the whole run.
+
+Usage: python benchmarks/soak_menus.py [actions]
+"""
+import builtins
+import contextlib
+import itertools
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project)
+sys.path.insert(0, os.path.join(project, "taxi_project"))
+
+allowed_growth = 512 * 1024  # bytes of traced memory the second half of a run may add
+
+
+def hackathon_cycle(number):
+    return [
+        "2", "admin01", "1111",              # admin login
+        "1",                                 # see all teams
+        "2", "Ghost Team",                   # remove a team that does not exist
+        "3", "Nobody",                       # find a participant who is not registered
+        "9", "x",                            # wrong menu numbers
+        "4",                                 # back to the main menu
+        "1", "Soak Leader", f"leader{number % 7}@gmail.com", "Soak Team", "3", "Ann", "Bob",  # register a team
+        "2", "admin01", "1111", "3", "ann", "2", "Soak Team", "4",                           # find Ann, remove the team
+        "7",                                 # wrong number in the main menu
+        "3", "n",                            # quit, then change one's mind
+    ]
+
+
+def taxi_cycle(number):
+    user_menu = [
+        "3", "1", "2", "", "",               # filter taxis Andijan -> Namangan
+        "4", "1", "2", "",                   # filter clients
+        "5", "9",                            # my announcements, wrong number
+    ]
+    return [
+        "2", "soak", "soak-password",        # login, logout forgets it so scrypt runs every cycle
+        *user_menu * 25,
+        "6",                                 # logout
+        "5",                                 # wrong number in the main menu
+        "3", "n",                            # quit, then change one's mind
+    ]
+
+
+class Script:
+    """
+    This class is applied to answer input() from a script and watch the stack and memory
+    """
+
+    def __init__(self, cycle, actions) -> None:
+        self.answers = itertools.chain.from_iterable(self.cycles(cycle))
+        self.actions = actions
+        self.used = 0
+        self.depths = set()
+        self.memory = []
+
+    def cycles(self, cycle):
+        """
+        This method yields the cycles of answers, every cycle ends in the main menu
+        """
+        for number in itertools.count():
+            if self.used >= self.actions:
+                yield ["3", "y"]  # leave through the main menu's quit
+                return
+            yield cycle(number)
+
+    def __call__(self, prompt=""):
+        self.used += 1
+        depth = 0
+        frame = sys._getframe()
+        while frame is not None:
+            depth += 1
+            frame = frame.f_back
+        self.depths.add(depth)
+        if self.used % (self.actions // 10) == 0:
+            self.memory.append(tracemalloc.get_traced_memory()[0])
+        return next(self.answers)
+
+
+def soak(name, run, cycle, actions):
+    script = Script(cycle, actions)
+    original_input = builtins.input
+    builtins.input = script
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+            run()
+    finally:
+        builtins.input = original_input
+    seconds = time.perf_counter() - start
+
+    half = len(script.memory) // 2
+    growth = script.memory[-1] - script.memory[half] if script.memory else 0
+    print(f"{name:10} {script.used:,} actions in {seconds:.1f} s ({script.used / seconds:,.0f}/s), "
+          f"stack depths {sorted(script.depths)}, traced memory "
+          f"{' '.join(f'{size / 1024:.0f}' for size in script.memory)} KiB")
+    assert len(script.depths) <= 3, "the stack grows with the number of actions"
+    assert growth < allowed_growth, f"memory grew by {growth} bytes in the second half of the run"
+
+
+def main():
+    actions = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            import Hackhaton
+            import main as taxi_main
+            from credentials import get_credential_store
+            from file_manager import user_manager
+            get_credential_store(user_manager).register("soak", "soak-password")
+
+        tracemalloc.start()
+        soak("hackathon", Hackhaton.main, hackathon_cycle, actions)
+        soak("taxi", lambda: taxi_main.run_menus(taxi_main.screens, "main"), taxi_cycle, actions)
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
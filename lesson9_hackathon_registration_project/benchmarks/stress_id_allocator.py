@@ -0,0 +1,55 @@
+"""
+Uniqueness check and speed of IdAllocator: several processes allocate ids
+from the same counter file at once, single ids and bulk ranges mixed. The
+script fails if any id is handed out twice.
+
+Usage: python benchmarks/stress_id_allocator.py [processes] [ids_per_process]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from id_allocator import IdAllocator  # noqa: E402
+
+
+def allocate_ids(counter_file, count, queue):
+    allocator = IdAllocator(counter_file, initial=lambda: 100)
+    ids = [allocator.next_id() for _ in range(count // 2)]
+    ids.extend(allocator.allocate(count - count // 2))
+    queue.put(ids)
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        counter_file = os.path.join(directory, "scooter_ids.counter")
+        queue = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=allocate_ids, args=(counter_file, count, queue))
+            for _ in range(processes)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        all_ids = []
+        for _ in workers:
+            all_ids.extend(queue.get())
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+    unique = len(set(all_ids))
+    print(f"{processes} processes x {count} ids: {len(all_ids)} allocated, {unique} unique")
+    print(f"{len(all_ids) / elapsed:,.0f} ids/s, smallest id {min(all_ids)}")
+    if unique != len(all_ids) or min(all_ids) < 100:
+        sys.exit("Duplicate ids were allocated!")
+
+
+if __name__ == "__main__":
+    main()
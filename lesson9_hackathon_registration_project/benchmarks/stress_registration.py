@@ -0,0 +1,66 @@
+"""
+Stress harness for concurrent registration: N processes register teams into
+the same participants.json at once through JsonManager.add_onedata_to_file.
+It checks that no team is lost or duplicated and reports throughput per N.
+
+Usage: python benchmarks/stress_registration.py [teams_per_process]
+"""
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Hackhaton import JsonManager  # noqa: E402
+
+
+def register_teams(file_name, worker, teams):
+    manager = JsonManager(file_name)
+    for number in range(teams):
+        manager.add_onedata_to_file({
+            "Leader_name": f"Leader {worker}-{number}",
+            "Leader_contact": f"leader{worker}.{number}@gmail.com",
+            "Team_name": f"Team {worker}-{number}",
+            "Other_participants": ["A", "B"],
+        })
+
+
+def run(processes, teams):
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "participants.json")
+        workers = [
+            multiprocessing.Process(target=register_teams, args=(file_name, worker, teams))
+            for worker in range(processes)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        with open(file_name, mode="r") as file:
+            names = [team["Team_name"] for team in json.load(file)]
+        expected = processes * teams
+        lost = expected - len(set(names))
+        duplicated = len(names) - len(set(names))
+        return expected / elapsed, lost, duplicated
+
+
+def main():
+    teams = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"{'processes':>9} {'teams':>6} {'teams/s':>9} {'lost':>5} {'duplicated':>10}")
+    failed = False
+    for processes in (1, 2, 4, 8, 16):
+        throughput, lost, duplicated = run(processes, teams)
+        failed = failed or lost or duplicated
+        print(f"{processes:>9} {processes * teams:>6} {throughput:>9.1f} {lost:>5} {duplicated:>10}")
+    if failed:
+        sys.exit("Some registrations were lost or duplicated!")
+
+
+if __name__ == "__main__":
+    main()
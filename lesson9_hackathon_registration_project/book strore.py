@@ -1,53 +1,21 @@
-import json 
-import os
+import storage
+from book_catalog import get_book_catalog
+from book_inventory import PurchaseError, get_inventory
+from credentials import CredentialError, admin_login, get_admin_store, get_credential_store
+from menus import read_choice, run_menus
+from validation import is_valid_email
 
-admin_login = "admin01"
-admin_password = "1111"
+users_file = "book_users.json"
+current_user = None  # Users object of the logged in user
 
 
-class JsonManager:
+class JsonManager(storage.JsonManager):
     """
-    This class is applied to manage working with json files
+    This class is applied to manage working with the users file
     """
 
-    def __init__(self, file_name) -> None:
-        self.file_name = file_name
+    index_keys = ('Team_name',)
 
-
-    def check_existance(self):
-        """
-        This method checks the existance of the file and if the file is not empty
-        """
-        return os.path.exists(self.file_name) and os.path.getsize(self.file_name) != 0
-
-
-    def read_file(self):
-        """
-        This method reads the data of the file
-        """
-        if self.check_existance():
-                with open(self.file_name, mode="r") as file:
-                    return json.load(file)
-        return []
-        
-
-    def write_file(self, all_data):
-        """
-        This method writes all data into the file
-        """
-        with open(self.file_name, mode= "w") as file:
-            json.dump(all_data, file, indent=4)
-            return "Data is written to a file"
-
-
-    def add_onedata_to_file(self, data: dict):
-        """
-        This method writes one given data into the the file
-        """
-        all_data = self.read_file()
-        all_data.append(data)
-        return self.write_file(all_data)
-    
     def get_all_participants(self):
         """
         This method retrieves all participants from the file
@@ -55,22 +23,16 @@ class JsonManager:
         return self.read_file()
     
     def removing_participants(self, team_name):
-        all_data = self.read_file()
-        updated_data = []
-
-        for participant in all_data:
-            if participant.get('Team_name') != team_name:
-                updated_data.append(participant)
-
-        if len(updated_data) < len(all_data):
-            self.write_file(updated_data)
+        """
+        This method removes a record by its team name using the indexed record cache
+        """
+        if self.remove_where('Team_name', team_name):
             return True
-        else:
-            print("There is no such team in the list. Please try again later.")
-            return False
+        print("There is no such team in the list. Please try again later.")
+        return False
 
 class Users(JsonManager):
-    def __init__(self, full_name, contact, file_name="participants.json"):
+    def __init__(self, full_name, contact, file_name=users_file):
         super().__init__(file_name)
         self.full_name = full_name
         self.contact = contact
@@ -88,42 +50,165 @@ class Users(JsonManager):
     #         'Team_name': self.team_name,
            
         
-def register_users():
+def get_user_store():
+    """
+    This function returns the credential store of the book store users
+    """
+    return get_credential_store(JsonManager(users_file))
+
 
+def register_users():
+    """
+    This function registers a user with a hashed password
+    """
     print("\nUser registration:\n")
     full_name = input("Enter your full name: ").title().strip()
     
     while True:  # Validating email format
         user_email = input("Enter your email: ").strip()
-        if user_email.endswith('@gmail.com') or user_email.endswith('@mail.ru') or user_email.endswith('@yahoo.com'):
+        if is_valid_email(user_email):
             break
         else:
             print("Invalid input, enter an email again!")
-    
-    
-    while True:  # Adjusting maximum participants upto 5 including the leader
-        participant_quantity = int(input("How many people do you want to add (including yourself)? "))
-        if participant_quantity >= 3 and participant_quantity <= 5:  
+
+    password = input("Enter a password: ").strip()
+    try:
+        get_user_store().register(user_email, password, full_name=full_name)
+    except CredentialError as error:
+        print(error)
+        return "main"
+
+    print("You are registered, now you can log in.")
+    return "main"
+
+
+def login_users():
+    """
+    This function logs in a user or the admin and opens their menu
+    """
+    global current_user
+    login = input("Enter your email (or admin login): ").strip()
+    password = input("Enter your password: ").strip()
+    if login == admin_login and get_admin_store().authenticate(login, password):
+        return "admin"
+    if get_user_store().authenticate(login, password):
+        current_user = Users(get_user_store().find_user(login).get('full_name', ''), login)
+        return "user"
+    print("Incorrect email or password.")
+    return "main"
+
+
+def print_books(books):
+    """
+    This function prints books page by page
+    """
+    inventory = get_inventory()
+    pages = storage.paginate(books)
+    page = next(pages, None)
+    if page is None:
+        print("No books found.")
+    while page:
+        for book in page:
+            print(f"ID: {book['id']}")
+            print(f"Title: {book['title']}")
+            print(f"Author: {book['author']}")
+            print(f"Price: {book['price']}, in stock: {inventory.stock(book['id'])}")
+            print("--------------------")
+        page = next(pages, None)
+        if page and input("Press Enter to see more books or 'q' to stop: ").strip().lower() == "q":
             break
-        else:
-            print("Please enter between 3 to 5 participants (including yourself).")
 
-    participant = Participant(full_name=full_name, contact=user_email, team_name=team_name)  # Making an object from  Participant class
-    
-    for i in range(participant_quantity - 1):  # Looping to add team members
-        member_name = input(f"Enter participant {i+1} name: ").title().strip()
-        participant.add_team_member(member_name)
 
-    participant.add_onedata_to_file(participant.formatting_team())
+def search_books():
+    """
+    This function finds books by their title, the last word may be unfinished
+    """
+    catalog = get_book_catalog()
+    query = input("Enter the name of the book (or its beginning): ")
+    books = catalog.search(query, limit=20)
+    print_books(books)
+    if not books:
+        words = catalog.complete(query)
+        if words:
+            print(f"Titles have these words: {', '.join(words)}")
+
+
+def add_book():
+    """
+    This function adds a book to the catalog
+    """
+    title = input("Enter the title: ")
+    author = input("Enter the author: ").title().strip()
+    price = input("Enter the price: ")
+    quantity = input("How many books are in stock: ")
+    try:
+        book = get_book_catalog().add_book(title, author, price, quantity)
+    except ValueError as error:
+        print(f"The book was not added: {error}")
+        return
+    print(f"The book is added with ID {book['id']}.")
+
+
+def remove_book():
+    """
+    This function removes a book from the catalog by its ID
+    """
+    book_id = read_choice("Enter the ID of the book: ")
+    if book_id is not None and get_book_catalog().remove_book(book_id):
+        print("The book is removed.")
+    else:
+        print("There is no such book in the catalog.")
+
+
+def buy_book():
+    """
+    This function sells a book to the logged in user
+    """
+    book_id = read_choice("Enter the ID of the book: ")
+    count = read_choice("How many copies: ")
+    if book_id is None or count is None:
+        print("Please enter numbers.")
+        return
+    try:
+        purchase = get_inventory().purchase(current_user.contact, book_id, count)
+    except PurchaseError as error:
+        print(error)
+        return
+    current_user.bought_books.append(purchase)
+    print(f"You bought {count} copies for {purchase['price'] * count}.")
+
+
+def print_bought_books():
+    """
+    This function prints the purchase history of the logged in user
+    """
+    current_user.bought_books = get_inventory().purchases_of(current_user.contact)
+    if not current_user.bought_books:
+        print("You have not bought any books yet.")
+    catalog = get_book_catalog()
+    for purchase in current_user.bought_books:
+        book = catalog.get_book(purchase['book_id'])
+        title = book['title'] if book is not None else f"book {purchase['book_id']} (removed)"
+        print(f"{title}: {purchase['count']} copies, {purchase['price']} each")
+
 
-    print("Data about your team has been saved successfully!")
-    return display_menu()
+def print_quantity_report():
+    """
+    This function prints how many copies of every book are left
+    """
+    report = get_inventory().quantity_report()
+    if not report:
+        print("There are no books in the catalog.")
+    for book, stock in report:
+        print(f"ID: {book['id']}, {book['title']}: {stock} left")
+    print(f"Copies sold: {get_inventory().sold}")
 
 
 def display_user_menu():
     """
-    This function is used to handle admin's menu
+    This function is used to handle user's menu
     """
+    global current_user
     text = """
     1. See all books.
     2. Search book by name.
@@ -134,16 +219,26 @@ def display_user_menu():
 
     print(text)
 
-    user_input = int(input("Choose a number from menu: "))
+    user_input = read_choice()
 
     if user_input == 1:
-        pass
+        print_books(get_book_catalog().all_books())
     elif user_input == 2:
-        pass
+        search_books()
     elif user_input == 3:
-        pass
+        buy_book()
+    elif user_input == 4:
+        print_bought_books()
+    elif user_input == 5:
+        get_user_store().forget(current_user.contact)
+        current_user = None
+        return "main"
+    elif user_input == 6:
+        return None
     else:
         print("Choose a proper number!")
+    return "user"
+
 def display_admin_menu():
     """
     This function is used to handle admin's menu
@@ -159,16 +254,23 @@ def display_admin_menu():
 
     print(text)
 
-    user_input = int(input("Choose a number from menu: "))
+    user_input = read_choice()
 
     if user_input == 1:
-        pass
+        add_book()
     elif user_input == 2:
-        pass
+        remove_book()
     elif user_input == 3:
-        pass
+        print_quantity_report()
+    elif user_input == 4:
+        search_books()
+    elif user_input == 6:
+        return "main"
+    elif user_input == 7:
+        return None
     else:
         print("Choose a proper number!")
+    return "admin"
 
 def display_main_menu():
     """
@@ -183,21 +285,29 @@ def display_main_menu():
 
     print(text)
 
-    user_input = int(input("Choose a number from menu: "))
+    user_input = read_choice()
 
     if user_input == 1:
-        pass
+        return "register"
     elif user_input == 2:
-        pass
+        return "login"
     elif user_input == 3:
         yes_no_input = input("Would you like to quit? (y/n): ")
         if yes_no_input.lower() == "y":
             print("You quitted the program. See you!")
-        else:
-            return display_main_menu()
+            return None
     else:
         print("Choose a proper number! ")
-        return display_main_menu()
-    
+    return "main"
+
+
+screens = {
+    "main": display_main_menu,
+    "register": register_users,
+    "login": login_users,
+    "user": display_user_menu,
+    "admin": display_admin_menu,
+}
+
 if __name__ == "__main__":
-    display_main_menu()
\ No newline at end of file
+    run_menus(screens, "main")
\ No newline at end of file
@@ -0,0 +1,352 @@
+"""
+Book catalog of the book store with a search index
+
+Titles are folded (lower case, accents and apostrophes removed, so "Ötkan
+Kunlar" is found by "otkan kunlar") and split into words. Every word points
+to the set of books that have it (an inverted index), and all words are kept
+in a prefix trie for type-ahead, so a search is a few set lookups instead of
+a scan over every title. The index is built once per file change and updated
+in place when this process adds or removes a book.
+"""
+import os
+import threading
+
+import storage
+from id_allocator import IdAllocator
+from text_folding import fold, words as title_words
+from validation import read_number
+
+_catalogs = {}
+_lock = threading.Lock()
+
+
+class WordTrie:
+    """
+    This class is applied to find all words that start with a prefix
+
+    Every node is a dict from a letter to the next node, a node that ends a
+    word has the key "" (no letter is empty).
+    """
+
+    end = ""
+
+    def __init__(self) -> None:
+        self.root = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, word):
+        node = self._node(word)
+        return node is not None and self.end in node
+
+    def _node(self, prefix):
+        node = self.root
+        for letter in prefix:
+            node = node.get(letter)
+            if node is None:
+                return None
+        return node
+
+    def add(self, word):
+        """
+        This method adds a word, adding it again does nothing
+        """
+        node = self.root
+        for letter in word:
+            node = node.setdefault(letter, {})
+        if self.end not in node:
+            node[self.end] = True
+            self.size += 1
+
+    def remove(self, word):
+        """
+        This method removes a word and the nodes that no other word uses
+        """
+        path = [self.root]
+        for letter in word:
+            node = path[-1].get(letter)
+            if node is None:
+                return False
+            path.append(node)
+        if path[-1].pop(self.end, None) is None:
+            return False
+        self.size -= 1
+        for depth in range(len(word), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][word[depth - 1]]
+        return True
+
+    def words(self, prefix, limit=None):
+        """
+        This method yields up to limit words that start with prefix in alphabetical order, the prefix itself first
+        """
+        node = self._node(prefix)
+        if node is None or limit == 0:
+            return
+        stack = [(prefix, node)]
+        found = 0
+        while stack:
+            word, node = stack.pop()
+            if self.end in node:
+                yield word
+                found += 1
+                if found == limit:
+                    return
+            stack.extend((word + letter, node[letter]) for letter in sorted(node, reverse=True) if letter)
+
+
+class BookIndex:
+    """
+    This class is applied to search books by the words of their titles
+
+    Attributes:
+        - books (dict): book id -> book record
+        - words (dict): book id -> tuple of the folded title words
+        - postings (dict): folded word -> set of ids of books that have it
+        - trie (WordTrie): every word in postings, for prefix search
+    """
+
+    def __init__(self) -> None:
+        self.books = {}
+        self.words = {}
+        self.postings = {}
+        self.trie = WordTrie()
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.books)
+
+    def add(self, book):
+        """
+        This method indexes one book, a book with the same id is replaced
+        """
+        with self.lock:
+            self.remove(book['id'])
+            words = tuple(dict.fromkeys(title_words(book.get('title', ''))))
+            self.books[book['id']] = book
+            self.words[book['id']] = words
+            for word in words:
+                books = self.postings.get(word)
+                if books is None:
+                    books = self.postings[word] = set()
+                    self.trie.add(word)
+                books.add(book['id'])
+
+    def add_many(self, books):
+        """
+        This method indexes many books
+        """
+        with self.lock:
+            for book in books:
+                self.add(book)
+
+    def remove(self, book_id):
+        """
+        This method removes a book from the index, False if it is not there
+        """
+        with self.lock:
+            if self.books.pop(book_id, None) is None:
+                return False
+            for word in self.words.pop(book_id):
+                books = self.postings[word]
+                books.discard(book_id)
+                if not books:
+                    del self.postings[word]
+                    self.trie.remove(word)
+            return True
+
+    def complete(self, prefix, limit=10):
+        """
+        This method returns up to limit known words that start with the folded prefix
+        """
+        words = title_words(prefix)
+        if not words:
+            return []
+        with self.lock:
+            return list(self.trie.words(words[-1], limit))
+
+    def search(self, query, limit=10):
+        """
+        This method returns up to limit books whose titles have every word of the query
+
+        The last word of the query may be unfinished and also matches longer
+        words ("harry pot" finds "Harry Potter"), books where it is a whole
+        word come first. A query that ends with a space only matches whole words.
+        """
+        words = title_words(query)
+        if not words or limit <= 0:
+            return []
+        prefix = None if query[-1:].isspace() else words.pop()
+
+        with self.lock:
+            sets = []
+            for word in words:
+                books = self.postings.get(word)
+                if books is None:
+                    return []
+                sets.append(books)
+            sets.sort(key=len)
+
+            if prefix is not None and not sets:  # every book of a completion matches, stop at limit books
+                found = {}
+                for word in self.trie.words(prefix):  # the word itself comes first
+                    for book_id in self.postings[word]:
+                        found[book_id] = None
+                        if len(found) >= limit:
+                            return [self.books[book_id] for book_id in found]
+                return [self.books[book_id] for book_id in found]
+
+            if prefix is not None:
+                completions, matches = [], 0
+                for word in self.trie.words(prefix):
+                    completions.append(word)
+                    matches += len(self.postings[word])
+                    if matches >= len(sets[0]):
+                        break
+                else:  # the unfinished word has fewer books than the rarest whole word, start from them
+                    found = []
+                    for word in completions:  # the word itself comes first
+                        for book_id in self.postings[word]:
+                            if book_id not in found and all(book_id in books for books in sets):
+                                found.append(book_id)
+                                if len(found) >= limit:
+                                    return [self.books[book_id] for book_id in found]
+                    return [self.books[book_id] for book_id in found]
+
+            whole, partial = [], []
+            smallest, others = sets[0], sets[1:]
+            for book_id in smallest:
+                if not all(book_id in books for books in others):
+                    continue
+                if prefix is None:
+                    whole.append(book_id)
+                elif prefix in self.words[book_id]:
+                    whole.append(book_id)
+                elif len(partial) < limit and any(word.startswith(prefix) for word in self.words[book_id]):
+                    partial.append(book_id)
+                if len(whole) >= limit:
+                    break
+            return [self.books[book_id] for book_id in (whole + partial)[:limit]]
+
+
+class BookManager(storage.JsonManager):
+    """
+    This class is applied to manage working with the books file
+    """
+
+    index_keys = ('id',)
+
+
+class BookCatalog:
+    """
+    This class is applied to add, remove and search the books of a books file
+
+    Attributes:
+        - manager (BookManager): storage manager of the books file
+        - index (BookIndex): search index of the books, rebuilt only when the file changes
+        - book_ids (IdAllocator): gives new books unique ids
+    """
+
+    def __init__(self, manager, book_ids=None) -> None:
+        self.manager = manager
+        self.book_ids = book_ids or IdAllocator(manager.file_name + ".ids.counter", initial=self.first_book_id)
+        self.index = BookIndex()
+        self.signature = None
+        self.loaded = False
+        self.lock = threading.RLock()
+
+    def refresh(self):
+        """
+        This method rebuilds the index only if the file changed since it was built
+        """
+        with self.lock:
+            signature = storage.file_signature(self.manager.file_name)
+            if self.loaded and signature == self.signature:
+                return False
+            self.index = BookIndex()
+            self.index.add_many(self.manager.iter_records())
+            self.signature = signature
+            self.loaded = True
+            return True
+
+    def first_book_id(self):
+        """
+        This method returns the id after the largest one already in the books file
+        """
+        return max((book['id'] for book in self.manager.iter_records() if isinstance(book.get('id'), int)), default=0) + 1
+
+    def _write(self, write, update):
+        # the index is first brought up to date with the file, so after the write only this change is missing
+        with self.lock:
+            self.refresh()
+            result = write()
+            if result:
+                update()
+                self.signature = storage.file_signature(self.manager.file_name)
+            return result
+
+    def add_book(self, title, author, price, quantity):
+        """
+        This method saves a new book and returns its record, ValueError if the data is wrong
+        """
+        title, author = str(title).strip(), str(author).strip()
+        if not title_words(title):
+            raise ValueError("The title must have at least one letter or digit.")
+        book = {
+            "id": self.book_ids.next_id(),
+            "title": title,
+            "author": author,
+            "price": read_number(price, "price", low=0),
+            "quantity": int(read_number(quantity, "quantity", low=0)),
+        }
+        self._write(lambda: self.manager.add_many([book]), lambda: self.index.add(book))
+        return book
+
+    def remove_book(self, book_id):
+        """
+        This method removes a book by its id, False if there is no such book
+        """
+        return self._write(lambda: self.manager.remove_where('id', book_id), lambda: self.index.remove(book_id))
+
+    def get_book(self, book_id):
+        """
+        This method returns a book by its id or None
+        """
+        self.refresh()
+        return self.index.books.get(book_id)
+
+    def all_books(self):
+        """
+        This method returns all books sorted by title
+        """
+        self.refresh()
+        return sorted(self.index.books.values(), key=lambda book: fold(book['title']))
+
+    def search(self, query, limit=10):
+        """
+        This method returns up to limit books whose titles match the query, see BookIndex.search
+        """
+        self.refresh()
+        return self.index.search(query, limit)
+
+    def complete(self, prefix, limit=10):
+        """
+        This method returns title words that start with the prefix, for type-ahead
+        """
+        self.refresh()
+        return self.index.complete(prefix, limit)
+
+
+def get_book_catalog(file_name="books.json"):
+    """
+    This function returns the shared catalog of a books file
+    """
+    key = os.path.abspath(file_name)
+    with _lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = BookCatalog(BookManager(file_name))
+        return catalog
@@ -0,0 +1,171 @@
+"""
+Stock counters and purchases of the book store
+
+The quantity saved with a book in books.json is its starting stock. Every
+purchase or restock after that is one line in an inventory ledger
+(inventory.jsonl) with the change of stock, so buying a book is a single
+append instead of rewriting the books file. Each process keeps the sum of
+changes per book and the purchase history per user in memory and only
+reads the lines that were appended since its last look, so stock counters
+and the quantity report are updated line by line instead of recounted.
+
+A purchase locks its book, reads the new ledger lines, checks the stock and
+appends its line before unlocking. Books are spread over lock_stripes locks
+that are both thread locks and file locks, so two buyers of the same book
+wait for each other, in this process or in another one, and a book is never
+sold more times than it is in stock. Buyers of different books do not wait.
+"""
+import collections
+import os
+import threading
+import time
+
+from book_catalog import get_book_catalog
+from file_lock import FileLock
+from jsonl_manager import JsonLinesManager
+from serializer import DecodeError, loads
+
+PURCHASE = "purchase"
+RESTOCK = "restock"
+
+_inventories = {}
+
+
+class PurchaseError(Exception):
+    """
+    This exception is raised when a book cannot be bought or restocked
+    """
+
+
+class Inventory:
+    """
+    This class is applied to keep stock counters of the catalog's books and sell them without overselling
+
+    Attributes:
+        - catalog (BookCatalog): books with their starting quantity
+        - ledger (JsonLinesManager): inventory ledger, one line per purchase or restock
+        - lock_stripes (int): number of locks the books are spread over
+    """
+
+    def __init__(self, catalog, ledger, lock_stripes=16) -> None:
+        self.catalog = catalog
+        self.ledger = ledger
+        self.changes = collections.Counter()  # book id -> sum of the stock changes in the ledger
+        self.purchases = collections.defaultdict(list)  # username -> purchase lines
+        self.sold = 0
+        self.offset = 0  # bytes of the ledger already applied
+        self.read_lock = threading.Lock()
+        self.locks = [threading.Lock() for _ in range(lock_stripes)]
+
+    def _stripe(self, book_id):
+        return hash(book_id) % len(self.locks)
+
+    def catch_up(self):
+        """
+        This method applies the ledger lines appended since the last call and returns how many
+        """
+        with self.read_lock:
+            try:
+                size = os.path.getsize(self.ledger.file_name)
+            except FileNotFoundError:
+                size = 0
+            if size < self.offset:  # the ledger was replaced, start over
+                self.changes.clear()
+                self.purchases.clear()
+                self.sold = self.offset = 0
+            if size == self.offset:
+                return 0
+
+            with open(self.ledger.file_name, mode="rb") as file:
+                file.seek(self.offset)
+                complete, newline, _ = file.read(size - self.offset).rpartition(b"\n")  # skips a line still being written
+            applied = 0
+            for line in complete.split(b"\n"):
+                try:
+                    entry = loads(line.decode("utf-8"))
+                except (DecodeError, UnicodeDecodeError):
+                    continue  # an empty line or one torn by a crash
+                self._apply(entry)
+                applied += 1
+            self.offset += len(complete) + len(newline)
+            return applied
+
+    def _apply(self, entry):
+        self.changes[entry['book_id']] += entry['change']
+        if entry.get('kind') == PURCHASE:
+            self.purchases[entry['username']].append(entry)
+            self.sold -= entry['change']
+
+    def _stock(self, book):
+        return int(book.get('quantity', 0)) + self.changes[book['id']]
+
+    def stock(self, book_id):
+        """
+        This method returns how many copies of a book are left, None if there is no such book
+        """
+        book = self.catalog.get_book(book_id)
+        if book is None:
+            return None
+        self.catch_up()
+        return self._stock(book)
+
+    def _change(self, book_id, change, entry):
+        book = self.catalog.get_book(book_id)
+        if book is None:
+            raise PurchaseError(f"There is no book with ID {book_id}.")
+        stripe = self._stripe(book_id)
+        with self.locks[stripe], FileLock(f"{self.ledger.file_name}.{stripe}"):
+            self.catch_up()
+            stock = self._stock(book)
+            if stock + change < 0:
+                raise PurchaseError(f"Only {stock} copies of '{book['title']}' are left.")
+            entry.update(book_id=book_id, change=change, at=time.time())
+            self.ledger.append_line(entry)
+            self.catch_up()  # applies this line, so the next buyer sees it without reading the file again
+        return entry
+
+    def purchase(self, username, book_id, count=1):
+        """
+        This method sells count copies of a book to a user and returns the purchase line
+
+        PurchaseError is raised if the book does not exist or not enough copies are left.
+        """
+        if count < 1:
+            raise PurchaseError("At least one copy must be bought.")
+        book = self.catalog.get_book(book_id)
+        price = book['price'] if book is not None else None
+        return self._change(book_id, -count, {'kind': PURCHASE, 'username': username, 'count': count, 'price': price})
+
+    def restock(self, book_id, count):
+        """
+        This method adds count copies of a book to the stock and returns the restock line
+        """
+        if count < 1:
+            raise PurchaseError("At least one copy must be added.")
+        return self._change(book_id, count, {'kind': RESTOCK, 'count': count})
+
+    def purchases_of(self, username):
+        """
+        This method returns the purchase history of a user, oldest first
+        """
+        self.catch_up()
+        return list(self.purchases.get(username, ()))
+
+    def quantity_report(self, low=None):
+        """
+        This method returns (book, stock) pairs sorted by title, only books with at most low copies if low is given
+        """
+        self.catch_up()
+        report = ((book, self._stock(book)) for book in self.catalog.all_books())
+        return [(book, stock) for book, stock in report if low is None or stock <= low]
+
+
+def get_inventory(books_file="books.json", ledger_file="inventory.jsonl"):
+    """
+    This function returns the shared inventory of a books file and its ledger
+    """
+    key = (os.path.abspath(books_file), os.path.abspath(ledger_file))
+    inventory = _inventories.get(key)
+    if inventory is None:
+        inventory = _inventories[key] = Inventory(get_book_catalog(books_file), JsonLinesManager(ledger_file))
+    return inventory
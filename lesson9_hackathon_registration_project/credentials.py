@@ -0,0 +1,238 @@
+"""
+Hashed credentials of app users
+
+Passwords are stored as salted scrypt hashes (PBKDF2 when OpenSSL has no
+scrypt) in the "password" field of the user records, e.g.
+"scrypt$16384$8$1$<salt>$<hash>". A hash is checked with the algorithm named
+by its prefix, a scrypt hash on a Python without scrypt raises
+CredentialError instead of failing every login. Usernames are looked up through the indexed
+record cache of the file, so a login does not scan the file. A successful
+login is remembered for a while, so logging in again with the same password
+costs one HMAC instead of a new scrypt run.
+"""
+import collections
+import hashlib
+import hmac
+import secrets
+import threading
+import os
+import time
+
+import storage
+from file_lock import FileLock
+from record_cache import get_record_cache
+
+default_cost = 2 ** 14  # scrypt N, the memory and time cost of one hash
+scrypt_block_size = 8
+scrypt_parallelism = 1
+pbkdf2_iterations_per_cost = 600_000 / 2 ** 14  # PBKDF2 runs cost * this many iterations
+
+admin_login = "admin01"
+# hashes of the first admin password, the one hashlib can check is written to admins_file on the first admin login
+admin_password_hash = "scrypt$16384$8$1$8418c2faa6423946e8f59aa4b4e34d76$08fb742dfdceb58269042496e601b5dd4560a99df97f8b95de7d4dd49231403c9d7a360c182f89d5fabac977245d926a5cadc0c5253181810e2461288adaf8ed"
+admin_password_pbkdf2_hash = "pbkdf2_sha256$600000$8f86230fa5fbbb82621f77ac5f766a31$336a040ee8c011da96c922ae2e5e487854a4347a9bee10ec0fe8850dd4e975a8"
+admins_file = "admins.json"  # admins of the hackathon and the book store
+
+
+_stores = {}
+_lock = threading.Lock()
+
+
+class CredentialError(Exception):
+    """
+    This exception is raised when a user cannot be registered or a stored hash cannot be checked
+    """
+
+
+def hash_password(password, cost=default_cost, salt=None):
+    """
+    This function returns the salted hash of a password in the stored text format
+    """
+    salt = secrets.token_bytes(16) if salt is None else salt
+    if hasattr(hashlib, "scrypt"):
+        digest = hashlib.scrypt(
+            password.encode("utf-8"), salt=salt, n=cost, r=scrypt_block_size, p=scrypt_parallelism,
+            maxmem=256 * cost * scrypt_block_size,
+        )
+        return f"scrypt${cost}${scrypt_block_size}${scrypt_parallelism}${salt.hex()}${digest.hex()}"
+    iterations = max(1, int(cost * pbkdf2_iterations_per_cost))
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${salt.hex()}${digest.hex()}"
+
+
+def is_password_hash(stored):
+    """
+    This function checks if a stored password is a hash and not an old plaintext password
+    """
+    parts = str(stored).split("$")
+    return parts[0] == "scrypt" and len(parts) == 6 or parts[0] == "pbkdf2_sha256" and len(parts) == 4
+
+
+def verify_password(password, stored):
+    """
+    This function checks a password against its stored hash in constant time
+    """
+    if not isinstance(stored, str):
+        return False
+    if not is_password_hash(stored):  # a record written before passwords were hashed
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+
+    parts = stored.split("$")
+    if parts[0] == "scrypt":
+        if not hasattr(hashlib, "scrypt"):
+            raise CredentialError("This password is a scrypt hash, but hashlib has no scrypt (it needs OpenSSL 1.1 or newer).")
+        cost, block_size, parallelism = int(parts[1]), int(parts[2]), int(parts[3])
+        digest = hashlib.scrypt(
+            password.encode("utf-8"), salt=bytes.fromhex(parts[4]), n=cost, r=block_size, p=parallelism,
+            maxmem=256 * cost * block_size,
+        )
+        return hmac.compare_digest(digest.hex(), parts[5])
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(parts[2]), int(parts[1]))
+    return hmac.compare_digest(digest.hex(), parts[3])
+
+
+class CredentialStore:
+    """
+    This class is applied to register and log in users of one accounts file
+
+    Attributes:
+        - manager: storage manager of the accounts file (records have username and password)
+        - cost (int): scrypt cost of new hashes, higher is slower to guess and to log in
+        - session_ttl (float): seconds a verified login is remembered
+        - max_sessions (int): how many verified logins are remembered at most
+    """
+
+    def __init__(self, manager, cost=default_cost, session_ttl=900, max_sessions=10_000) -> None:
+        self.manager = manager
+        self.cost = cost
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        keys = getattr(manager, "index_keys", ())
+        self.cache = get_record_cache(manager, keys if "username" in keys else ("username",))
+        self.sessions = collections.OrderedDict()  # username -> (stored hash, HMAC of the password, verified at)
+        self.session_key = secrets.token_bytes(32)  # only lives in this process
+        self.dummy_hash = None  # checked for unknown users, so they take as long as a wrong password
+        self.lock = threading.Lock()
+
+    def find_user(self, username):
+        """
+        This method returns the record of a user or None
+        """
+        found = self.cache.find("username", username)
+        return found[0] if found else None
+
+    def exists(self, username):
+        """
+        This method checks if a username is taken
+        """
+        return self.cache.exists("username", username)
+
+    def register(self, username, password, **extra):
+        """
+        This method adds a user with a hashed password, CredentialError if the name is taken
+        """
+        if not username or not password:
+            raise CredentialError("Username and password cannot be empty.")
+        with self.lock:
+            if self.exists(username):
+                raise CredentialError(f"The username '{username}' is already taken.")
+            return self.cache.add({"username": username, "password": hash_password(password, self.cost), **extra})
+
+    def register_many(self, users):
+        """
+        This method adds many (username, password) pairs with one bulk write and returns how many
+
+        Taken or repeated usernames raise CredentialError and nothing is written.
+        """
+        with self.lock:
+            seen = set()
+            for username, _ in users:
+                if username in seen or self.exists(username):
+                    raise CredentialError(f"The username '{username}' is already taken.")
+                seen.add(username)
+            records = [{"username": username, "password": hash_password(password, self.cost)} for username, password in users]
+            self.manager.add_many(records)
+            self.cache.loaded = False
+            return len(records)
+
+    def authenticate(self, username, password):
+        """
+        This method checks a username and password, scrypt runs only if the login is not remembered
+        """
+        user = self.find_user(username)
+        if user is None:
+            if self.dummy_hash is None:
+                self.dummy_hash = hash_password(secrets.token_hex(16), self.cost)
+            verify_password(password, self.dummy_hash)
+            return False
+
+        stored = user.get("password")
+        fingerprint = hmac.new(self.session_key, password.encode("utf-8"), hashlib.sha256).digest()
+        with self.lock:
+            session = self.sessions.get(username)
+            if session is not None and session[0] == stored and time.monotonic() - session[2] < self.session_ttl:
+                self.sessions.move_to_end(username)
+                return hmac.compare_digest(session[1], fingerprint)
+
+        if not verify_password(password, stored):
+            return False
+        if not is_password_hash(stored):
+            stored = self.upgrade(username, password)
+        with self.lock:
+            self.sessions[username] = (stored, fingerprint, time.monotonic())
+            self.sessions.move_to_end(username)
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+        return True
+
+    def upgrade(self, username, password):
+        """
+        This method replaces an old plaintext password with a hash and returns the hash
+
+        The record is replaced in place with one atomic write of the file under
+        its lock, so a crash leaves either the old or the new record and never
+        loses the user. The cache sees the new file signature and reloads.
+        """
+        with self.lock, FileLock(self.manager.file_name):  # two logins at once upgrade the password once
+            rows = self.manager.read_file()
+            positions = [position for position, row in enumerate(rows) if row.get("username") == username]
+            if not positions:  # removed in the meantime
+                return None
+            user = rows[positions[0]]
+            if is_password_hash(user.get("password")):
+                return user["password"]
+            user = rows[positions[0]] = dict(user, password=hash_password(password, self.cost))
+            for position in reversed(positions[1:]):  # duplicates of old registrations
+                del rows[position]
+            self.manager.write_file(rows)
+            return user["password"]
+
+    def forget(self, username):
+        """
+        This method forgets a remembered login, e.g. on logout
+        """
+        with self.lock:
+            self.sessions.pop(username, None)
+
+
+def get_credential_store(manager):
+    """
+    This function returns the shared credential store of an accounts file, so remembered logins are shared too
+    """
+    file_name = os.path.abspath(manager.file_name)
+    with _lock:
+        store = _stores.get(file_name)
+        if store is None:
+            store = _stores[file_name] = CredentialStore(manager)
+        return store
+
+
+def get_admin_store():
+    """
+    This function returns the credential store of the admins, the first admin is added on first use
+    """
+    store = get_credential_store(storage.JsonManager(admins_file))
+    if not store.exists(admin_login):
+        stored = admin_password_hash if hasattr(hashlib, "scrypt") else admin_password_pbkdf2_hash
+        store.cache.add({"username": admin_login, "password": stored})
+    return store
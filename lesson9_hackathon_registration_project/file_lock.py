@@ -0,0 +1,163 @@
+import os
+import uuid
+
+from journal import GroupCommitJournal, journal_name
+from serializer import DecodeError, dumps, loads
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl, locking is skipped there
+    fcntl = None
+
+
+class FileLock:
+    """
+    This class is applied to take an fcntl advisory lock on a data file
+
+    The lock is taken on a separate <file>.lock file, so the data file itself
+    can still be replaced with os.replace while the lock is held. Locks are not
+    reentrant: do not take the same lock twice in one process.
+
+    Attributes:
+        - file_name (str): data file that is protected by the lock
+        - shared (bool): take a shared lock instead of an exclusive one
+    """
+
+    def __init__(self, file_name, shared=False) -> None:
+        self.file_name = file_name
+        self.lock_name = file_name + ".lock"
+        self.shared = shared
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.lock_name, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+
+
+class BatchingWriter:
+    """
+    This class is applied to coalesce appends from many processes into one commit
+
+    Every process appends its record to a shared spool file (<file>.spool) with
+    a single O_APPEND write under a shared lock and then waits for the
+    exclusive lock. Whoever gets the exclusive lock first drains the whole
+    spool and commits all spooled records with one atomic write (journaled
+    if the manager's journaled flag is set). The others find their record
+    already committed and return.
+
+    Attributes:
+        - manager: JsonManager whose read_file/write_file are used for the main file
+    """
+
+    def __init__(self, manager) -> None:
+        self.manager = manager
+        self.spool_name = manager.file_name + ".spool"
+        self.draining_name = manager.file_name + ".spool.draining"
+
+    def add(self, data: dict, on_commit=None):
+        """
+        This method durably adds one record, possibly together with records of other processes
+
+        If this process commits the batch, on_commit(records, before) is called
+        under the exclusive lock right after it, with all committed records
+        and the file signature from right before the commit. It is not called
+        when another process committed the record.
+        """
+        token = uuid.uuid4().hex
+        line = (dumps({"token": token, "data": data}) + "\n").encode("utf-8")
+        with FileLock(self.manager.file_name, shared=True):  # keeps the spool from being drained mid-write
+            fd = os.open(self.spool_name, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+        with FileLock(self.manager.file_name):
+            self.recover()
+            if token in self.spooled_tokens():
+                return self.drain(on_commit)
+        return 0
+
+    def spooled_tokens(self):
+        """
+        This method returns the tokens of records that are still waiting in the spool
+        """
+        return {entry["token"] for entry in read_entries(self.spool_name)}
+
+    def drain(self, on_commit=None):
+        """
+        This method commits every spooled record in one batch, the lock must be held
+        """
+        before = file_signature(self.manager.file_name)
+        os.replace(self.spool_name, self.draining_name)
+        records = [entry["data"] for entry in read_entries(self.draining_name)]
+        if getattr(self.manager, "journaled", False):
+            journal = GroupCommitJournal(self.manager)
+            journal.pending = records
+            all_data = journal.write_journal()
+            os.remove(self.draining_name)  # from here on the journal owns the batch
+            journal.apply(all_data)
+        else:
+            self.manager.write_file(self.manager.read_file() + records)
+            os.remove(self.draining_name)
+        if on_commit is not None:
+            on_commit(records, before)
+        return len(records)
+
+    def recover(self):
+        """
+        This method finishes a batch that was interrupted by a crash, the lock must be held
+        """
+        if os.path.exists(journal_name(self.manager.file_name)):
+            GroupCommitJournal(self.manager).recover()  # the journal already holds the draining records
+            if os.path.exists(self.draining_name):
+                os.remove(self.draining_name)
+        elif os.path.exists(self.draining_name):
+            records = [entry["data"] for entry in read_entries(self.draining_name)]
+            all_data = self.manager.read_file()
+            # the crash may have come after the main file was replaced, then the batch is its tail
+            if records and all_data[len(all_data) - len(records):] != records:
+                self.manager.write_file(all_data + records)
+            os.remove(self.draining_name)
+
+
+def file_signature(file_name):
+    """
+    This function returns (mtime, size) of a file and of its SQLite -wal file, None if it does not exist
+
+    Every in-memory cache of a data file compares this signature to decide
+    whether the file changed since it was loaded.
+    """
+    signature = []
+    for name in (file_name, file_name + "-wal"):  # -wal: SQLite write-ahead log
+        try:
+            stat = os.stat(name)
+        except FileNotFoundError:
+            continue
+        signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature) or None
+
+
+def read_entries(file_name):
+    """
+    This function reads the complete lines of a spool file
+    """
+    if not os.path.exists(file_name):
+        return []
+
+    entries = []
+    with open(file_name, mode="r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                entries.append(loads(line))
+            except DecodeError:
+                continue  # a torn line left by a crashed writer
+    return entries
@@ -0,0 +1,194 @@
+"""
+Statistics over the scooter fleet
+
+The battery, price and location/model codes of all valid scooters are kept
+as column arrays (NumPy arrays when NumPy from requirements-optional.txt is
+installed), so aggregates and group-by queries are a few vectorized
+operations instead of a loop over dicts. The columns of a file are cached
+and rebuilt after the file changes.
+"""
+import bisect
+import collections
+import functools
+import os
+
+from models import ScooterColumns
+from storage import file_signature
+from validation import scooter_schema, validated_records
+
+try:
+    import numpy
+except ImportError:  # the same statistics are computed with plain Python loops
+    numpy = None
+
+_analytics = {}
+
+
+class FleetAnalytics:
+    """
+    This class is applied to answer fleet statistics queries from column arrays
+
+    Attributes:
+        - columns (ScooterColumns): the fleet in typed arrays with coded names
+        - battery, price, location_codes, model_codes: NumPy arrays, or the
+          columns' own arrays when NumPy is not installed
+        - sorted_groups (dict): prices sorted per grouping, made by the first percentile query
+    """
+
+    def __init__(self, records=()) -> None:
+        self.columns = ScooterColumns(records)
+        if numpy is not None:
+            self.battery = numpy.frombuffer(self.columns.battery, dtype=numpy.float64).copy()
+            self.price = numpy.frombuffer(self.columns.price_per_minute, dtype=numpy.float64).copy()
+            self.location_codes = numpy.frombuffer(self.columns.location_codes, dtype=numpy.uint32).astype(numpy.int64)
+            self.model_codes = numpy.frombuffer(self.columns.model_codes, dtype=numpy.uint32).astype(numpy.int64)
+        else:
+            self.battery = self.columns.battery
+            self.price = self.columns.price_per_minute
+            self.location_codes = self.columns.location_codes
+            self.model_codes = self.columns.model_codes
+        self.sorted_groups = {}  # grouping -> prices sorted by (group, price), used with NumPy
+
+    def __len__(self):
+        return len(self.columns)
+
+    def _group_columns(self, by):
+        columns = {
+            "location": (self.location_codes, self.columns.locations),
+            "model_name": (self.model_codes, self.columns.models),
+        }
+        for name in by:
+            if name not in columns:
+                raise ValueError(f"Cannot group by {name!r}, use 'location' or 'model_name'.")
+        return [columns[name] for name in by]
+
+    def low_battery_count(self, threshold=20):
+        """
+        This method returns how many scooters have less battery than threshold and need a charge
+        """
+        if numpy is not None:
+            return int(numpy.count_nonzero(self.battery < threshold))
+        return sum(1 for battery in self.battery if battery < threshold)
+
+    def low_battery_by_location(self, threshold=20):
+        """
+        This method returns {location: number of scooters under threshold}
+        """
+        locations = self.columns.locations
+        if numpy is not None:
+            counts = numpy.bincount(self.location_codes[self.battery < threshold], minlength=len(locations)).tolist()
+        else:
+            counts = [0] * len(locations)
+            for battery, code in zip(self.battery, self.location_codes):
+                if battery < threshold:
+                    counts[code] += 1
+        return {location: count for location, count in zip(locations, counts) if count}
+
+    def battery_distribution(self, bins=(0, 20, 40, 60, 80, 100)):
+        """
+        This method returns [(low, high, count)] for every battery range, the last range includes high
+        """
+        if numpy is not None:
+            counts = numpy.histogram(self.battery, bins=bins)[0].tolist()
+        else:
+            # bisect_right gives 1 for the first range ... len(bins) for values >= the last edge
+            positions = collections.Counter(map(functools.partial(bisect.bisect_right, bins), self.battery))
+            counts = [positions[position] for position in range(1, len(bins))]
+            counts[-1] += self.battery.count(bins[-1])
+        return [(bins[position], bins[position + 1], count) for position, count in enumerate(counts)]
+
+    def price_percentiles(self, percentiles=(25, 50, 75, 90), by=("location", "model_name")):
+        """
+        This method returns {group: {percentile: price per minute}} for every group of scooters
+
+        A group is a tuple of the names in by, e.g. ('Tashkent', 'm12'); by=()
+        gives one group () for the whole fleet. Percentiles are interpolated
+        linearly between the two nearest prices.
+        """
+        if not len(self):
+            return {}
+        group_columns = self._group_columns(by)
+        if numpy is not None:
+            return self._numpy_percentiles(percentiles, group_columns)
+
+        groups = collections.defaultdict(list)
+        for key, price in zip(zip(*(codes for codes, _ in group_columns)), self.price):
+            groups[key].append(price)
+        result = {}
+        for key, prices in groups.items():
+            prices.sort()
+            names = tuple(group_names[code] for code, (_, group_names) in zip(key, group_columns))
+            result[names] = {percentile: interpolate(prices, percentile) for percentile in percentiles}
+        return result
+
+    def _sorted_groups(self, group_columns):
+        # One lexsort by (group, price) puts every group's prices next to each other and sorted.
+        # The columns never change, so the sort is done once per grouping.
+        cache_key = tuple(id(names) for _, names in group_columns)
+        if cache_key not in self.sorted_groups:
+            keys = numpy.zeros(len(self), dtype=numpy.int64)
+            for codes, names in group_columns:
+                keys = keys * max(len(names), 1) + codes
+            order = numpy.lexsort((self.price, keys))
+            sorted_keys = keys[order]
+            starts = numpy.flatnonzero(numpy.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            lengths = numpy.diff(numpy.r_[starts, len(order)])
+            self.sorted_groups[cache_key] = (sorted_keys[starts].tolist(), self.price[order], starts, lengths)
+        return self.sorted_groups[cache_key]
+
+    def _numpy_percentiles(self, percentiles, group_columns):
+        group_keys, sorted_prices, starts, lengths = self._sorted_groups(group_columns)
+
+        values = {}
+        for percentile in percentiles:
+            position = starts + percentile / 100 * (lengths - 1)
+            lower = numpy.floor(position).astype(numpy.int64)
+            upper = numpy.minimum(lower + 1, starts + lengths - 1)
+            fraction = position - lower
+            values[percentile] = (sorted_prices[lower] * (1 - fraction) + sorted_prices[upper] * fraction).tolist()
+
+        result = {}
+        for group, key in enumerate(group_keys):
+            names = []
+            for codes, group_names in reversed(group_columns):
+                key, code = divmod(key, max(len(group_names), 1))
+                names.append(group_names[code])
+            result[tuple(reversed(names))] = {percentile: values[percentile][group] for percentile in percentiles}
+        return result
+
+    def summary(self, threshold=20):
+        """
+        This method returns the main fleet numbers in one dict
+        """
+        return {
+            "scooters": len(self),
+            "low_battery": self.low_battery_count(threshold),
+            "battery_distribution": self.battery_distribution(),
+            "price_percentiles": self.price_percentiles(by=("location",)),
+        }
+
+
+def interpolate(prices, percentile):
+    """
+    This function returns a percentile of sorted prices, interpolated like numpy.percentile
+    """
+    position = percentile / 100 * (len(prices) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(prices) - 1)
+    fraction = position - lower
+    return prices[lower] * (1 - fraction) + prices[upper] * fraction
+
+
+def get_fleet_analytics(manager):
+    """
+    This function returns the analytics of the manager's scooters, rebuilt only when the file changes
+    """
+    file_name = os.path.abspath(manager.file_name)
+    signature = file_signature(manager.file_name)
+    cached = _analytics.get(file_name)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    analytics = FleetAnalytics(validated_records(manager, scooter_schema))
+    _analytics[file_name] = (signature, analytics)
+    return analytics
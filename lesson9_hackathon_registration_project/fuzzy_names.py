@@ -0,0 +1,123 @@
+"""
+Near-duplicate detection of names
+
+Names are compared in a compact form: folded and without spaces or
+punctuation, so "Code Ninjas", "CodeNinjas" and "code-ninjas" are the same
+name. Near duplicates ("Code Ninja", "Kode Ninjas", "Code Ninjsa") are found
+in two steps:
+
+1. Blocking: every name is indexed by its character trigrams (an NgramKey of
+   a RecordCache). A name can only be similar to a query if they share
+   enough trigrams, and find_overlapping() gets those names from the
+   rarest trigrams of the query, so a lookup reads a few small postings
+   instead of comparing against all N names.
+2. Scoring: a candidate is a near duplicate if the trigram Jaccard
+   similarity (shared trigrams / all trigrams of both) is high enough.
+   Names built from the same words ("Code Ninjas Tashkent" and "Code
+   Ninjas Samarkand") share a long prefix, so prefix-friendly scores such
+   as Jaro-Winkler flag them; Jaccard does not. Jaro-Winkler is used for
+   short names, where one typo changes most trigrams, and to rank results.
+"""
+import math
+
+from record_cache import DerivedKey
+from text_folding import words
+
+
+def compact(name):
+    """
+    This function returns the folded name without spaces and punctuation
+    """
+    return "".join(words(name))
+
+
+def ngrams(text, size=3):
+    """
+    This function returns the set of character n-grams of a text padded with a space on both sides
+    """
+    text = f" {text} "
+    return {text[start:start + size] for start in range(max(1, len(text) - size + 1))}
+
+
+def jaro_winkler(first, second, prefix_scale=0.1):
+    """
+    This function returns the Jaro-Winkler similarity of two strings, from 0.0 to 1.0
+    """
+    if first == second:
+        return 1.0
+    if not first or not second:
+        return 0.0
+
+    window = max(0, max(len(first), len(second)) // 2 - 1)
+    taken = [False] * len(second)
+    first_matches = []
+    for position, char in enumerate(first):
+        for other in range(max(0, position - window), min(len(second), position + window + 1)):
+            if not taken[other] and second[other] == char:
+                taken[other] = True
+                first_matches.append(char)
+                break
+    if not first_matches:
+        return 0.0
+
+    second_matches = [char for char, used in zip(second, taken) if used]
+    transpositions = sum(a != b for a, b in zip(first_matches, second_matches)) // 2
+    matches = len(first_matches)
+    jaro = (matches / len(first) + matches / len(second) + (matches - transpositions) / matches) / 3
+
+    prefix = 0
+    for a, b in zip(first[:4], second[:4]):
+        if a != b:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+class NgramKey(DerivedKey):
+    """
+    This class is applied to index records by the character n-grams of the compact form of a field
+
+    Attributes:
+        - name (str): name of the index
+        - field (str): record key holding the name, e.g. 'Team_name'
+        - size (int): length of the n-grams
+    """
+
+    def __init__(self, name, field, size=3) -> None:
+        super().__init__(name, self.grams_of)
+        self.field = field
+        self.size = size
+
+    def grams_of(self, data):
+        name = compact(data.get(self.field) or "")
+        return ngrams(name, self.size) if name else set()
+
+
+def find_similar(cache, key, name, min_similarity=0.6, typo_grams=3, short_threshold=0.9, limit=5):
+    """
+    This function returns up to limit (score, record) pairs of the records whose name is similar, best first
+
+    key is the NgramKey the cache indexes the names with. A name is similar
+    if the trigram Jaccard similarity is at least min_similarity. One typo
+    changes up to typo_grams trigrams, which is most of a short name, so
+    short names are also similar if their Jaro-Winkler score is at least
+    short_threshold. The score is the Jaro-Winkler score, 1.0 means the same
+    compact name.
+    """
+    query = compact(name)
+    if not query:
+        return []
+    grams = ngrams(query, key.size)
+    by_similarity = math.ceil(min_similarity * len(grams))
+    by_typo = len(grams) - typo_grams
+    found = []
+    for shared, data in cache.find_overlapping(key.name, grams, min(by_similarity, by_typo)):
+        other = compact(data.get(key.field) or "")
+        similarity = shared / (len(grams) + len(ngrams(other, key.size)) - shared)
+        if similarity < min_similarity and by_typo >= by_similarity:
+            continue
+        score = jaro_winkler(query, other)
+        if similarity >= min_similarity or score >= short_threshold:
+            found.append((score, data))
+    found.sort(key=lambda pair: -pair[0])
+    return found[:limit]
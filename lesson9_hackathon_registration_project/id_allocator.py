@@ -0,0 +1,73 @@
+import os
+import threading
+
+from atomic_file import atomic_write
+from file_lock import FileLock
+
+
+class IdAllocator:
+    """
+    This class is applied to hand out unique, increasing ids without scanning data files
+
+    The next free id is kept in a small counter file. A process leases a block
+    of block_size ids at once under the file lock and then hands them out from
+    memory, so ids stay unique across processes and the lock is taken only
+    once per block. A thread lock guards the leased block, so the worker
+    threads of a server can share one allocator.
+
+    Attributes:
+        - counter_file (str): file that keeps the next free id
+        - block_size (int): number of ids leased per lock
+        - initial: function that returns the first id when the counter file does not exist yet
+    """
+
+    def __init__(self, counter_file, block_size=100, initial=None) -> None:
+        self.counter_file = counter_file
+        self.block_size = block_size
+        self.initial = initial
+        self.next_free = 0
+        self.block_end = 0
+        self.lock = threading.Lock()
+
+    def _lease(self, count):
+        with FileLock(self.counter_file):
+            start = self._read_counter()
+            atomic_write(self.counter_file, str(start + count))
+        return start
+
+    def _read_counter(self):
+        if os.path.exists(self.counter_file) and os.path.getsize(self.counter_file):
+            with open(self.counter_file, mode="r") as file:
+                return int(file.read())
+        return self.initial() if self.initial else 1
+
+    def next_id(self):
+        """
+        This method returns one new id
+        """
+        with self.lock:
+            if self.next_free >= self.block_end:
+                self.next_free = self._lease(self.block_size)
+                self.block_end = self.next_free + self.block_size
+            new_id = self.next_free
+            self.next_free += 1
+            return new_id
+
+    def allocate(self, count):
+        """
+        This method returns a range of count new ids for bulk imports
+        """
+        start = self._lease(count)
+        return range(start, start + count)
+
+    def reserve(self, last_id):
+        """
+        This method makes sure no id up to last_id is handed out, e.g. after importing records that carry ids
+        """
+        with self.lock:
+            with FileLock(self.counter_file):
+                start = self._read_counter()
+                if start <= last_id:
+                    atomic_write(self.counter_file, str(last_id + 1))
+            if self.next_free <= last_id:
+                self.next_free = min(last_id + 1, self.block_end)
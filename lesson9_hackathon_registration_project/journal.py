@@ -0,0 +1,148 @@
+import hashlib
+import os
+
+from atomic_file import fsync_directory
+from serializer import DecodeError, dumps, loads
+
+
+class GroupCommitJournal:
+    """
+    This class is applied to batch many inserts into one durable commit
+
+    Records are collected in memory and written to a write-ahead journal
+    (<file>.journal) with one fsync. The journal is then applied to the main
+    file with one atomic write, which fsyncs the data file as well, and
+    truncated. A burst therefore costs two file fsyncs (journal and data
+    file) and two directory fsyncs, however many records it has. If the
+    process dies in between, recover() replays the journal the next time
+    the file is opened.
+    Every entry keeps a checksum of the main file it was written against, so
+    it is replayed only onto that exact file. Commits are not locked here,
+    concurrent writers should go through file_lock.BatchingWriter.
+
+    The atomic write alone already never leaves a half-written file and costs
+    one file fsync less, so JsonManager uses the journal only when its
+    journaled flag is set.
+
+    Attributes:
+        - manager: JsonManager whose read_file/write_file are used for the main file
+        - pending (list): records waiting for the next commit
+    """
+
+    def __init__(self, manager) -> None:
+        self.manager = manager
+        self.journal_name = journal_name(manager.file_name)
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.pending = []
+
+    def add(self, data: dict):
+        """
+        This method queues one record for the next commit
+        """
+        self.pending.append(data)
+
+    def commit(self):
+        """
+        This method makes all queued records durable with one journal fsync and applies them
+        """
+        if not self.pending:
+            return 0
+        all_data = self.write_journal()
+        return self.apply(all_data)
+
+    def write_journal(self):
+        """
+        This method makes the queued records durable in the journal and returns the current data
+        """
+        checksum = file_checksum(self.manager.file_name)
+        all_data = self.manager.read_file()
+        entry = {"checksum": checksum, "records": self.pending}
+        with open(self.journal_name, mode="a", encoding="utf-8") as file:
+            file.write(dumps(entry) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        fsync_directory(os.path.dirname(os.path.abspath(self.journal_name)))
+        return all_data
+
+    def apply(self, all_data):
+        """
+        This method writes the journaled records into the main file and clears the journal
+        """
+        all_data.extend(self.pending)
+        self.manager.write_file(all_data)
+        self.truncate()
+
+        committed = len(self.pending)
+        self.pending = []
+        return committed
+
+    def recover(self):
+        """
+        This method replays journal entries that did not reach the main file
+        """
+        if not os.path.exists(self.journal_name):
+            return 0
+
+        entries = []
+        with open(self.journal_name, mode="r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entries.append(loads(line))
+                except DecodeError:
+                    break  # the crash happened while writing this entry, it was never committed
+
+        replayed = 0
+        for entry in entries:
+            # An entry is applied only onto the file it was written against; any other
+            # content means the crash happened after the main file was replaced, or
+            # the file was changed since (e.g. a record was removed).
+            if entry.get("checksum") == file_checksum(self.manager.file_name):
+                self.manager.write_file(self.manager.read_file() + entry["records"])
+                replayed += len(entry["records"])
+        self.truncate()
+        return replayed
+
+    def truncate(self):
+        """
+        This method removes the journal once its entries are in the main file
+        """
+        if os.path.exists(self.journal_name):
+            os.remove(self.journal_name)
+
+
+def file_checksum(file_name):
+    """
+    This function returns the SHA-256 of the file's bytes, "" if there is no file
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(file_name, mode="rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return ""
+    return digest.hexdigest()
+
+
+def journal_name(file_name):
+    """
+    This function returns the journal path of a data file
+    """
+    return file_name + ".journal"
+
+
+def recover_journal(manager):
+    """
+    This function replays a leftover journal of the manager's file, if there is one
+    """
+    if os.path.exists(journal_name(manager.file_name)):
+        return GroupCommitJournal(manager).recover()
+    return 0
@@ -0,0 +1,282 @@
+import itertools
+import os
+import sys
+
+from atomic_file import atomic_write
+from file_lock import FileLock
+from serializer import DecodeError, dumps, loads
+
+TOMBSTONE_KEY = "_deleted"
+
+
+class JsonLinesManager:
+    """
+    This class is applied to manage working with JSON Lines files
+
+    Every record is kept on its own line, so adding one record is a single
+    append instead of rewriting the whole file. Removing records appends a
+    tombstone line, and the file is compacted once tombstones pile up.
+    Appends hold a shared lock and compaction an exclusive one, so a record
+    appended by another process while the file is compacted is not lost.
+
+    Attributes:
+        - file_name (str): path of the .jsonl file
+        - compact_every (int): number of tombstones allowed before compaction
+    """
+
+    def __init__(self, file_name, compact_every=100) -> None:
+        self.file_name = file_name
+        self.compact_every = compact_every
+        self.tombstones = 0
+
+    def check_existance(self):
+        """
+        This method checks the existance of the file and if the file is not empty
+        """
+        return os.path.exists(self.file_name) and os.path.getsize(self.file_name) != 0
+
+    def read_file(self):
+        """
+        This method replays the log and returns the live records
+        """
+        self.tombstones = 0
+        if not self.check_existance():
+            return []
+
+        records = []
+        tombstones = Tombstones()
+        for position, record in self._iter_lines():
+            if TOMBSTONE_KEY in record:
+                tombstones.add(record[TOMBSTONE_KEY], position)
+            else:
+                records.append((position, record))
+        self.tombstones = len(tombstones)
+        if not tombstones:
+            return [record for _, record in records]
+        return [record for position, record in records if not tombstones.removes(record, position)]
+
+    def iter_records(self, offset=0, limit=None):
+        """
+        This method yields live records one by one without loading the whole file
+
+        A first pass collects only the tombstones with their positions, the
+        second pass streams the records that no later tombstone removed.
+        """
+        if not self.check_existance():
+            return
+        tombstones = self._read_tombstones()
+        live = (
+            record for position, record in self._iter_lines()
+            if TOMBSTONE_KEY not in record and not tombstones.removes(record, position)
+        )
+        yield from itertools.islice(live, offset, None if limit is None else offset + limit)
+
+    def _read_tombstones(self, chunk_size=1 << 20):
+        # Scans raw chunks for the tombstone key and parses only the lines that contain it
+        marker = f'"{TOMBSTONE_KEY}"'.encode("utf-8")
+        tombstones = Tombstones()
+        rest = b""
+        start = 0  # byte offset of rest in the file
+        with open(self.file_name, mode="rb") as file:
+            while True:
+                chunk = file.read(chunk_size)
+                data = rest + chunk
+                complete, newline, rest = data.rpartition(b"\n") if chunk else (data, b"", b"")
+                if marker in complete:
+                    position = start
+                    for line in complete.split(b"\n"):
+                        if marker in line:
+                            try:
+                                record = loads(line.decode("utf-8"))
+                            except (DecodeError, UnicodeDecodeError):
+                                record = {}
+                            if TOMBSTONE_KEY in record:
+                                tombstones.add(record[TOMBSTONE_KEY], position)
+                        position += len(line) + 1
+                start += len(complete) + len(newline)
+                if not chunk:
+                    return tombstones
+
+    def _iter_lines(self):
+        # Yields (byte offset of the line, record), the offset orders records and tombstones
+        position = 0
+        with open(self.file_name, mode="rb") as file:
+            for line in file:
+                start, position = position, position + len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield start, loads(line.decode("utf-8"))
+                except (DecodeError, UnicodeDecodeError):
+                    continue  # a torn last line from an interrupted append
+
+    def appending(self):
+        """
+        This method returns the lock appends hold, shared so appends do not wait for each other
+        """
+        return FileLock(self.file_name + ".compact", shared=True)
+
+    def write_file(self, all_data):
+        """
+        This method rewrites the whole file with the given records
+        """
+        with FileLock(self.file_name + ".compact"), open(self.file_name, mode="w", encoding="utf-8") as file:
+            for data in all_data:
+                file.write(dumps(data) + "\n")
+        self.tombstones = 0
+        return "Data is written to a file"
+
+    def append_line(self, data: dict):
+        """
+        This method appends one record to the file with a single O_APPEND write
+        """
+        line = (dumps(data) + "\n").encode("utf-8")
+        with self.appending():
+            fd = os.open(self.file_name, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def add_onedata_to_file(self, data: dict):
+        """
+        This method writes one given data into the file
+        """
+        self.append_line(data)
+        return "Data is written to a file"
+
+    add_one_data_to_file = add_onedata_to_file
+    add_data = add_onedata_to_file
+
+    def add_many(self, all_data):
+        """
+        This method appends many records to the file with a single O_APPEND write
+        """
+        all_data = list(all_data)
+        lines = "".join(dumps(data) + "\n" for data in all_data)
+        if lines:
+            with self.appending():
+                fd = os.open(self.file_name, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    view = memoryview(lines.encode("utf-8"))
+                    while view:  # a very large write can be split by the OS
+                        view = view[os.write(fd, view):]
+                finally:
+                    os.close(fd)
+        return len(all_data)
+
+    def remove_data(self, key, value):
+        """
+        This method removes every record whose key equals the given value
+        """
+        all_data = self.read_file()
+        found = any(data.get(key) == value for data in all_data)
+        if not found:
+            return False
+
+        self.add_tombstone(key, value)
+        return True
+
+    def add_tombstone(self, key, value):
+        """
+        This method appends a tombstone line and compacts the file when needed
+        """
+        self.append_line({TOMBSTONE_KEY: {key: value}})
+        self.tombstones += 1
+        if self.tombstones >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """
+        This method rewrites the file without tombstones and removed records
+
+        The exclusive lock keeps appends out between reading the file and
+        replacing it, otherwise they would be written to the replaced file.
+        """
+        with FileLock(self.file_name + ".compact"):
+            all_data = self.read_file()
+            atomic_write(self.file_name, "".join(dumps(data) + "\n" for data in all_data))
+        self.tombstones = 0
+        return len(all_data)
+
+    def get_all_participants(self):
+        """
+        This method retrieves all participants from the file
+        """
+        return self.read_file()
+
+    def removing_participants(self, team_name):
+        """
+        This method removes a team by its name
+        """
+        if self.remove_data('Team_name', team_name):
+            return True
+        print("There is no such team in the list. Please try again later.")
+        return False
+
+
+class Tombstones:
+    """
+    This class is applied to decide which records the tombstones of a log remove
+
+    A tombstone removes the matching records written before it, a record
+    added again after it stays. Tombstones are grouped by the keys they
+    match on, so checking a record costs one dict lookup per group instead
+    of one comparison per tombstone.
+    """
+
+    def __init__(self) -> None:
+        self.latest = {}  # matched keys -> {their values: position of the last such tombstone}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, conditions, position):
+        """
+        This method records a tombstone found at the given position of the log
+        """
+        keys = tuple(sorted(conditions))
+        self.latest.setdefault(keys, {})[tuple(hashable(conditions[key]) for key in keys)] = position
+        self.count += 1
+
+    def removes(self, record, position):
+        """
+        This method checks if a tombstone after the given position matches the record
+        """
+        for keys, latest in self.latest.items():
+            removed_at = latest.get(tuple(hashable(record.get(key)) for key in keys))
+            if removed_at is not None and removed_at > position:
+                return True
+        return False
+
+
+def hashable(value):
+    """
+    This function returns a value that can be a dict key and compares like the value
+    """
+    return dumps(value) if isinstance(value, (list, dict)) else value
+
+
+def convert_json_to_jsonl(json_file, jsonl_file=None):
+    """
+    This function converts a JSON array file into a JSON Lines file
+    """
+    if jsonl_file is None:
+        jsonl_file = os.path.splitext(json_file)[0] + ".jsonl"
+
+    with open(json_file, mode="r", encoding="utf-8") as file:
+        all_data = loads(file.read()) if os.path.getsize(json_file) else []
+
+    JsonLinesManager(jsonl_file).write_file(all_data)
+    return jsonl_file
+
+
+if __name__ == "__main__":
+    # Usage: python jsonl_manager.py participants.json clients.json scooter_owners.json
+    for name in sys.argv[1:] or ["participants.json", "clients.json", "scooter_owners.json"]:
+        if os.path.exists(name):
+            print(f"{name} -> {convert_json_to_jsonl(name)}")
+        else:
+            print(f"{name} was not found, skipping.")
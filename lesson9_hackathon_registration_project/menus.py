@@ -0,0 +1,27 @@
+"""
+Menu loop shared by the console apps
+
+Every screen of an app is a function that does its work and returns the name
+of the next screen, or None to quit. run_menus() calls the screens one after
+another in a loop, so going from menu to menu never grows the call stack and
+a session can run for as long as the kiosk is on.
+"""
+
+
+def run_menus(screens, start):
+    """
+    This function shows screens until one of them returns None
+    """
+    screen = start
+    while screen is not None:
+        screen = screens[screen]()
+
+
+def read_choice(prompt="Choose a number from menu: "):
+    """
+    This function reads a menu number, None if the answer is not a number
+    """
+    try:
+        return int(input(prompt))
+    except ValueError:
+        return None
@@ -0,0 +1,179 @@
+"""
+Compact in-memory records of the hackathon and scooter apps
+
+These classes only hold data, reading and writing files stays in the storage
+managers. __slots__ records have no per-object __dict__, and ScooterColumns
+keeps a whole fleet in typed arrays, so large in-memory caches stay small.
+Records are turned back into the dicts stored on disk with formatting_*().
+"""
+import sys
+from array import array
+
+missing = float("nan")  # latitude/longitude of a scooter without coordinates in ScooterColumns
+
+
+class Participant:
+    """
+    This class is applied to manage participant info
+
+    Attributes:
+        - full_name (str): gets full name of the group leader
+        - contact (str): gets a contact of the group leader
+        - team_name (str): gets a team name
+        - participants (list): names of the other team members
+    """
+
+    __slots__ = ('full_name', 'contact', 'team_name', 'participants')
+
+    def __init__(self, full_name, contact, team_name, participants=None):
+        self.full_name = full_name
+        self.contact = contact
+        self.team_name = team_name
+        self.participants = [] if participants is None else list(participants)
+
+    def add_team_member(self, member_name):
+        """This method is used to add other team members to the list"""
+        self.participants.append(member_name)
+
+    def formatting_team(self):
+        """This method is used to format input data in dict format"""
+        return {
+            'Leader_name': self.full_name,
+            'Leader_contact': self.contact,
+            'Team_name': self.team_name,
+            'Other_participants': self.participants
+        }
+
+    @classmethod
+    def from_record(cls, data):
+        """This method makes a Participant from a stored team record"""
+        return cls(data['Leader_name'], data['Leader_contact'], data['Team_name'], data.get('Other_participants'))
+
+
+class Scooter:
+    """
+    This class is applied to keep one scooter with typed values
+
+    location and model_name are interned, so a fleet shares one string per
+    city and model instead of one per scooter.
+
+    Attributes:
+        - id (int): scooter id
+        - battery (float): battery level in percent
+        - location (str): city of the scooter
+        - model_name (str): scooter model
+        - price_per_minute (float): price of one minute
+        - latitude, longitude (float): coordinates or None
+    """
+
+    __slots__ = ('id', 'battery', 'location', 'model_name', 'price_per_minute', 'latitude', 'longitude')
+
+    def __init__(self, scooter_id, battery, location, model_name, price_per_minute, latitude=None, longitude=None):
+        self.id = scooter_id
+        self.battery = float(battery)
+        self.location = sys.intern(location)
+        self.model_name = sys.intern(model_name)
+        self.price_per_minute = float(price_per_minute)
+        self.latitude = latitude
+        self.longitude = longitude
+
+    def formatting_scooter(self):
+        """This method is used to format the scooter in dict format"""
+        scooter = {
+            'id': self.id,
+            'battery': self.battery,
+            'location': self.location,
+            'model_name': self.model_name,
+            'price_per_minute': self.price_per_minute,
+        }
+        if self.latitude is not None:
+            scooter['latitude'], scooter['longitude'] = self.latitude, self.longitude
+        return scooter
+
+    @classmethod
+    def from_record(cls, data):
+        """This method makes a Scooter from a stored scooter record"""
+        return cls(
+            data['id'], data['battery'], data['location'], data['model_name'], data['price_per_minute'],
+            data.get('latitude'), data.get('longitude'),
+        )
+
+
+class ScooterColumns:
+    """
+    This class is applied to keep a whole scooter fleet in columns
+
+    Every numeric field is one typed array and location and model_name are
+    stored as small integer codes into a shared list of names, so a scooter
+    costs a few dozen bytes instead of a dict with its own strings.
+
+    Attributes:
+        - ids, battery, price_per_minute, latitude, longitude (array): one value per scooter
+        - location_codes, model_codes (array): positions in locations and models
+        - locations, models (list): distinct names, a code is the position of the name
+    """
+
+    def __init__(self, records=()) -> None:
+        self.ids = array('q')
+        self.battery = array('d')
+        self.price_per_minute = array('d')
+        self.latitude = array('d')
+        self.longitude = array('d')
+        self.location_codes = array('I')
+        self.model_codes = array('I')
+        self.locations = []
+        self.models = []
+        self.location_numbers = {}
+        self.model_numbers = {}
+        self.extend(records)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def code(self, names, numbers, name):
+        """
+        This method returns the code of a name and adds the name if it is new
+        """
+        number = numbers.get(name)
+        if number is None:
+            number = numbers[name] = len(names)
+            names.append(name)
+        return number
+
+    def append(self, data):
+        """
+        This method adds one scooter record (dict)
+        """
+        self.ids.append(int(data['id']))
+        self.battery.append(float(data['battery']))
+        self.price_per_minute.append(float(data['price_per_minute']))
+        latitude = data.get('latitude')
+        self.latitude.append(missing if latitude is None else float(latitude))
+        longitude = data.get('longitude')
+        self.longitude.append(missing if longitude is None else float(longitude))
+        self.location_codes.append(self.code(self.locations, self.location_numbers, data['location']))
+        self.model_codes.append(self.code(self.models, self.model_numbers, data['model_name']))
+
+    def extend(self, records):
+        """
+        This method adds many scooter records
+        """
+        for data in records:
+            self.append(data)
+
+    def row(self, position):
+        """
+        This method returns the scooter at a position as a Scooter
+        """
+        latitude = self.latitude[position]
+        has_coordinates = latitude == latitude  # nan is not equal to itself
+        return Scooter(
+            self.ids[position], self.battery[position],
+            self.locations[self.location_codes[position]], self.models[self.model_codes[position]],
+            self.price_per_minute[position],
+            latitude if has_coordinates else None, self.longitude[position] if has_coordinates else None,
+        )
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self.row(position)
@@ -0,0 +1,279 @@
+import collections
+import os
+import threading
+
+from file_lock import BatchingWriter, FileLock, file_signature  # noqa: F401  file_signature is re-exported
+
+_caches = {}
+_lock = threading.Lock()
+
+
+class DerivedKey:
+    """
+    This class is applied to index records by values computed from them
+
+    A derived key can give several values for one record, e.g. the name of
+    every member of a team, so one lookup finds the record by any of them.
+
+    Attributes:
+        - name (str): name of the index used in find() and exists()
+        - values: function that returns the values of a record to index
+    """
+
+    def __init__(self, name, values) -> None:
+        self.name = name
+        self.values = values
+
+    def __repr__(self):
+        return f"DerivedKey({self.name!r})"
+
+
+class RecordIndex:
+    """
+    This class keeps records in memory with hash indexes
+
+    Lookups and duplicate checks cost O(1) instead of a scan. The records
+    and indexes are guarded by a lock, so the threads of a server can share
+    one index.
+
+    Attributes:
+        - keys (tuple): record keys that get an index, e.g. ('Team_name', 'Leader_contact'),
+          or DerivedKey objects
+    """
+
+    def __init__(self, keys) -> None:
+        self.keys = tuple(keys)
+        self.names = tuple(index_name(key) for key in self.keys)
+        self.records = {}
+        self.indexes = {name: {} for name in self.names}
+        self.next_slot = 0
+        self.lock = threading.RLock()
+
+    def refresh(self):
+        """
+        This method brings the records up to date before a lookup, records only kept in memory always are
+        """
+        return False
+
+    def add(self, data: dict):
+        """
+        This method adds one record to the indexes
+        """
+        with self.lock:
+            self._insert(data)
+            return data
+
+    def _insert(self, data):
+        slot = self.next_slot
+        self.next_slot += 1
+        self.records[slot] = data
+        for key, name in zip(self.keys, self.names):
+            for value in key_values(key, data):
+                self.indexes[name].setdefault(value, set()).add(slot)
+
+    def _delete(self, slot):
+        data = self.records.pop(slot)
+        for key, name in zip(self.keys, self.names):
+            for value in key_values(key, data):
+                slots = self.indexes[name].get(value)
+                if slots is not None:
+                    slots.discard(slot)
+                    if not slots:
+                        del self.indexes[name][value]
+        return data
+
+    def all(self):
+        """
+        This method returns all cached records in file order
+        """
+        with self.lock:
+            self.refresh()
+            return list(self.records.values())
+
+    def find(self, key, value):
+        """
+        This method returns every record whose key equals the given value
+        """
+        with self.lock:
+            self.refresh()
+            slots = self.indexes[key].get(value, ())
+            return [self.records[slot] for slot in sorted(slots)]
+
+    def exists(self, key, value):
+        """
+        This method checks if a record with the given key and value exists
+        """
+        with self.lock:
+            self.refresh()
+            return value in self.indexes[key]
+
+    def find_overlapping(self, key, values, min_shared=1):
+        """
+        This method returns (shared, record) pairs of the records that have at least min_shared of the values under a key
+
+        Any min_shared of the values cover all but len(values) - min_shared of
+        them, so a matching record must be in one of the len(values) - min_shared + 1
+        smallest postings. Only those are read to pick the candidates; the
+        larger postings are then only checked for the candidates that can
+        still reach min_shared, so common values do not make the lookup scan
+        the whole file.
+        """
+        with self.lock:
+            self.refresh()
+            index = self.indexes[key]
+            postings = sorted((index.get(value, set()) for value in set(values)), key=len)
+            min_shared = max(1, min_shared)
+            probe = len(postings) - min_shared + 1
+            if probe < 1:
+                return []
+
+            shared = collections.Counter()
+            for slots in postings[:probe]:
+                shared.update(slots)
+            for position in range(probe, len(postings)):
+                slots, left = postings[position], len(postings) - position
+                shared = {slot: count + (slot in slots) for slot, count in shared.items() if count + left >= min_shared}
+            return [(shared[slot], self.records[slot]) for slot in sorted(shared) if shared[slot] >= min_shared]
+
+
+class RecordCache(RecordIndex):
+    """
+    This class keeps the parsed records of a file in memory with hash indexes
+
+    The file is parsed again only when its mtime or size changes, so lookups,
+    duplicate checks and deletes cost O(1) instead of a full reload and scan.
+
+    Attributes:
+        - manager: JsonManager or JsonLinesManager used to read and write the file
+        - keys (tuple): record keys that get an index, e.g. ('Team_name', 'Leader_contact'),
+          or DerivedKey objects
+    """
+
+    def __init__(self, manager, keys) -> None:
+        super().__init__(keys)
+        self.manager = manager
+        self.signature = None
+        self.loaded = False
+
+    def refresh(self):
+        """
+        This method reloads the records only if the file changed since the last load
+        """
+        with self.lock:
+            signature = file_signature(self.manager.file_name)
+            if self.loaded and signature == self.signature:
+                return False
+
+            self.records = {}
+            self.indexes = {name: {} for name in self.names}
+            self.next_slot = 0
+            for data in self.manager.read_file():
+                self._insert(data)
+            self.signature = signature
+            self.loaded = True
+            return True
+
+    def add(self, data: dict):
+        """
+        This method writes one record through the manager and adds it to the indexes
+
+        Managers with batched appends commit the record through a
+        BatchingWriter. If this process commits the batch and the file still
+        had the cached signature right before it, the whole batch (also the
+        records spooled by other processes) is indexed in place. Otherwise
+        the file is read again on the next use.
+        """
+        with self.lock:
+            committed = []
+
+            def on_commit(records, before):
+                # runs under the file lock, so nobody changed the file after the batch
+                if self.loaded and before == self.signature:
+                    for record in records:
+                        self._insert(record)
+                    self.signature = file_signature(self.manager.file_name)
+                    committed.append(True)
+
+            if getattr(self.manager, "batched_appends", False):
+                BatchingWriter(self.manager).add(data, on_commit)
+            else:
+                add_one = getattr(self.manager, "add_onedata_to_file", None) or self.manager.add_one_data_to_file
+                add_one(data)
+            if not committed:
+                self.loaded = False
+            return data
+
+    def add_many(self, records):
+        """
+        This method writes many records with one bulk write and adds them to the indexes
+        """
+        records = list(records)
+        with self.lock:
+            up_to_date = self.loaded and file_signature(self.manager.file_name) == self.signature
+            self.manager.add_many(records)
+            if up_to_date:
+                for data in records:
+                    self._insert(data)
+                self.signature = file_signature(self.manager.file_name)
+            else:
+                self.loaded = False
+            return len(records)
+
+    def remove(self, key, value):
+        """
+        This method removes every record whose key equals the given value, key must be a record key
+        """
+        with self.lock, FileLock(self.manager.file_name):  # another process may be appending right now
+            self.refresh()
+            slots = self.indexes[key].get(value)
+            if not slots:
+                return False
+
+            for slot in list(slots):
+                self._delete(slot)
+
+            if hasattr(self.manager, "delete_records"):
+                self.manager.delete_records(key, value)
+            elif hasattr(self.manager, "add_tombstone"):
+                self.manager.add_tombstone(key, value)
+            else:
+                self.manager.write_file(list(self.records.values()))
+            self.signature = file_signature(self.manager.file_name)
+        return True
+
+
+def index_name(key):
+    """
+    This function returns the name of the index of a record key or DerivedKey
+    """
+    return key.name if isinstance(key, DerivedKey) else key
+
+
+def key_values(key, data):
+    """
+    This function returns the values a record is indexed by under a record key or DerivedKey
+    """
+    if isinstance(key, DerivedKey):
+        return [value for value in key.values(data) if is_indexable(value)]
+    value = data.get(key)
+    return (value,) if is_indexable(value) else ()
+
+
+def is_indexable(value):
+    """
+    This function checks if a value can be used as an index key
+    """
+    return value is not None and isinstance(value, (str, int, float, bool))
+
+
+def get_record_cache(manager, keys):
+    """
+    This function returns the shared cache of a file so every caller sees the same records
+    """
+    cache_key = os.path.abspath(manager.file_name)
+    with _lock:
+        cache = _caches.get(cache_key)
+        if cache is None or cache.keys != tuple(keys):
+            cache = RecordCache(manager, keys)
+            _caches[cache_key] = cache
+        return cache
@@ -0,0 +1,212 @@
+import contextlib
+import itertools
+import math
+import threading
+import time
+
+AVAILABLE = "available"
+RESERVED = "reserved"
+RIDING = "riding"
+
+
+class RentalError(Exception):
+    """
+    This exception is raised when a rental operation is not possible
+    """
+
+
+class Rental:
+    """
+    This class is applied to keep one reservation or ride of a scooter
+
+    Attributes:
+        - rental_id (int): unique number of the rental
+        - scooter_id: id of the rented scooter
+        - client (str): username of the client
+        - price_per_minute (float): price at the moment of reservation
+    """
+
+    def __init__(self, rental_id, scooter_id, client, price_per_minute) -> None:
+        self.rental_id = rental_id
+        self.scooter_id = scooter_id
+        self.client = client
+        self.price_per_minute = price_per_minute
+        self.reserved_at = time.time()
+        self.started_at = None
+        self.ended_at = None
+        self.cost = None
+
+    def formatting_rental(self):
+        """This method is used to format the rental in dict format"""
+        return {
+            'rental_id': self.rental_id,
+            'scooter_id': self.scooter_id,
+            'client': self.client,
+            'price_per_minute': self.price_per_minute,
+            'reserved_at': self.reserved_at,
+            'started_at': self.started_at,
+            'ended_at': self.ended_at,
+            'cost': self.cost,
+        }
+
+
+class RentalEngine:
+    """
+    This class is applied to reserve, start and end scooter rentals without double-booking
+
+    The state of every scooter (available, reserved, riding) lives in memory.
+    Each state change is a compare-and-swap done under one of lock_stripes
+    locks chosen by the scooter id, so requests for different scooters do not
+    wait for each other and two requests for the same scooter never both win.
+    The index is updated under the same lock, so it always shows the latest
+    state of the scooter.
+
+    Attributes:
+        - scooters (dict): scooter id -> scooter record
+        - history: optional manager that gets every finished rental (add_one_data_to_file)
+        - index: optional ScooterGridIndex kept in sync with availability
+    """
+
+    def __init__(self, scooters, history=None, index=None, lock_stripes=64) -> None:
+        self.scooters = {scooter['id']: scooter for scooter in scooters}
+        self.states = {scooter_id: AVAILABLE for scooter_id in self.scooters}
+        self.rentals = {}
+        self.history = history
+        self.index = index
+        self.locks = [threading.Lock() for _ in range(lock_stripes)]
+        self.rental_ids = itertools.count(1)
+
+    def _lock(self, scooter_id):
+        return self.locks[hash(scooter_id) % len(self.locks)]
+
+    @contextlib.contextmanager
+    def _all_locks(self):
+        with contextlib.ExitStack() as stack:
+            for lock in self.locks:
+                stack.enter_context(lock)
+            yield
+
+    def add_scooter(self, scooter):
+        """
+        This method puts a new scooter into the fleet as available
+        """
+        with self._lock(scooter['id']):
+            self.scooters[scooter['id']] = scooter
+            self.states.setdefault(scooter['id'], AVAILABLE)
+
+    def state_of(self, scooter_id):
+        """
+        This method returns the state of a scooter or None if it is not in the fleet
+        """
+        with self._lock(scooter_id):
+            return self.states.get(scooter_id)
+
+    def compare_and_swap(self, scooter_id, expected, new):
+        """
+        This method changes the state of a scooter only if it is still the expected one
+        """
+        with self._lock(scooter_id):
+            if self.states.get(scooter_id) != expected:
+                return False
+            self.states[scooter_id] = new
+            if self.index is not None and scooter_id in self.index.scooters:
+                self.index.set_available(scooter_id, new == AVAILABLE)
+        return True
+
+    def use_index(self, index):
+        """
+        This method switches to a rebuilt index and marks the taken scooters in it
+
+        All stripe locks are held, so no state change is lost in between.
+        """
+        with self._all_locks():
+            for scooter_id, state in self.states.items():
+                if state != AVAILABLE and scooter_id in index.scooters:
+                    index.set_available(scooter_id, False)
+            self.index = index
+
+    def reserve(self, scooter_id, client):
+        """
+        This method reserves an available scooter for a client and returns the Rental
+        """
+        if self.state_of(scooter_id) is None:
+            raise RentalError(f"Scooter {scooter_id} does not exist.")
+        if not self.compare_and_swap(scooter_id, AVAILABLE, RESERVED):
+            raise RentalError(f"Scooter {scooter_id} is already taken.")
+
+        with self._lock(scooter_id):
+            price = parse_price(self.scooters[scooter_id].get('price_per_minute'))
+        rental = Rental(next(self.rental_ids), scooter_id, client, price)
+        self.rentals[rental.rental_id] = rental
+        return rental
+
+    def start(self, rental):
+        """
+        This method starts the ride of a reserved scooter
+        """
+        if not self.compare_and_swap(rental.scooter_id, RESERVED, RIDING):
+            raise RentalError(f"Scooter {rental.scooter_id} is not reserved.")
+        rental.started_at = time.time()
+        return rental
+
+    def cancel(self, rental):
+        """
+        This method cancels a reservation that was not started
+        """
+        if not self.compare_and_swap(rental.scooter_id, RESERVED, AVAILABLE):
+            raise RentalError(f"Scooter {rental.scooter_id} is not reserved.")
+        self.rentals.pop(rental.rental_id, None)
+        return rental
+
+    def end(self, rental):
+        """
+        This method ends a ride, bills every started minute and frees the scooter
+        """
+        if rental.started_at is None or rental.ended_at is not None:
+            raise RentalError("This ride is not active.")
+        rental.ended_at = time.time()
+        rental.cost = billed_cost(rental.started_at, rental.ended_at, rental.price_per_minute)
+        if not self.compare_and_swap(rental.scooter_id, RIDING, AVAILABLE):
+            raise RentalError(f"Scooter {rental.scooter_id} is not being ridden.")
+        self.rentals.pop(rental.rental_id, None)
+        if self.history is not None:
+            self.history.add_one_data_to_file(rental.formatting_rental())
+        return rental.cost
+
+    def available_ids(self):
+        """
+        This method returns the ids of all available scooters
+
+        The list is taken under all stripe locks, so add_scooter() of another
+        thread never changes the dicts while they are read.
+        """
+        with self._all_locks():
+            return [scooter_id for scooter_id, state in self.states.items() if state == AVAILABLE]
+
+    def available_scooters(self, min_battery=0):
+        """
+        This method returns copies of the available scooters with at least min_battery percent, taken under all stripe locks
+        """
+        with self._all_locks():
+            return [
+                dict(self.scooters[scooter_id]) for scooter_id, state in self.states.items()
+                if state == AVAILABLE and float(self.scooters[scooter_id].get('battery', 0)) >= min_battery
+            ]
+
+
+def parse_price(price):
+    """
+    This function converts the stored price per minute (a string) into a number
+    """
+    try:
+        return float(price)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def billed_cost(started_at, ended_at, price_per_minute):
+    """
+    This function bills every started minute of a ride, at least one minute
+    """
+    minutes = max(1, math.ceil((ended_at - started_at) / 60))
+    return round(minutes * price_per_minute, 2)
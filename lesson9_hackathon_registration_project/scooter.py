@@ -1,83 +1,62 @@
-import json 
-import os
-import random
+import itertools
+import threading
 
+import storage
+from credentials import CredentialError, get_credential_store
+from fleet_analytics import get_fleet_analytics
+from id_allocator import IdAllocator
+from rental_engine import RentalEngine, RentalError
+from record_cache import get_record_cache
+from scooter_index import get_scooter_index, on_scooter_index_rebuild, update_scooter_index
+from validation import scooter_schema, validated_records
 
-class JsonManager:
+scooters_file = "scooter_owners.json"  # or "scooters.jsonl" / "scooters.db" after converting the data
+rental_engine = None  # created by get_rental_engine()
+rental_engine_lock = threading.Lock()  # the API server asks for the engine from many threads at once
+
+
+class JsonManager(storage.JsonManager):
     """
-    This class is applied to manage working with json files
+    This class is applied to manage working with the scooter and account files
     """
 
-    def __init__(self, file_name) -> None:
-        self.file_name = file_name
+    index_keys = ('id', 'username')
 
-    def check_existence(self):
-        """
-        This method checks the existence of the file and if the file is not empty
-        """
-        return os.path.exists(self.file_name) and os.path.getsize(self.file_name) != 0
-
-    def read_file(self):
+    def validate_data(self, data):
         """
-        This method reads the data of the file
+        Validate if the given data is a scooter with all necessary keys and correct values
         """
-        if self.check_existence():
-            with open(self.file_name, mode="r") as file:
-                return json.load(file)
-        return []
-
-    def write_file(self, all_data):
-        """
-        This method writes all data into the file
+        return scooter_schema.is_valid(data)
+    
+    def get_all_data(self):
         """
-        with open(self.file_name, mode="w") as file:
-            json.dump(all_data, file, indent=4)
-            return "Data is written to a file"
+        This method retrieves all valid data from the file, battery and price converted to numbers
 
-    def add_one_data_to_file(self, data: dict):
+        Validated records are cached until the file changes.
         """
-        This method writes one given data into the file
-        """
-        all_data = self.read_file()
-        all_data.append(data)
-        self.write_file(all_data)
+        return list(validated_records(self, scooter_schema))
 
-    def validate_data(self, data):
-        """
-        Validate if the given data has all necessary keys
+    def iter_data(self, offset=0, limit=None):
         """
-        required_keys = ['id', 'battery', 'location', 'model_name', 'price_per_minute']
-        for key in required_keys:
-            if key not in data:
-                return False
-        return True
-    
-    def get_all_data(self):
-        """
-        This method retrieves all valid data from the file
+        This method yields valid data one by one without loading the whole file
         """
-        all_data = self.read_file()
-        
-        valid_data = []
-        for data in all_data:
-            if self.validate_data(data):
-                valid_data.append(data)
-                
-        return valid_data
+        valid_data = scooter_schema.iter_valid(self.iter_records())
+        yield from itertools.islice(valid_data, offset, None if limit is None else offset + limit)
     
     def remove_data(self, identifier):
         """
         This method removes data from the file based on a given identifier
         """
-        all_data = self.read_file()
-        updated_data = [data for data in all_data if data.get('id') != identifier]
-
-        if len(updated_data) < len(all_data):
-            self.write_file(updated_data)
+        if self.remove_where('id', identifier):
             return True
-        else:
-            print("Data with given ID not found.")
-            return False
+        print("Data with given ID not found.")
+        return False
+
+    def find_data(self, identifier):
+        """
+        This method finds data by its identifier without scanning the file
+        """
+        return self.cache().find('id', identifier)
         
     
 
@@ -99,13 +78,14 @@ class ScooterOwner(JsonManager):
 
     def login(self):
         """
-        Login method for scooter owner
+        Login method for scooter owner, the password is checked against its stored hash
         """
         entered_username = input("Enter your username: ").strip()
         entered_password = input("Enter your password: ").strip()
 
-        if entered_username == self.username and entered_password == self.password:
+        if get_credential_store(self).authenticate(entered_username, entered_password):
             print("Login successful!")
+            self.username = entered_username
             self.logged_in = True
             return True
         else:
@@ -116,6 +96,7 @@ class ScooterOwner(JsonManager):
         """
         Logout method for scooter owner
         """
+        get_credential_store(self).forget(self.username)
         self.logged_in = False
         print("Logged out successfully.")
 
@@ -124,11 +105,35 @@ class ScooterOwner(JsonManager):
         Method to add a new scooter
         """
         if self.logged_in:
-            self.add_one_data_to_file(scooter_data)
+            scooters = get_scooter_manager()
+            previous_signature = storage.file_signature(scooters.file_name)
+            scooters.add_one_data_to_file(scooter_data)
+            update_scooter_index(scooters, scooter_data, previous_signature)
+            if rental_engine is not None:
+                rental_engine.add_scooter(scooter_data)
             print("Scooter added successfully!")
         else:
             print("You need to login first to add a scooter.")
 
+    def show_fleet_statistics(self, low_battery=20):
+        """
+        Method to print battery and price statistics of the whole fleet
+        """
+        analytics = get_fleet_analytics(get_scooter_manager())
+        if not len(analytics):
+            print("No scooters yet.")
+            return
+        print(f"\nScooters: {len(analytics)}, need a charge (battery under {low_battery}%): "
+              f"{analytics.low_battery_count(low_battery)}")
+        for location, count in analytics.low_battery_by_location(low_battery).items():
+            print(f"- {location}: {count} to charge")
+        print("Battery levels:")
+        for low, high, count in analytics.battery_distribution():
+            print(f"- {low}-{high}%: {count}")
+        print("Price per minute (median / 90th percentile):")
+        for (location, model_name), prices in sorted(analytics.price_percentiles((50, 90)).items()):
+            print(f"- {location}, {model_name}: ${prices[50]:.2f} / ${prices[90]:.2f}")
+
     def display_menu(self):
         """
         Display menu for scooter owner after logging in
@@ -136,8 +141,9 @@ class ScooterOwner(JsonManager):
         while True:
             print("\nScooter Owner Menu:")
             print("1. Add Scooter")
-            print("2. Logout")
-            print("3. Exit")
+            print("2. Fleet statistics")
+            print("3. Logout")
+            print("4. Exit")
 
             choice = input("Enter your choice: ").strip()
 
@@ -146,21 +152,32 @@ class ScooterOwner(JsonManager):
                 location = input("Enter scooter location: ")
                 model_name = input("Enter scooter model name: ")
                 price_per_minute = input("Enter price per minute: ")
+                coordinates = read_coordinates("Enter scooter coordinates as 'latitude, longitude' (or leave empty): ")
 
                 scooter = {
-                    "id": random.randint(10, 99),
+                    "id": scooter_ids.next_id(),
                     "battery": battery,
                     "location": location,
                     "model_name": model_name,
                     "price_per_minute": price_per_minute
                 }
+                if coordinates:
+                    scooter["latitude"], scooter["longitude"] = coordinates
+                try:
+                    scooter = scooter_schema.validate(scooter)
+                except ValueError as error:
+                    print(f"The scooter was not added: {error}")
+                    continue
                 self.add_scooter(scooter)
 
             elif choice == '2':
+                self.show_fleet_statistics()
+
+            elif choice == '3':
                 self.logout()
                 break
 
-            elif choice == '3':
+            elif choice == '4':
                 print("Exiting Scooter Owner menu.")
                 break
 
@@ -178,16 +195,18 @@ class Client(JsonManager):
         self.username = username
         self.password = password
         self.logged_in = False
+        self.ride = None
 
     def login(self):
         """
-        Login method for client
+        Login method for client, the password is checked against its stored hash
         """
         entered_username = input("Enter your username: ").strip()
         entered_password = input("Enter your password: ").strip()
 
-        if entered_username == self.username and entered_password == self.password:
+        if get_credential_store(self).authenticate(entered_username, entered_password):
             print("Login successful!")
+            self.username = entered_username
             self.logged_in = True
             return True
         else:
@@ -198,22 +217,33 @@ class Client(JsonManager):
         """
         Logout method for client
         """
+        get_credential_store(self).forget(self.username)
         self.logged_in = False
         print("Logged out successfully.")
 
-    def rent_scooter(self):
+    def rent_scooter(self, nearest_count=5, min_battery=20, radius_m=2000):
         """
-        Method to rent a scooter
+        Method to rent a scooter, the nearest charged scooters are offered first
         """
         if self.logged_in:
-            scooters = ScooterOwner(self.username, self.password).get_all_data()
+            scooters_manager = get_scooter_manager()
+            coordinates = read_coordinates("Enter your location as 'latitude, longitude' (or leave empty to see all): ")
+
+            if coordinates:
+                found = get_scooter_index(scooters_manager).nearest(*coordinates, nearest_count, min_battery, radius_m)
+                scooters = [scooter for _, scooter in found]
+                distances = [f"{distance:.0f} m away" for distance, _ in found]
+            else:
+                scooters = validated_records(scooters_manager, scooter_schema)
+                distances = [None] * len(scooters)
 
             if scooters:
                 print("\nAvailable Scooters:\n")
-                for scooter in scooters:
+                for scooter, distance in zip(scooters, distances):
                     print(f"ID: {scooter['id']}")
-                    print(f"Location: {scooter['location']}")
+                    print(f"Location: {scooter['location']}" + (f" ({distance})" if distance else ""))
                     print(f"Model: {scooter['model_name']}")
+                    print(f"Battery: {scooter['battery']}")
                     print(f"Price per minute: ${scooter['price_per_minute']}")
                     print("--------------------")
 
@@ -225,31 +255,6 @@ class Client(JsonManager):
         else:
             print("You need to login first to rent a scooter.")
 
-    def rent_scooter(self):
-        """
-        Method to rent a scooter
-        """
-        if self.logged_in:
-            scooters = ScooterOwner(self.username, self.password).get_all_data()
-
-            if scooters:
-                print("\nAvailable Scooters:\n")
-                for scooter in scooters:
-                    if self.validate_data(scooter):  # Validate each scooter entry
-                        print(f"ID: {scooter['id']}")
-                        print(f"Location: {scooter['location']}")
-                        print(f"Model: {scooter['model_name']}")
-                        print(f"Price per minute: ${scooter['price_per_minute']}")
-                        print("--------------------")
-
-                scooter_id = input("Enter the ID of the scooter you want to rent: ")
-                self.rent_scooter_by_id(scooter_id)
-
-            else:
-                print("No scooters available.")
-        else:
-            print("You need to login first to rent a scooter.")
-
     def display_menu(self):
         """
         Display menu for client after logging in
@@ -258,8 +263,9 @@ class Client(JsonManager):
             print("\nClient Menu:")
             print("1. View available scooters")
             print("2. Rent a scooter")
-            print("3. Logout")
-            print("4. Exit")
+            print("3. End my ride")
+            print("4. Logout")
+            print("5. Exit")
 
             choice = input("Enter your choice: ").strip()
 
@@ -270,55 +276,170 @@ class Client(JsonManager):
                 self.rent_scooter()
 
             elif choice == '3':
+                self.end_ride()
+
+            elif choice == '4':
                 self.logout()
                 break
 
-            elif choice == '4':
+            elif choice == '5':
                 print("Exiting Client menu.")
                 break
 
             else:
                 print("Invalid choice. Please enter a valid option.")
 
-    def view_available_scooters(self):
+    def rent_scooter_by_id(self, scooter_id):
         """
-        Method to display available scooters
+        Method to reserve a scooter by its id and start the ride
         """
-        scooters = self.read_file()
+        if self.ride is not None:
+            print("You are already riding a scooter. End your ride first.")
+            return False
 
-        if scooters:
+        scooter_id = int(scooter_id) if str(scooter_id).strip().isdigit() else str(scooter_id).strip()
+        engine = get_rental_engine()
+        try:
+            self.ride = engine.start(engine.reserve(scooter_id, self.username))
+        except RentalError as error:
+            print(error)
+            return False
+
+        print(f"Scooter {scooter_id} is yours. Price per minute: ${self.ride.price_per_minute}")
+        return True
+
+    def end_ride(self):
+        """
+        Method to end the current ride and show its cost
+        """
+        if self.ride is None:
+            print("You have no active ride.")
+            return None
+
+        cost = get_rental_engine().end(self.ride)
+        self.ride = None
+        print(f"Ride finished. Cost: ${cost}")
+        return cost
+
+    def view_available_scooters(self, page_size=10):
+        """
+        Method to display available scooters page by page
+        """
+        scooters = scooter_schema.iter_valid(get_scooter_manager().iter_records())
+        pages = storage.paginate(scooters, page_size)
+        page = next(pages, None)
+
+        if page:
             print("\nAvailable Scooters:\n")
-            for scooter in scooters:
-                if 'id' in scooter:
+            while page:
+                for scooter in page:
                     print(f"ID: {scooter['id']}")
                     print(f"Location: {scooter['location']}")
                     print(f"Model: {scooter['model_name']}")
                     print(f"Price per minute: ${scooter['price_per_minute']}")
                     print("--------------------")
-                else:
-                    print("Invalid scooter data - missing 'id' key.")
+
+                page = next(pages, None)
+                if page and input("Press Enter to see more scooters or 'q' to stop: ").strip().lower() == "q":
+                    break
         else:
             print("No scooters available.")
 
-def register_owner():
-    print("\nOwner Registration:\n")
+def first_scooter_id():
+    """
+    This function returns the id after the largest one already in the scooters file
+
+    Every stored record counts, also one that fails validation, so its id is never given out again.
+    """
+    ids = [data.get('id') for data in get_scooter_manager().iter_records()]
+    ids = [scooter_id for scooter_id in ids if isinstance(scooter_id, int) and not isinstance(scooter_id, bool)]
+    return max(ids, default=0) + 1
+
+
+scooter_ids = IdAllocator("scooter_ids.counter", initial=first_scooter_id)
+
+
+def get_scooter_manager(file_name=None):
+    """
+    This function returns the storage manager of the scooters that matches the file extension
+    (.jsonl - JSON Lines, .db - SQLite, anything else - JsonManager)
+    """
+    return storage.get_manager(file_name or scooters_file, table="scooters", manager_class=JsonManager)
+
+
+def get_scooters_cache():
+    """
+    This function returns the in-memory cache of the scooters indexed by id
+    """
+    return get_record_cache(get_scooter_manager(), JsonManager.index_keys)
+
+
+def get_rental_engine():
+    """
+    This function returns the rental engine of the scooter fleet, created on first use
+    """
+    global rental_engine
+    with rental_engine_lock:
+        if rental_engine is None:
+            scooters = get_scooter_manager()
+            engine = RentalEngine(validated_records(scooters, scooter_schema), history=JsonManager("rentals.json"),
+                                  index=get_scooter_index(scooters))
+            on_scooter_index_rebuild(scooters, engine.use_index)
+            rental_engine = engine  # published only when it is complete
+        return rental_engine
+
+
+def read_coordinates(prompt):
+    """
+    This function asks for 'latitude, longitude' and returns a pair of floats or None
+    """
+    while True:
+        text = input(prompt).strip()
+        if not text:
+            return None
+        try:
+            latitude, longitude = (float(part) for part in text.split(","))
+        except ValueError:
+            print("Please enter two numbers separated by a comma, e.g. 41.31, 69.28")
+            continue
+        if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+            return latitude, longitude
+        print("Latitude must be between -90 and 90 and longitude between -180 and 180.")
+
+
+def register_account(account):
+    """
+    This function asks for a new username and password and saves them with the password hashed
+    """
     username = input("Enter a username: ").strip()
     password = input("Enter a password: ").strip()
+    try:
+        get_credential_store(account).register(username, password)
+    except CredentialError as error:
+        print(error)
+        return False
+    return True
 
-    owner = ScooterOwner(username, password)
-    owner.add_one_data_to_file({"username": username, "password": password})
 
-    if owner.login():
+def register_owner():
+    print("\nOwner Registration:\n")
+    owner = ScooterOwner(None, None)
+    if register_account(owner) and owner.login():
         owner.display_menu()
 
 def register_client():
     print("\nClient Registration:\n")
-    username = input("Enter a username: ").strip()
-    password = input("Enter a password: ").strip()
+    client = Client(None, None)
+    if register_account(client) and client.login():
+        client.display_menu()
 
-    client = Client(username, password)
-    client.add_one_data_to_file({"username": username, "password": password})
+def login_owner():
+    owner = ScooterOwner(None, None)
+    if owner.login():
+        owner.display_menu()
 
+def login_client():
+    client = Client(None, None)
     if client.login():
         client.display_menu()
 
@@ -329,7 +450,9 @@ def display_menu():
         print("\nMain Menu:")
         print("1. Register as Owner")
         print("2. Register as Client")
-        print("3. Exit")
+        print("3. Login as Owner")
+        print("4. Login as Client")
+        print("5. Exit")
 
         choice = input("Enter your choice: ").strip()
 
@@ -340,6 +463,12 @@ def display_menu():
             register_client()
 
         elif choice == '3':
+            login_owner()
+
+        elif choice == '4':
+            login_client()
+
+        elif choice == '5':
             print("Exiting Scooter Rental System. Goodbye!")
             break
 
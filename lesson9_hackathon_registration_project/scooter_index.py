@@ -0,0 +1,256 @@
+import heapq
+import math
+import os
+import threading
+
+from storage import file_signature
+from validation import scooter_schema
+
+EARTH_RADIUS_M = 6_371_000
+METERS_PER_DEGREE = 111_320
+
+_indexes = {}
+_rebuild_callbacks = {}  # file name -> functions called with a rebuilt index
+_lock = threading.Lock()
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """
+    This function returns the distance between two coordinates in meters
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def scooter_position(scooter):
+    """
+    This function returns (latitude, longitude) of a scooter or None if it has no coordinates
+    """
+    try:
+        return float(scooter['latitude']), float(scooter['longitude'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def scooter_battery(scooter):
+    """
+    This function returns the battery level of a scooter as a number (it is stored as a string)
+    """
+    try:
+        return float(scooter.get('battery', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class ScooterGridIndex:
+    """
+    This class is applied to find the nearest available scooters quickly
+
+    Scooters are kept in a grid hash: the map is cut into square cells of
+    cell_size_m meters and every cell holds the ids of its scooters. A search
+    looks at the cell of the client first and then at rings of cells around
+    it, and stops as soon as no farther cell can hold a closer scooter. A lock
+    keeps searches from seeing a cell while another thread changes it.
+
+    Attributes:
+        - cell_size_m (int): side of a grid cell in meters
+        - reference_latitude (float): latitude used to size cells in longitude
+    """
+
+    def __init__(self, cell_size_m=250, reference_latitude=41.3) -> None:
+        self.cell_size_m = cell_size_m
+        self.lat_step = cell_size_m / METERS_PER_DEGREE
+        self.lon_step = cell_size_m / (METERS_PER_DEGREE * math.cos(math.radians(reference_latitude)))
+        self.cells = {}
+        self.scooters = {}  # id -> (latitude, longitude, battery, available, record)
+        self.bounds = None  # [min row, max row, min column, max column] of cells ever used
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.scooters)
+
+    def cell_of(self, latitude, longitude):
+        """
+        This method returns the grid cell that contains the coordinates
+        """
+        return (math.floor(latitude / self.lat_step), math.floor(longitude / self.lon_step))
+
+    def add(self, scooter, available=True):
+        """
+        This method adds a scooter record or updates it if the id is already indexed
+        """
+        position = scooter_position(scooter)
+        if position is None:
+            return False
+        with self.lock:
+            self.remove(scooter['id'])
+            latitude, longitude = position
+            self.scooters[scooter['id']] = (latitude, longitude, scooter_battery(scooter), available, scooter)
+            cell = self.cell_of(latitude, longitude)
+            self.cells.setdefault(cell, set()).add(scooter['id'])
+            if self.bounds is None:
+                self.bounds = [cell[0], cell[0], cell[1], cell[1]]
+            else:
+                self.bounds = [
+                    min(self.bounds[0], cell[0]), max(self.bounds[1], cell[0]),
+                    min(self.bounds[2], cell[1]), max(self.bounds[3], cell[1]),
+                ]
+            return True
+
+    def remove(self, scooter_id):
+        """
+        This method removes a scooter from the index
+        """
+        with self.lock:
+            entry = self.scooters.pop(scooter_id, None)
+            if entry is None:
+                return False
+            cell = self.cell_of(entry[0], entry[1])
+            ids = self.cells[cell]
+            ids.discard(scooter_id)
+            if not ids:
+                del self.cells[cell]
+            return True
+
+    def move(self, scooter_id, latitude, longitude):
+        """
+        This method moves a scooter to new coordinates
+        """
+        with self.lock:
+            _, _, battery, available, scooter = self.scooters[scooter_id]
+            scooter = dict(scooter, latitude=latitude, longitude=longitude)
+            return self.add(scooter, available)
+
+    def set_available(self, scooter_id, available):
+        """
+        This method marks a scooter as rented (False) or free (True)
+        """
+        with self.lock:
+            latitude, longitude, battery, _, scooter = self.scooters[scooter_id]
+            self.scooters[scooter_id] = (latitude, longitude, battery, available, scooter)
+
+    def set_battery(self, scooter_id, battery):
+        """
+        This method updates the battery level of a scooter
+        """
+        with self.lock:
+            latitude, longitude, _, available, scooter = self.scooters[scooter_id]
+            scooter = dict(scooter, battery=battery)
+            self.scooters[scooter_id] = (latitude, longitude, scooter_battery(scooter), available, scooter)
+
+    def nearest(self, latitude, longitude, k=5, min_battery=0, radius_m=None):
+        """
+        This method returns up to k (distance_m, scooter) pairs of the closest available scooters
+
+        Only scooters with battery >= min_battery and, if given, within radius_m are returned.
+        """
+        with self.lock:
+            return self._nearest(latitude, longitude, k, min_battery, radius_m)
+
+    def _nearest(self, latitude, longitude, k, min_battery, radius_m):
+        if not self.cells:
+            return []
+
+        center_i, center_j = self.cell_of(latitude, longitude)
+        lon_cell_m = self.lon_step * METERS_PER_DEGREE * math.cos(math.radians(latitude))
+        cell_m = min(self.cell_size_m, lon_cell_m)
+        max_ring = self._max_ring(center_i, center_j)
+
+        best = []  # max-heap of the k closest so far: (-distance, id)
+        ring = 0
+        while ring <= max_ring:
+            for cell in ring_cells(center_i, center_j, ring):
+                for scooter_id in self.cells.get(cell, ()):
+                    lat, lon, battery, available, _ = self.scooters[scooter_id]
+                    if not available or battery < min_battery:
+                        continue
+                    distance = haversine_m(latitude, longitude, lat, lon)
+                    if radius_m is not None and distance > radius_m:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, scooter_id))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, scooter_id))
+
+            # every scooter in the next ring is at least ring * cell_m away
+            closest_next = ring * cell_m
+            if radius_m is not None and closest_next > radius_m:
+                break
+            if len(best) == k and closest_next >= -best[0][0]:
+                break
+            ring += 1
+
+        return [(-distance, self.scooters[scooter_id][4]) for distance, scooter_id in sorted(best, reverse=True)]
+
+    def _max_ring(self, center_i, center_j):
+        min_row, max_row, min_column, max_column = self.bounds
+        return max(
+            abs(center_i - min_row), abs(center_i - max_row),
+            abs(center_j - min_column), abs(center_j - max_column),
+        )
+
+
+def ring_cells(center_i, center_j, ring):
+    """
+    This function yields the grid cells that are exactly ring cells away from the center
+    """
+    if ring == 0:
+        yield (center_i, center_j)
+        return
+    for j in range(center_j - ring, center_j + ring + 1):
+        yield (center_i - ring, j)
+        yield (center_i + ring, j)
+    for i in range(center_i - ring + 1, center_i + ring):
+        yield (i, center_j - ring)
+        yield (i, center_j + ring)
+
+
+def get_scooter_index(manager):
+    """
+    This function returns the index of the manager's scooters, rebuilt only when the file changes
+    """
+    file_name = os.path.abspath(manager.file_name)
+    with _lock:
+        signature = file_signature(manager.file_name)
+        cached = _indexes.get(file_name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        index = ScooterGridIndex()
+        for scooter in scooter_schema.iter_valid(manager.iter_records()):
+            index.add(scooter)
+        for callback in _rebuild_callbacks.get(file_name, ()):
+            callback(index)
+        _indexes[file_name] = (signature, index)
+        return index
+
+
+def on_scooter_index_rebuild(manager, callback):
+    """
+    This function registers a function that is called with the new index whenever the manager's index is rebuilt
+
+    Holders of the index (e.g. the rental engine) use it to switch to the new
+    index before anyone else gets it.
+    """
+    with _lock:
+        _rebuild_callbacks.setdefault(os.path.abspath(manager.file_name), []).append(callback)
+
+
+def update_scooter_index(manager, scooter, previous_signature):
+    """
+    This function adds a just-written scooter to the cached index instead of rebuilding it
+
+    previous_signature is the file signature taken right before the write. If
+    the file was changed by someone else as well, the index is rebuilt later.
+    """
+    file_name = os.path.abspath(manager.file_name)
+    with _lock:
+        cached = _indexes.get(file_name)
+        if cached is None or cached[0] != previous_signature:
+            return False
+        cached[1].add(scooter)
+        _indexes[file_name] = (file_signature(manager.file_name), cached[1])
+        return True
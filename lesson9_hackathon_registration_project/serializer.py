@@ -0,0 +1,104 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif ujson is not None:
+    BACKEND = "ujson"
+else:
+    BACKEND = "json"
+
+# json.JSONDecodeError, orjson.JSONDecodeError and ujson errors are all ValueErrors
+DecodeError = ValueError
+
+
+def dumps(data, pretty=False, backend=None):
+    """
+    This function encodes data with the fastest installed JSON library
+
+    pretty=True always uses the standard library with indent=4 and is meant
+    for exports that people read, not for the data files.
+    """
+    backend = backend or BACKEND
+    if pretty:
+        return json.dumps(data, indent=4, ensure_ascii=False)
+    if backend == "orjson":
+        return orjson.dumps(data).decode("utf-8")
+    if backend == "ujson":
+        return ujson.dumps(data, ensure_ascii=False)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(text, backend=None):
+    """
+    This function decodes JSON text with the fastest installed JSON library
+    """
+    backend = backend or BACKEND
+    if backend == "orjson":
+        return orjson.loads(text)
+    if backend == "ujson":
+        return ujson.loads(text)
+    return json.loads(text)
+
+
+def available_backends():
+    """
+    This function returns the names of the JSON libraries that can be used here
+    """
+    return ["json"] + [name for name, module in (("ujson", ujson), ("orjson", orjson)) if module is not None]
+
+
+_separators = re.compile(r"[\s,]*")
+
+
+def iter_json_array(file, chunk_size=65536):
+    """
+    This function yields the items of a JSON array file one by one
+
+    The file is read in chunks and every item is decoded as soon as it is
+    complete, so memory use does not grow with the size of the array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size)
+    index = _separators.match(buffer).end()
+    if index >= len(buffer):
+        return
+    if buffer[index] != "[":
+        raise DecodeError("The file does not contain a JSON array")
+    index += 1
+
+    at_end_of_file = False
+    while True:
+        index = _separators.match(buffer, index).end()
+        if index < len(buffer) and buffer[index] == "]":
+            return
+        try:
+            if index >= len(buffer):
+                raise json.JSONDecodeError("Need more data", buffer, index)
+            item, end = decoder.raw_decode(buffer, index)
+            if end == len(buffer) and not at_end_of_file:
+                raise json.JSONDecodeError("The item may continue in the next chunk", buffer, index)
+        except json.JSONDecodeError:
+            if at_end_of_file:
+                raise
+            chunk = file.read(chunk_size)
+            at_end_of_file = not chunk
+            buffer = buffer[index:] + chunk
+            index = 0
+            continue
+
+        yield item
+        index = end
+        if index >= chunk_size:
+            buffer = buffer[index:]
+            index = 0
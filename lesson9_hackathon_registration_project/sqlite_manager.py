@@ -0,0 +1,395 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS participants (
+    row_id INTEGER PRIMARY KEY,
+    leader_name TEXT NOT NULL,
+    leader_contact TEXT NOT NULL,
+    team_name TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS participants_team_name ON participants (team_name);
+CREATE INDEX IF NOT EXISTS participants_leader_contact ON participants (leader_contact);
+
+CREATE TABLE IF NOT EXISTS team_members (
+    participant_id INTEGER NOT NULL REFERENCES participants (row_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS team_members_participant ON team_members (participant_id);
+CREATE INDEX IF NOT EXISTS team_members_name ON team_members (name);
+
+CREATE TABLE IF NOT EXISTS scooters (
+    row_id INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL,
+    battery TEXT,
+    location TEXT,
+    model_name TEXT,
+    price_per_minute TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS scooters_id ON scooters (id);
+CREATE INDEX IF NOT EXISTS scooters_location ON scooters (location);
+
+CREATE TABLE IF NOT EXISTS owners (
+    row_id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    password TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS owners_username ON owners (username);
+
+CREATE TABLE IF NOT EXISTS clients (
+    row_id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    password TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS clients_username ON clients (username);
+
+CREATE TABLE IF NOT EXISTS taxi_announcements (
+    row_id INTEGER PRIMARY KEY,
+    from_place TEXT NOT NULL,
+    to_place TEXT NOT NULL,
+    price TEXT,
+    car_name TEXT,
+    comment TEXT,
+    expire_time TEXT,
+    seats TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS taxi_announcements_route ON taxi_announcements (from_place, to_place);
+
+CREATE TABLE IF NOT EXISTS client_announcements (
+    row_id INTEGER PRIMARY KEY,
+    from_place TEXT NOT NULL,
+    to_place TEXT NOT NULL,
+    price TEXT,
+    expire_time TEXT,
+    seats TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS client_announcements_route ON client_announcements (from_place, to_place);
+"""
+
+# Record key -> column name of every table. Participant members live in team_members,
+# any other record key (e.g. latitude, expires_at) is kept in the JSON column extra.
+TABLE_FIELDS = {
+    "participants": {
+        "Leader_name": "leader_name",
+        "Leader_contact": "leader_contact",
+        "Team_name": "team_name",
+    },
+    "scooters": {
+        "id": "id",
+        "battery": "battery",
+        "location": "location",
+        "model_name": "model_name",
+        "price_per_minute": "price_per_minute",
+    },
+    "owners": {"username": "username", "password": "password"},
+    "clients": {"username": "username", "password": "password"},
+    "taxi_announcements": {
+        "from_place": "from_place",
+        "to_place": "to_place",
+        "price": "price",
+        "car_name": "car_name",
+        "comment": "comment",
+        "expire_time": "expire_time",
+        "seats": "seats",
+        "is_active": "is_active",
+        "created_at": "created_at",
+    },
+    "client_announcements": {
+        "from_place": "from_place",
+        "to_place": "to_place",
+        "price": "price",
+        "expire_time": "expire_time",
+        "seats": "seats",
+        "is_active": "is_active",
+        "created_at": "created_at",
+    },
+}
+announcement_tables = ("taxi_announcements", "client_announcements")
+
+
+class SqliteManager:
+    """
+    This class is applied to keep records in SQLite with the JsonManager interface
+
+    Every manager works with one table of the database. The database runs in
+    WAL mode, so readers in other processes are never blocked by a writer.
+    Every thread gets its own connection, so the API thread pool can share a
+    manager. The in-memory caches of the apps are kept per file, so give
+    every app table its own database file (see migrate()).
+
+    Attributes:
+        - file_name (str): path of the SQLite database
+        - table (str): one of participants, scooters, owners, clients, taxi_announcements, client_announcements
+    """
+
+    def __init__(self, file_name="hackathon.db", table="participants") -> None:
+        if table not in TABLE_FIELDS:
+            raise ValueError(f"Unknown table: {table}")
+        self.file_name = file_name
+        self.table = table
+        self.fields = TABLE_FIELDS[table]
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    @property
+    def connection(self):
+        """
+        This property opens the database of the calling thread on first use and creates the tables
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.file_name, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    create_schema(connection)
+                    self._schema_ready = True
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        """
+        This method closes the database connection of the calling thread
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def check_existance(self):
+        """
+        This method checks if the table has at least one record
+        """
+        return self.connection.execute(f"SELECT 1 FROM {self.table} LIMIT 1").fetchone() is not None
+
+    def read_file(self):
+        """
+        This method reads all records of the table
+        """
+        return self._select("", ())
+
+    def iter_records(self, offset=0, limit=None):
+        """
+        This method yields records page by page instead of loading the table
+
+        Only the first page skips offset rows, the next ones continue after the
+        last row_id read (keyset pagination), so reading the whole table costs
+        one index seek per page instead of re-skipping every earlier row.
+        """
+        page_size = 500
+        last_row_id = None
+        while limit is None or limit > 0:
+            size = page_size if limit is None else min(page_size, limit)
+            if last_row_id is None:
+                page = self._select_rows("", (size, offset), limit="LIMIT ? OFFSET ?")
+            else:
+                page = self._select_rows("WHERE row_id > ?", (last_row_id, size), limit="LIMIT ?")
+            yield from (data for _, data in page)
+            if len(page) < size:
+                return
+            last_row_id = page[-1][0]
+            if limit is not None:
+                limit -= size
+
+    def write_file(self, all_data):
+        """
+        This method replaces all records of the table in one transaction
+        """
+        with self.connection:
+            self.connection.execute(f"DELETE FROM {self.table}")
+            for data in all_data:
+                self._insert(data)
+        return "Data is written to a file"
+
+    def add_onedata_to_file(self, data: dict):
+        """
+        This method writes one given data into the table
+        """
+        with self.connection:
+            self._insert(data)
+        return "Data is written to a file"
+
+    add_one_data_to_file = add_onedata_to_file
+    add_data = add_onedata_to_file
+
+    def add_many(self, all_data):
+        """
+        This method writes many records in one transaction
+        """
+        with self.connection:
+            for data in all_data:
+                self._insert(data)
+        return len(all_data)
+
+    def find(self, key, value):
+        """
+        This method returns records whose key equals the given value using the table index
+        """
+        return self._select(f"WHERE {self._column(key)} = ?", (value,))
+
+    def delete_records(self, key, value):
+        """
+        This method deletes records whose key equals the given value
+        """
+        with self.connection:
+            cursor = self.connection.execute(f"DELETE FROM {self.table} WHERE {self._column(key)} = ?", (value,))
+        return cursor.rowcount > 0
+
+    def remove_data(self, identifier, key="id"):
+        """
+        This method removes data from the table based on a given identifier
+        """
+        if self.delete_records(key, identifier):
+            return True
+        print("Data with given ID not found.")
+        return False
+
+    def get_all_participants(self):
+        """
+        This method retrieves all participants from the table
+        """
+        return self.read_file()
+
+    get_all_data = read_file
+
+    def removing_participants(self, team_name):
+        """
+        This method removes a team by its name
+        """
+        if self.delete_records('Team_name', team_name):
+            return True
+        print("There is no such team in the list. Please try again later.")
+        return False
+
+    def _column(self, key):
+        if key not in self.fields:
+            raise KeyError(f"{key} is not a column of {self.table}")
+        return self.fields[key]
+
+    def _insert(self, data):
+        keys = [key for key in self.fields if key in data]
+        extra = {key: value for key, value in data.items()
+                 if key not in self.fields and not (self.table == "participants" and key == 'Other_participants')}
+        columns = ", ".join([self.fields[key] for key in keys] + ["extra"])
+        marks = ", ".join("?" for _ in range(len(keys) + 1))
+        cursor = self.connection.execute(
+            f"INSERT INTO {self.table} ({columns}) VALUES ({marks})",
+            [data[key] for key in keys] + [json.dumps(extra) if extra else None],
+        )
+        if self.table == "participants":
+            self.connection.executemany(
+                "INSERT INTO team_members (participant_id, position, name) VALUES (?, ?, ?)",
+                [(cursor.lastrowid, position, name) for position, name in enumerate(data.get('Other_participants', []))],
+            )
+
+    def _select(self, where, parameters, limit=""):
+        return [data for _, data in self._select_rows(where, parameters, limit)]
+
+    def _select_rows(self, where, parameters, limit=""):
+        # Returns (row_id, record) pairs; the members of all selected teams come from one query
+        columns = ", ".join(f"{column} AS \"{key}\"" for key, column in self.fields.items())
+        selected = f"FROM {self.table} {where} ORDER BY row_id {limit}"
+        rows = self.connection.execute(f"SELECT row_id, extra, {columns} {selected}", parameters).fetchall()
+        members = {}
+        if self.table == "participants" and rows:
+            for member in self.connection.execute(
+                f"SELECT participant_id, name FROM team_members WHERE participant_id IN (SELECT row_id {selected}) "
+                "ORDER BY participant_id, position", parameters
+            ):
+                members.setdefault(member["participant_id"], []).append(member["name"])
+
+        all_data = []
+        for row in rows:
+            data = {key: row[key] for key in self.fields if row[key] is not None}
+            if row["extra"]:
+                data.update(json.loads(row["extra"]))
+            if self.table == "participants":
+                data['Other_participants'] = members.get(row["row_id"], [])
+            elif self.table in announcement_tables:
+                data['is_active'] = bool(data.get('is_active', 1))
+            all_data.append((row["row_id"], data))
+        return all_data
+
+
+def create_schema(connection):
+    """
+    This function creates the missing tables and adds the extra column to tables of older databases
+    """
+    connection.executescript(SCHEMA)
+    for table in TABLE_FIELDS:
+        columns = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+        if "extra" not in columns:
+            connection.execute(f"ALTER TABLE {table} ADD COLUMN extra TEXT")
+    connection.commit()
+
+
+def load_json(file_name):
+    """
+    This function reads a JSON array file, a missing or empty file gives []
+    """
+    if not os.path.exists(file_name) or os.path.getsize(file_name) == 0:
+        return []
+    with open(file_name, mode="r") as file:
+        return json.load(file)
+
+
+def migrate(database="hackathon.db", directory="."):
+    """
+    This function imports the existing JSON files into SQLite databases
+
+    The teams and accounts go into database. The scooters and the taxi and
+    client announcements get a database of their own next to their JSON file
+    (scooters.db, taxi_project/announcements.db and
+    taxi_project/client_announcements.db), because the apps cache their data
+    per file. scooter_owners.json holds both owner accounts and scooters, so
+    its records are split by the keys they have. Tables that already have
+    records are skipped. Returns table -> (database file, imported records).
+    """
+    counts = {}
+
+    def import_into(table, all_data, file_name=os.path.join(directory, database)):
+        manager = SqliteManager(file_name, table)
+        if manager.check_existance():
+            print(f"{table} already has records, skipping.")
+            return
+        counts[table] = (file_name, manager.add_many(all_data))
+
+    import_into("participants", load_json(os.path.join(directory, "participants.json")))
+    import_into("clients", load_json(os.path.join(directory, "clients.json")))
+
+    owners_and_scooters = load_json(os.path.join(directory, "scooter_owners.json"))
+    import_into("owners", [data for data in owners_and_scooters if "username" in data])
+    import_into("scooters", [data for data in owners_and_scooters if "id" in data], os.path.join(directory, "scooters.db"))
+
+    for table, name in (("taxi_announcements", "announcements"), ("client_announcements", "client_announcements")):
+        taxi_directory = os.path.join(directory, "taxi_project")
+        import_into(table, load_json(os.path.join(taxi_directory, name + ".json")), os.path.join(taxi_directory, name + ".db"))
+    return counts
+
+
+if __name__ == "__main__":
+    # Usage: python sqlite_manager.py migrate [hackathon.db]
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print("Usage: python sqlite_manager.py migrate [hackathon.db]")
+        sys.exit(1)
+    database = sys.argv[2] if len(sys.argv) > 2 else "hackathon.db"
+    for table, (file_name, count) in migrate(database).items():
+        print(f"{table}: {count} records imported into {file_name}")
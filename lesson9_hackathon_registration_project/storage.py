@@ -0,0 +1,151 @@
+import itertools
+import os
+
+from atomic_file import atomic_write_json
+from file_lock import BatchingWriter, FileLock
+from journal import GroupCommitJournal, recover_journal
+from jsonl_manager import JsonLinesManager
+from record_cache import file_signature, get_record_cache  # noqa: F401  file_signature is re-exported for the apps
+from serializer import BACKEND, dumps, iter_json_array, loads  # noqa: F401  re-exported for the apps
+from sqlite_manager import SqliteManager
+
+
+class JsonManager:
+    """
+    This class is applied to manage working with json files
+
+    It is shared by the hackathon, book store, scooter and taxi apps. Data
+    files are written compactly with the fastest installed JSON library;
+    export() writes an indented copy for people to read.
+
+    Attributes:
+        - file_name (str): path of the JSON file
+        - index_keys (tuple): record keys indexed by the in-memory record cache
+        - journaled (bool): write a write-ahead journal before every commit; off by
+          default because the atomic replace already never leaves a torn file
+        - batched_appends (bool): single appends go through a BatchingWriter
+    """
+
+    index_keys = ()
+    journaled = False
+    batched_appends = True
+
+    def __init__(self, file_name) -> None:
+        self.file_name = file_name
+
+    def check_existance(self):
+        """
+        This method checks the existance of the file and if the file is not empty
+        """
+        return os.path.exists(self.file_name) and os.path.getsize(self.file_name) != 0
+
+    check_existence = check_existance
+
+    def read_file(self):
+        """
+        This method reads the data of the file
+        """
+        if self.check_existance():
+            with open(self.file_name, mode="r", encoding="utf-8") as file:
+                return loads(file.read())
+        return []
+
+    def iter_records(self, offset=0, limit=None):
+        """
+        This method yields records one by one without loading the whole file
+
+        offset records are skipped and at most limit records are returned.
+        """
+        if not self.check_existance():
+            return
+        with open(self.file_name, mode="r", encoding="utf-8") as file:
+            yield from itertools.islice(iter_json_array(file), offset, None if limit is None else offset + limit)
+
+    def write_file(self, all_data):
+        """
+        This method atomically replaces the file with all data
+        """
+        atomic_write_json(self.file_name, all_data)
+        return "Data is written to a file"
+
+    def add_one_data_to_file(self, data: dict):
+        """
+        This method writes one given data into the file
+
+        The write is locked and batched, so several processes can add records
+        to the same file at once without losing any of them.
+        """
+        BatchingWriter(self).add(data)
+        return "Data is written to a file"
+
+    add_onedata_to_file = add_one_data_to_file
+
+    def add_many(self, all_data):
+        """
+        This method writes many records with one atomic commit under the file lock
+        """
+        all_data = list(all_data)
+        with FileLock(self.file_name):
+            recover_journal(self)
+            if self.journaled:
+                journal = self.group_commit()
+                journal.pending = all_data
+                return journal.commit()
+            if all_data:
+                self.write_file(self.read_file() + all_data)
+            return len(all_data)
+
+    def cache(self):
+        """
+        This method returns the shared in-memory cache of the file indexed by index_keys
+        """
+        return get_record_cache(self, self.index_keys)
+
+    def remove_where(self, key, value):
+        """
+        This method removes every record whose key equals the given value, key must be in index_keys
+        """
+        return self.cache().remove(key, value)
+
+    def group_commit(self):
+        """
+        This method returns a journal that saves a burst of records with one journal fsync and one atomic write
+
+        Hold FileLock(self.file_name) around it when other processes share the file.
+        """
+        return GroupCommitJournal(self)
+
+    def export(self, file_name):
+        """
+        This method writes an indented copy of the data for people to read
+        """
+        atomic_write_json(file_name, self.read_file(), pretty=True)
+        return file_name
+
+
+def paginate(records, page_size=10):
+    """
+    This function groups a stream of records into pages (lists) of page_size records
+    """
+    records = iter(records)
+    while True:
+        page = list(itertools.islice(records, page_size))
+        if not page:
+            return
+        yield page
+
+
+def get_manager(file_name, table="participants", manager_class=JsonManager):
+    """
+    This function returns the storage manager that matches the file extension
+    (.jsonl - JSON Lines, .db - SQLite table, anything else - manager_class)
+    """
+    if file_name.endswith(".jsonl"):
+        return JsonLinesManager(file_name)
+    if file_name.endswith(".db"):
+        return SqliteManager(file_name, table=table)
+
+    manager = manager_class(file_name)
+    with FileLock(file_name):
+        recover_journal(manager)
+    return manager
@@ -0,0 +1,357 @@
+import bisect
+import functools
+import itertools
+import os
+import threading
+import time
+
+from expiry import ExpiryScheduler, announcement_deadline, run_every
+from file_lock import FileLock
+from jsonl_manager import JsonLinesManager
+from storage import file_signature
+
+_indexes = {}
+_archives = {}
+_lock = threading.Lock()  # guards _indexes and _archives, the apps share them between threads
+
+
+def locked(method):
+    """
+    This decorator runs a method under the index lock, the expiry sweeper may run in another thread
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def to_number(value, default=0.0):
+    """
+    This function converts a stored price or seat count (a string) into a number
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class AnnouncementIndex:
+    """
+    This class is applied to answer route queries over announcements from an index
+
+    Announcements are grouped by (from_place, to_place). Inside a route they
+    are kept sorted by (price, created_at) and by created_at, so "from A to B
+    under X per seat" is a binary search plus a walk over the matching rows.
+    Expired announcements are evicted through a deadline heap before every
+    query, so queries only ever see active rows.
+
+    Attributes:
+        - routes (dict): (from_place, to_place) -> list of (price, created_at, number) sorted
+        - newest (dict): (from_place, to_place) -> list of (created_at, number) sorted
+        - announcements (dict): number -> announcement dict
+        - on_expire: optional function that gets every evicted announcement, e.g. to archive it
+    """
+
+    def __init__(self, on_expire=None) -> None:
+        self.routes = {}
+        self.newest = {}
+        self.announcements = {}
+        self.numbers = itertools.count()
+        self.expiry = ExpiryScheduler()
+        self.on_expire = on_expire
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.announcements)
+
+    @locked
+    def add(self, announcement):
+        """
+        This method indexes one announcement and returns its number in the index
+        """
+        number = next(self.numbers)
+        route = (announcement.get('from_place'), announcement.get('to_place'))
+        created_at = str(announcement.get('created_at', ''))
+        self.announcements[number] = announcement
+        self._schedule(number, announcement)
+        bisect.insort(self.routes.setdefault(route, []), (to_number(announcement.get('price')), created_at, number))
+        bisect.insort(self.newest.setdefault(route, []), (created_at, number))
+        return number
+
+    @locked
+    def add_many(self, announcements):
+        """
+        This method indexes many announcements at once and sorts every route only once
+        """
+        touched = set()
+        for announcement in announcements:
+            number = next(self.numbers)
+            route = (announcement.get('from_place'), announcement.get('to_place'))
+            created_at = str(announcement.get('created_at', ''))
+            self.announcements[number] = announcement
+            self._schedule(number, announcement)
+            self.routes.setdefault(route, []).append((to_number(announcement.get('price')), created_at, number))
+            self.newest.setdefault(route, []).append((created_at, number))
+            touched.add(route)
+        for route in touched:
+            self.routes[route].sort()
+            self.newest[route].sort()
+
+    def _schedule(self, number, announcement):
+        deadline = announcement_deadline(announcement)
+        if deadline is not None:
+            self.expiry.schedule(number, deadline)
+
+    @locked
+    def evict_expired(self, now=None):
+        """
+        This method removes announcements whose deadline has passed and returns how many
+        """
+        by_route = {}
+        for number in self.expiry.pop_expired(now):
+            announcement = self.announcements.pop(number, None)
+            if announcement is None:
+                continue  # it was removed earlier
+            route = (announcement.get('from_place'), announcement.get('to_place'))
+            by_route.setdefault(route, []).append((number, announcement))
+
+        for route, expired in by_route.items():
+            if len(expired) < 32:
+                for number, announcement in expired:
+                    self._unlink(route, number, announcement)
+            else:  # rebuilding the route once is cheaper than many deletes from its lists
+                self.routes[route] = [row for row in self.routes[route] if row[2] in self.announcements]
+                self.newest[route] = [row for row in self.newest[route] if row[1] in self.announcements]
+
+            for _, announcement in expired:
+                announcement['is_active'] = False
+                if self.on_expire is not None:
+                    self.on_expire(announcement)
+        return sum(len(expired) for expired in by_route.values())
+
+    def start_sweeper(self, interval=60):
+        """
+        This method evicts expired announcements in the background every interval seconds
+        """
+        return self.expiry.start_sweeper(self.evict_expired, interval)
+
+    @locked
+    def remove(self, number):
+        """
+        This method removes an announcement by its number in the index
+        """
+        announcement = self.announcements.pop(number, None)
+        if announcement is None:
+            return False
+        self._unlink((announcement.get('from_place'), announcement.get('to_place')), number, announcement)
+        return True
+
+    @locked
+    def update(self, announcement):
+        """
+        This method copies the seats and is_active of a stored announcement to its copy in the index, False if it is not indexed
+        """
+        route = (announcement.get('from_place'), announcement.get('to_place'))
+        rows = self.routes.get(route, [])
+        key = (to_number(announcement.get('price')), str(announcement.get('created_at', '')))
+        identity = announcement_key(announcement, changing=('is_active', 'seats'))
+        for price, created_at, number in rows[bisect.bisect_left(rows, key):]:
+            if (price, created_at) != key:
+                break
+            indexed = self.announcements[number]
+            if announcement_key(indexed, changing=('is_active', 'seats')) == identity:
+                indexed['seats'] = announcement.get('seats')
+                indexed['is_active'] = announcement.get('is_active', True)
+                return True
+        return False
+
+    def _unlink(self, route, number, announcement):
+        created_at = str(announcement.get('created_at', ''))
+        remove_sorted(self.routes[route], (to_number(announcement.get('price')), created_at, number))
+        remove_sorted(self.newest[route], (created_at, number))
+
+    @locked
+    def query(self, from_place, to_place, max_price=None, min_price=None, min_seats=None,
+              order="price", limit=None, active_only=True, with_numbers=False):
+        """
+        This method returns announcements of a route that match the price and seat limits
+
+        order="price" gives the cheapest first, order="newest" the latest first.
+        with_numbers=True returns (number, announcement) pairs for later remove().
+        """
+        self.evict_expired()
+        route = (from_place, to_place)
+        if order == "newest":
+            candidates = (number for _, number in reversed(self.newest.get(route, [])))
+        else:
+            rows = self.routes.get(route, [])
+            start = 0 if min_price is None else bisect.bisect_left(rows, (min_price,))
+            end = len(rows) if max_price is None else bisect.bisect_right(rows, (max_price, "\uffff"))
+            candidates = (rows[position][2] for position in range(start, end))
+
+        found = []
+        for number in candidates:
+            announcement = self.announcements[number]
+            price = to_number(announcement.get('price'))
+            if max_price is not None and price > max_price or min_price is not None and price < min_price:
+                continue
+            if min_seats is not None and to_number(announcement.get('seats')) < min_seats:
+                continue
+            if active_only and not announcement.get('is_active', True):
+                continue
+            found.append((number, announcement) if with_numbers else announcement)
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+
+
+def remove_sorted(rows, key):
+    """
+    This function removes a key from a sorted list with a binary search
+    """
+    position = bisect.bisect_left(rows, key)
+    if position < len(rows) and rows[position] == key:
+        del rows[position]
+
+
+class ExpiredArchive:
+    """
+    This class is applied to move expired announcements out of the data file into an archive
+
+    on_expire() only collects announcements, it runs under the index lock
+    (e.g. in the middle of a query). flush() appends the collected ones to
+    the archive (<name>.archive.jsonl) with one write and then removes them
+    from the data file with one rewrite.
+
+    Attributes:
+        - manager: storage manager of the announcements file
+        - archive (JsonLinesManager): file that keeps the expired announcements
+        - pending (list): expired announcements waiting for the next flush
+    """
+
+    def __init__(self, manager) -> None:
+        self.manager = manager
+        self.archive = JsonLinesManager(os.path.splitext(manager.file_name)[0] + ".archive.jsonl")
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def on_expire(self, announcement):
+        """
+        This method remembers an expired announcement for the next flush
+        """
+        with self.lock:
+            self.pending.append(announcement)
+
+    def flush(self):
+        """
+        This method archives the collected announcements, removes them from the data file and returns how many
+        """
+        with self.lock:
+            expired, self.pending = self.pending, []
+        if not expired:
+            return 0
+
+        self.archive.add_many(expired)  # archived first, a crash in between leaves a copy instead of a loss
+        keys = {announcement_key(announcement) for announcement in expired}
+        with FileLock(self.manager.file_name):
+            before = file_signature(self.manager.file_name)
+            rows = self.manager.read_file()
+            kept = [row for row in rows if announcement_key(row) not in keys]
+            if len(kept) < len(rows):
+                self.manager.write_file(kept)
+            after = file_signature(self.manager.file_name)
+
+        with _lock:
+            cached = _indexes.get(os.path.abspath(self.manager.file_name))
+            if cached is not None and cached[0] == before:  # the index already dropped them, it stays valid
+                _indexes[os.path.abspath(self.manager.file_name)] = (after, cached[1])
+        return len(expired)
+
+
+def announcement_key(announcement, changing=('is_active',)):
+    """
+    This function returns what identifies a stored announcement, without the fields that change (is_active when it expires)
+    """
+    return tuple(sorted((key, repr(value)) for key, value in announcement.items() if key not in changing))
+
+
+def get_expired_archive(manager):
+    """
+    This function returns the shared archive of the manager's expired announcements
+    """
+    file_name = os.path.abspath(manager.file_name)
+    with _lock:
+        archive = _archives.get(file_name)
+        if archive is None:
+            archive = _archives[file_name] = ExpiredArchive(manager)
+        return archive
+
+
+def get_announcement_index(manager):
+    """
+    This function returns the index of the manager's announcements, rebuilt only when the file changes
+
+    Rows that already expired are not indexed, they go to the archive.
+    """
+    file_name = os.path.abspath(manager.file_name)
+    archive = get_expired_archive(manager)
+    with _lock:  # one thread rebuilds, the others wait for its index
+        signature = file_signature(manager.file_name)
+        cached = _indexes.get(file_name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        index = AnnouncementIndex(on_expire=archive.on_expire)
+        now = time.time()
+        live = []
+        for announcement in manager.iter_records():
+            deadline = announcement_deadline(announcement)
+            if deadline is not None and deadline <= now:
+                announcement['is_active'] = False
+                archive.on_expire(announcement)
+            else:
+                live.append(announcement)
+        index.add_many(live)
+        _indexes[file_name] = (signature, index)
+        return index
+
+
+def update_announcement_index(manager, previous_signature, changed=(), added=()):
+    """
+    This function brings the cached index in step with a write of this process instead of rebuilding it
+
+    changed are rewritten announcements whose seats or is_active are copied
+    into the index, added are the new ones. previous_signature is the file
+    signature taken right before the write. If the file was changed by
+    someone else as well, the index is rebuilt later.
+    """
+    file_name = os.path.abspath(manager.file_name)
+    with _lock:
+        cached = _indexes.get(file_name)
+        if cached is None or cached[0] != previous_signature:
+            return False
+        if not all([cached[1].update(announcement) for announcement in changed]):
+            del _indexes[file_name]  # an announcement is missing from it, rebuilt on the next use
+            return False
+        cached[1].add_many([dict(announcement) for announcement in added])
+        _indexes[file_name] = (file_signature(manager.file_name), cached[1])
+        return True
+
+
+def sweep_expired(manager, now=None):
+    """
+    This function evicts the expired announcements of the manager's file and archives them, returns how many
+    """
+    get_announcement_index(manager).evict_expired(now)
+    return get_expired_archive(manager).flush()
+
+
+def start_expiry_sweeper(manager, interval=60):
+    """
+    This function archives the manager's expired announcements every interval seconds in the background
+
+    The sweep always works on the current index, also after it was rebuilt.
+    Returns the stop event of the sweeper thread.
+    """
+    return run_every(lambda now: sweep_expired(manager, now), interval)[1]
@@ -0,0 +1,68 @@
+"""
+Announcement domain classes of the taxi app
+
+This module does no input, printing or file work when it is imported or used,
+so servers, workers and benchmarks can import it freely. The interactive
+prompts live in announcments.py. The classes use __slots__, an announcement
+is saved as the dict returned by formatting_announcement().
+"""
+import sys
+from datetime import datetime
+
+from expiry import announcement_deadline
+
+
+class Announcement:
+    __slots__ = ('from_place', 'to_place', 'price', 'expire_time', 'is_active', 'created_at', 'expires_at')
+
+    def __init__(self, from_place, to_place, price, expire_time):
+        if from_place == to_place:
+            raise ValueError("Wrong regions selected")
+        self.from_place = from_place
+        self.to_place = to_place
+        self.price = price
+        self.expire_time = expire_time
+        self.is_active = True
+        self.created_at = str(datetime.now())
+        self.expires_at = announcement_deadline({'expire_time': expire_time, 'created_at': self.created_at})
+
+    def formatting_announcement(self):
+        """This method is used to format the announcement in dict format"""
+        return {name: getattr(self, name) for name in slot_names(type(self))}
+
+    @classmethod
+    def from_record(cls, data):
+        """This method makes an announcement from a stored record, keeping its times"""
+        announcement = cls.__new__(cls)
+        for name in slot_names(cls):
+            value = data.get(name)
+            setattr(announcement, name, sys.intern(value) if name in interned and isinstance(value, str) else value)
+        return announcement
+
+
+class ClientAnnouncement(Announcement):
+    __slots__ = ('seats',)
+
+    def __init__(self, from_place, to_place, price, expire_time, seats="1"):
+        super().__init__(from_place, to_place, price, expire_time)
+        self.seats = seats
+
+
+class TaxiAnnouncement(Announcement):
+    __slots__ = ('car_name', 'comment', 'seats')
+
+    def __init__(self, from_place, to_place, price, car_name, comment, expire_time, seats):
+        super().__init__(from_place, to_place, price, expire_time)
+        self.car_name = car_name
+        self.comment = comment
+        self.seats = seats
+
+
+interned = frozenset({'from_place', 'to_place', 'car_name'})  # few distinct values, shared between announcements
+
+
+def slot_names(cls):
+    """
+    This function returns the attribute names of an announcement class, base class first
+    """
+    return [name for klass in reversed(cls.__mro__) for name in getattr(klass, '__slots__', ())]
@@ -1,78 +1,35 @@
-from datetime import datetime
-from file_manager import taxi_ann_manager
+from file_manager import client_ann_manager, taxi_ann_manager  # also puts the shared modules on sys.path
+from announcement_models import Announcement, ClientAnnouncement, TaxiAnnouncement  # noqa: F401,E402  re-exported
+from matching import get_ride_matcher  # noqa: E402
+from regions import regions  # noqa: E402
 
-# regions = (
-#     "Andijan", "Namangan", "Fergana", "Navoiy", "Buxoro", "Samarkand",
-#     "Khorazm", "Surhandarya", "Qashqadaryo", "Sirdarya", "Tashkent", "Tashkent city",
-#     "Karakalpakstan"
-# )
-
-regions = {
-    "1": "Andijan", "2": "Namangan", "3": "Fergana"
-}
-
-
-class Announcement:
-    def __init__(self, from_place, to_place, price, expire_time):
-        self.from_place = from_place
-        self.to_place = to_place
-        self.price = price
-        self.expire_time = expire_time
-        self.is_active = True
-        self.created_at = str(datetime.now())
-
-
-class ClientAnnouncement(Announcement):
-    print(regions)
-    from_place = input("Where are you: ")
-    while from_place not in regions.keys():
-        from_place = input("Where are you: ")
-    else:
-        from_place = regions[from_place]
 
+def choose_region(question):
+    """
+    This function asks for a region number until a valid one is given
+    """
     print(regions)
-    to_place = input("Where you want to go: ")
-    while to_place not in regions.keys():
-        to_place = input("Where you want to go: ")
-    else:
-        to_place = regions[to_place]
-        if from_place == to_place:
-            print("Wrong regions selected")
+    place = input(question)
+    while place not in regions.keys():
+        place = input(question)
+    return regions[place]
 
-    price = input("How much do is the cost per seat: ")
-    expire_time = input("How many hours it should be valid: ")
-    
-    client = Announcement(from_place=from_place, to_place=to_place, price=price, expire_time=expire_time)
-    
 
-
-class TaxiAnnouncement(Announcement):
-    def __init__(self, from_place, to_place, price, car_name, comment, expire_time, seats):
-        super().__init__(from_place, to_place, price, expire_time)
-        self.car_name = car_name
-        self.comment = comment
-        self.seats = seats
+def choose_route():
+    """
+    This function asks where from and where to until two different regions are given
+    """
+    while True:
+        from_place = choose_region("Where are you: ")
+        to_place = choose_region("Where you want to go: ")
+        if from_place != to_place:
+            return from_place, to_place
+        print("Wrong regions selected")
 
 
 def add_announcement_as_taxi():
     try:
-        print(regions)
-        from_place = input("Where are you: ")
-        while from_place not in regions.keys():
-            from_place = input("Where are you: ")
-        else:
-            from_place = regions[from_place]
-
-        print(regions)
-        to_place = input("Where you want to go: ")
-        while to_place not in regions.keys():
-            to_place = input("Where you want to go: ")
-        else:
-            to_place = regions[to_place]
-            if from_place == to_place:
-                print("Wrong regions selected")
-                add_announcement_as_taxi()
-
+        from_place, to_place = choose_route()
         price = input("How much do is the cost per seat: ")
         expire_time = input("How many hours it should be valid: ")
         car_name = input("What kind of car: ")
@@ -80,11 +37,36 @@ def add_announcement_as_taxi():
         comment = input("Enter comment: ")
 
         taxi = TaxiAnnouncement(from_place, to_place, price, car_name, comment, expire_time, seats)
-        print(taxi.__dict__)
-        taxi_ann_manager.add_data(taxi.__dict__)
+        announcement = taxi.formatting_announcement()
+        print(announcement)
+        matches = get_ride_matcher(taxi_ann_manager, client_ann_manager).post_taxi(announcement)
         print("Announcement added")
+        for match in matches:
+            print(f"Client booked {match['seats']} seat(s), {announcement['seats']} seat(s) left")
         return True
     except Exception as e:
         print(e)
         return False
 
+
+def add_announcement_as_client():
+    try:
+        from_place, to_place = choose_route()
+        price = input("How much do is the cost per seat: ")
+        expire_time = input("How many hours it should be valid: ")
+        seats = input("How many seats do you need: ") or "1"
+
+        client = ClientAnnouncement(from_place, to_place, price, expire_time, seats)
+        announcement = client.formatting_announcement()
+        match = get_ride_matcher(taxi_ann_manager, client_ann_manager).post_client(announcement)
+        print("Announcement added")
+
+        if match is None:
+            print("No taxi yet, you get the first taxi on your route that fits your price")
+        else:
+            taxi = match['taxi']
+            print(f"Taxi for you: {taxi['car_name']}, price per seat: {taxi['price']}, seats booked: {match['seats']}")
+        return True
+    except Exception as e:
+        print(e)
+        return False
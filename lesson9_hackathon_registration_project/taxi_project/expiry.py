@@ -0,0 +1,87 @@
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+def announcement_deadline(announcement):
+    """
+    This function returns the moment (unix time) an announcement expires or None if it never does
+
+    expire_time is stored as a number of hours counted from created_at.
+    """
+    if announcement.get('expires_at') is not None:
+        return float(announcement['expires_at'])
+    try:
+        hours = float(announcement['expire_time'])
+        created_at = datetime.fromisoformat(str(announcement['created_at']))
+    except (KeyError, TypeError, ValueError):
+        return None
+    return (created_at + timedelta(hours=hours)).timestamp()
+
+
+class ExpiryScheduler:
+    """
+    This class is applied to find expired items without scanning all of them
+
+    Deadlines are kept in a min-heap, so the next item to expire is always on
+    top. pop_expired() only touches items whose deadline has passed and costs
+    O(log n) per expired item.
+
+    Attributes:
+        - heap (list): (deadline, key) pairs ordered by deadline
+    """
+
+    def __init__(self) -> None:
+        self.heap = []
+        self.lock = threading.Lock()
+        self.sweeper = None
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, key, deadline):
+        """
+        This method remembers that key expires at deadline (unix time)
+        """
+        with self.lock:
+            heapq.heappush(self.heap, (deadline, key))
+
+    def next_deadline(self):
+        """
+        This method returns the closest deadline or None if nothing is scheduled
+        """
+        return self.heap[0][0] if self.heap else None
+
+    def pop_expired(self, now=None):
+        """
+        This method removes and returns the keys whose deadline has passed
+        """
+        now = time.time() if now is None else now
+        expired = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                expired.append(heapq.heappop(self.heap)[1])
+        return expired
+
+    def start_sweeper(self, callback, interval=60):
+        """
+        This method calls callback(now) every interval seconds in a background thread
+        """
+        self.sweeper = run_every(callback, interval)
+        return self.sweeper[1]
+
+
+def run_every(callback, interval=60):
+    """
+    This function calls callback(now) every interval seconds in a daemon thread and returns (thread, stop event)
+    """
+    stop = threading.Event()
+
+    def sweep():
+        while not stop.wait(interval):
+            callback(time.time())
+
+    thread = threading.Thread(target=sweep, daemon=True)
+    thread.start()
+    return thread, stop
@@ -1,28 +1,26 @@
 import os
-import json
+import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # shared storage module
 
-class JsonManager:
-    def __init__(self, file_name):
-        self.file_name = file_name
+import storage  # noqa: E402
 
-    def _file_exists_and_not_empty(self):
-        return os.path.exists(self.file_name) and os.path.getsize(self.file_name) > 0
 
+class JsonManager(storage.JsonManager):
     def read(self):
-        if self._file_exists_and_not_empty():
-            with open(self.file_name, 'r') as file:
-                return json.load(file)
-        return []
+        return self.read_file()
 
     def write(self, data):
-        with open(self.file_name, 'w') as file:
-            json.dump(data, file, indent=4)
+        self.write_file(data)
 
     def add_data(self, data: dict):
-        all_data = self.read()
-        all_data.append(data)
-        self.write(all_data)
+        self.add_one_data_to_file(data)
         return "Data added successfully"
 
-user_manager = JsonManager("users.json")
\ No newline at end of file
+
+taxi_announcements_file = "announcements.json"  # or "announcements.jsonl" / "announcements.db" after converting the data
+client_announcements_file = "client_announcements.json"  # or "client_announcements.jsonl" / "client_announcements.db"
+
+user_manager = JsonManager("users.json")
+taxi_ann_manager = storage.get_manager(taxi_announcements_file, table="taxi_announcements", manager_class=JsonManager)
+client_ann_manager = storage.get_manager(client_announcements_file, table="client_announcements", manager_class=JsonManager)
@@ -1,7 +1,97 @@
+from file_manager import client_ann_manager, taxi_ann_manager, user_manager  # also puts the shared modules on sys.path
+from announcement_index import get_announcement_index, start_expiry_sweeper  # noqa: E402
+from announcments import add_announcement_as_client, add_announcement_as_taxi, choose_region  # noqa: E402
+from credentials import CredentialError, get_credential_store  # noqa: E402
+from menus import read_choice, run_menus  # noqa: E402
+
+current_user = None  # username of the logged in user
+
+
+def read_optional_number(question):
+    """
+    This function asks for a number, an empty answer means no limit
+    """
+    while True:
+        answer = input(question).strip()
+        if not answer:
+            return None
+        try:
+            return float(answer)
+        except ValueError:
+            print("Please enter a number or leave it empty.")
+
+
+def print_announcements(announcements):
+    """
+    This function prints announcements found by a filter
+    """
+    if not announcements:
+        print("Nothing was found.")
+    for announcement in announcements:
+        print(f"{announcement['from_place']} -> {announcement['to_place']}, price per seat: {announcement['price']}")
+        if 'car_name' in announcement:
+            print(f"Car: {announcement['car_name']}, seats: {announcement['seats']}, comment: {announcement['comment']}")
+        print(f"Created at: {announcement['created_at']}")
+        print("--------------------")
+
+
+def filter_taxis():
+    """
+    This function finds taxis on a route under a price with enough free seats
+    """
+    from_place = choose_region("Where are you: ")
+    to_place = choose_region("Where you want to go: ")
+    max_price = read_optional_number("Maximum price per seat (leave empty for any): ")
+    min_seats = read_optional_number("Minimum free seats (leave empty for any): ")
+    index = get_announcement_index(taxi_ann_manager)
+    print_announcements(index.query(from_place, to_place, max_price=max_price, min_seats=min_seats, limit=20))
+
+
+def filter_clients():
+    """
+    This function finds clients on a route who pay at least a given price
+    """
+    from_place = choose_region("Where are you: ")
+    to_place = choose_region("Where you want to go: ")
+    min_price = read_optional_number("Minimum price per seat (leave empty for any): ")
+    index = get_announcement_index(client_ann_manager)
+    print_announcements(index.query(from_place, to_place, min_price=min_price, order="newest", limit=20))
+
+
+def register_user():
+    """
+    This function registers a user with a hashed password
+    """
+    print("\nUser registration:\n")
+    username = input("Enter a username: ").strip()
+    password = input("Enter a password: ").strip()
+    try:
+        get_credential_store(user_manager).register(username, password)
+        print("You are registered, now you can log in.")
+    except CredentialError as error:
+        print(error)
+    return "main"
+
+
+def login_user():
+    """
+    This function logs a user in and opens the user menu
+    """
+    global current_user
+    username = input("Enter your username: ").strip()
+    password = input("Enter your password: ").strip()
+    if get_credential_store(user_manager).authenticate(username, password):
+        current_user = username
+        return "user"
+    print("Incorrect username or password.")
+    return "main"
+
+
 def display_user_menu():
     """
-    This function is used to handle admin's menu
+    This function is used to handle user's menu
     """
+    global current_user
     text = """
     1. Taxi driver.
     2. Client.
@@ -12,16 +102,25 @@ def display_user_menu():
 
     print(text)
 
-    user_input = int(input("Choose a number from menu: "))
+    user_input = read_choice()
 
     if user_input == 1:
-        pass
+        add_announcement_as_taxi()
     elif user_input == 2:
-        pass
+        add_announcement_as_client()
     elif user_input == 3:
+        filter_taxis()
+    elif user_input == 4:
+        filter_clients()
+    elif user_input == 5:
         pass
+    elif user_input == 6:
+        get_credential_store(user_manager).forget(current_user)
+        current_user = None
+        return "main"
     else:
         print("Choose a proper number!")
+    return "user"
 
 
 def display_main_menu():
@@ -37,21 +136,30 @@ def display_main_menu():
 
     print(text)
 
-    user_input = int(input("Choose a number from menu: "))
+    user_input = read_choice()
 
     if user_input == 1:
-        pass
+        return "register"
     elif user_input == 2:
-        pass
+        return "login"
     elif user_input == 3:
         yes_no_input = input("Would you like to quit? (y/n): ")
         if yes_no_input.lower() == "y":
             print("You quitted the program. See you!")
-        else:
-            return display_main_menu()
+            return None
     else:
         print("Choose a proper number! ")
-        return display_main_menu()
-    
+    return "main"
+
+
+screens = {
+    "main": display_main_menu,
+    "register": register_user,
+    "login": login_user,
+    "user": display_user_menu,
+}
+
 if __name__ == "__main__":
-    display_main_menu()
\ No newline at end of file
+    for manager in (taxi_ann_manager, client_ann_manager):  # expired announcements move to the archive files
+        start_expiry_sweeper(manager)
+    run_menus(screens, "main")
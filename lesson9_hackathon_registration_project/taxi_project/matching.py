@@ -0,0 +1,256 @@
+import bisect
+import itertools
+import os
+import threading
+import time
+
+from announcement_index import AnnouncementIndex, to_number, update_announcement_index
+from expiry import announcement_deadline
+from file_lock import FileLock
+from storage import file_signature
+
+_matchers = {}
+_lock = threading.Lock()
+
+
+class MatchingEngine:
+    """
+    This class is applied to pair client announcements with taxi announcements
+
+    Taxis live in an AnnouncementIndex, so a client is matched to the cheapest
+    taxi on the same route under the client's price with enough free seats.
+    Clients that find nothing wait in a per-route queue ordered by the price
+    they are ready to pay. Only a new taxi triggers work on that queue, so
+    nothing is ever rescanned from scratch.
+
+    Attributes:
+        - taxis (AnnouncementIndex): taxi announcements with free seats
+        - waiting (dict): (from_place, to_place) -> sorted list of (-price, number, client)
+    """
+
+    def __init__(self) -> None:
+        self.taxis = AnnouncementIndex()
+        self.waiting = {}
+        self.numbers = itertools.count()
+        self.lock = threading.RLock()
+
+    def add_taxi(self, taxi):
+        """
+        This method adds a taxi announcement and seats waiting clients in it
+
+        Returns the list of matches made for the waiting clients.
+        """
+        with self.lock:
+            if to_number(taxi.get('seats')) <= 0:
+                return []
+            number = self.taxis.add(taxi)
+            return self._serve_waiting(number, taxi)
+
+    def match(self, client, wait=True):
+        """
+        This method finds a taxi for one client announcement
+
+        Returns a match dict, or None if there is no taxi yet; the client then
+        waits for new taxis when wait is True.
+        """
+        with self.lock:
+            seats = client_seats(client)
+            found = self.taxis.query(
+                client.get('from_place'), client.get('to_place'),
+                max_price=to_number(client.get('price')), min_seats=seats, limit=1, with_numbers=True,
+            )
+            if found:
+                number, taxi = found[0]
+                return self._take_seats(number, taxi, client, seats)
+            if wait and not is_expired(client):
+                route = (client.get('from_place'), client.get('to_place'))
+                entry = (-to_number(client.get('price')), next(self.numbers), client)
+                bisect.insort(self.waiting.setdefault(route, []), entry)
+            return None
+
+    def match_batch(self, clients, wait=True):
+        """
+        This method matches a queue of client announcements in order and returns the matches
+        """
+        with self.lock:
+            matches = []
+            for client in clients:
+                match = self.match(client, wait)
+                if match is not None:
+                    matches.append(match)
+            return matches
+
+    def waiting_count(self):
+        """
+        This method returns how many clients are still waiting for a taxi
+        """
+        return sum(len(queue) for queue in self.waiting.values())
+
+    def _take_seats(self, number, taxi, client, seats):
+        # Runs under self.lock, so two clients can never take the same seat
+        left = to_number(taxi.get('seats')) - seats
+        taxi['seats'] = str(int(left))
+        if left <= 0:
+            self.taxis.remove(number)
+        return {'client': client, 'taxi': taxi, 'seats': seats, 'price_per_seat': to_number(taxi.get('price'))}
+
+    def _serve_waiting(self, number, taxi):
+        route = (taxi.get('from_place'), taxi.get('to_place'))
+        queue = self.waiting.get(route)
+        if not queue:
+            return []
+
+        price = to_number(taxi.get('price'))
+        matches = []
+        served = []
+        now = time.time()
+        for position, (negative_price, _, client) in enumerate(queue):
+            if -negative_price < price or to_number(taxi.get('seats')) <= 0:
+                break  # everyone after this client pays even less, or the taxi is full
+            if is_expired(client, now):
+                served.append(position)
+                continue
+            seats = client_seats(client)
+            if seats <= to_number(taxi.get('seats')):
+                matches.append(self._take_seats(number, taxi, client, seats))
+                served.append(position)
+
+        for position in reversed(served):
+            del queue[position]
+        return matches
+
+
+class RideMatcher:
+    """
+    This class is applied to keep one MatchingEngine per process in step with the taxi and client announcement files
+
+    New taxis go through add_taxi(), so they seat the waiting clients, and new
+    clients are matched or queued with match(). The taken seats and the served
+    clients are written under the locks of both files. The engine is built
+    from the files once and again only when another process changed one of
+    them, the writes of this process keep it in step.
+
+    Attributes:
+        - taxi_manager, client_manager: storage managers of the two announcement files
+        - engine (MatchingEngine): taxis with free seats and waiting clients
+        - taxis, clients (list): all stored announcements, the engine holds the same dicts
+        - signatures (tuple): signatures of both files after the last read or write of this process
+    """
+
+    def __init__(self, taxi_manager, client_manager) -> None:
+        self.taxi_manager = taxi_manager
+        self.client_manager = client_manager
+        self.engine = None
+        self.taxis = []
+        self.clients = []
+        self.signatures = None
+        self.lock = threading.Lock()
+
+    def post_taxi(self, taxi):
+        """
+        This method saves a taxi announcement and returns the matches it made for waiting clients
+        """
+        return self.post(taxis=[taxi])
+
+    def post_client(self, client):
+        """
+        This method saves a client announcement and returns its match, or None while it waits for a taxi
+        """
+        return find_match(self.post(clients=[client]), client)
+
+    def post(self, taxis=(), clients=()):
+        """
+        This method saves new taxi and client announcements in order and returns all matches made
+
+        A served client is stored inactive, so drivers do not see it any more.
+        The matches can include clients that already waited, when another
+        process added a taxi since the last call.
+        """
+        with self.lock, FileLock(self.taxi_manager.file_name), FileLock(self.client_manager.file_name):
+            matches = self._load()
+            for taxi in taxis:
+                self.taxis.append(taxi)
+                matches.extend(self.engine.add_taxi(taxi))
+            for client in clients:
+                self.clients.append(client)
+                match = self.engine.match(client)
+                if match is not None:
+                    matches.append(match)
+            for match in matches:
+                match['client']['is_active'] = False
+            if matches or taxis or clients:
+                self._save(matches, taxis, clients)
+            return matches
+
+    def _load(self):
+        # Runs under both file locks; returns the matches of clients that waited for a taxi of another process
+        signatures = (file_signature(self.taxi_manager.file_name), file_signature(self.client_manager.file_name))
+        if self.engine is not None and signatures == self.signatures:
+            return []
+
+        engine = MatchingEngine()
+        self.taxis = self.taxi_manager.read_file()
+        self.clients = self.client_manager.read_file()
+        now = time.time()
+        for client in self.clients:
+            if client.get('is_active', True) and not is_expired(client, now):
+                engine.match(client)  # there are no taxis yet, so the client waits
+        matches = []
+        for taxi in self.taxis:
+            if taxi.get('is_active', True) and not is_expired(taxi, now):
+                matches.extend(engine.add_taxi(taxi))
+        self.engine = engine
+        self.signatures = signatures
+        return matches
+
+    def _save(self, matches, taxis, clients):
+        engine, self.engine = self.engine, None  # read again from the files if a write fails
+        if matches or taxis:
+            previous_signature = self.signatures[0]
+            self.taxi_manager.write_file(self.taxis)
+            update_announcement_index(self.taxi_manager, previous_signature,
+                                      changed=[match['taxi'] for match in matches], added=taxis)
+        if matches or clients:
+            previous_signature = self.signatures[1]
+            self.client_manager.write_file(self.clients)
+            update_announcement_index(self.client_manager, previous_signature,
+                                      changed=[match['client'] for match in matches], added=clients)
+        self.signatures = (file_signature(self.taxi_manager.file_name), file_signature(self.client_manager.file_name))
+        self.engine = engine
+
+
+def get_ride_matcher(taxi_manager, client_manager):
+    """
+    This function returns the process-wide matcher of the two announcement files
+    """
+    key = (os.path.abspath(taxi_manager.file_name), os.path.abspath(client_manager.file_name))
+    with _lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            matcher = _matchers[key] = RideMatcher(taxi_manager, client_manager)
+        return matcher
+
+
+def find_match(matches, client):
+    """
+    This function returns the match of one client announcement from a list of matches, None if it has none
+    """
+    for match in matches:
+        if match['client'] is client:
+            return match
+    return None
+
+
+def client_seats(client):
+    """
+    This function returns how many seats a client needs, one if it is not given
+    """
+    return max(1, int(to_number(client.get('seats'), 1)))
+
+
+def is_expired(announcement, now=None):
+    """
+    This function checks if an announcement's deadline has passed
+    """
+    deadline = announcement_deadline(announcement)
+    return deadline is not None and deadline <= (time.time() if now is None else now)
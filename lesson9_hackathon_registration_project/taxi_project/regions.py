@@ -0,0 +1,7 @@
+region_names = (
+    "Andijan", "Namangan", "Fergana", "Navoiy", "Buxoro", "Samarkand",
+    "Khorazm", "Surhandarya", "Qashqadaryo", "Sirdarya", "Tashkent", "Tashkent city",
+    "Karakalpakstan"
+)
+
+regions = {str(number): name for number, name in enumerate(region_names, start=1)}
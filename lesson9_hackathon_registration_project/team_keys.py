@@ -0,0 +1,40 @@
+"""
+Keys the teams are indexed and checked by
+
+The registration menu, the API and the batch import look teams up by these
+keys, so a person, a leader contact or a team name is taken only once
+whichever way the team was registered. Importing this module has no side
+effects.
+"""
+from fuzzy_names import NgramKey, compact
+from record_cache import DerivedKey
+from text_folding import normalize_name
+
+
+def team_members(team):
+    """
+    This function returns the normalized names of the leader and the other members of a team
+    """
+    return [normalize_name(name) for name in [team.get('Leader_name', ''), *(team.get('Other_participants') or [])]]
+
+
+def team_contact(team):
+    """
+    This function returns the leader contact of a team in lower case
+    """
+    return [str(team.get('Leader_contact', '')).strip().casefold()]
+
+
+def team_key(team):
+    """
+    This function returns the team name without case, accents, spaces and punctuation
+    """
+    name = compact(team.get('Team_name', ''))
+    return [name] if name else []
+
+
+member_key = DerivedKey('member', team_members)  # normalized member name -> teams
+contact_key = DerivedKey('contact', team_contact)  # lower-case leader contact -> teams
+name_key = DerivedKey('team_key', team_key)  # "codeninjas" for "Code Ninjas" and "CodeNinjas" -> teams
+name_grams = NgramKey('team_grams', 'Team_name')  # trigrams of the compact team name -> teams
+participant_keys = ('Team_name', 'Leader_contact', member_key, contact_key, name_key, name_grams)
@@ -0,0 +1,25 @@
+"""
+Checks that importing the taxi announcement modules has no side effects:
+every module is imported in a fresh interpreter with stdin closed, so a
+module that asks for input at import time fails instead of waiting, and a
+module that prints at import time fails as well.
+
+Usage: python -m pytest tests
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+taxi_project = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "taxi_project")
+
+
+@pytest.mark.parametrize("module", ["announcement_models", "announcments", "main"])
+def test_import_reads_no_input_and_prints_nothing(module):
+    result = subprocess.run(
+        [sys.executable, "-c", f"import {module}"],
+        cwd=taxi_project, stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ""
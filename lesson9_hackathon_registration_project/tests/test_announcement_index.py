@@ -0,0 +1,66 @@
+"""
+Checks of AnnouncementIndex against a full scan of the same announcements:
+route, price and seat filters in price order, with some announcements
+already expired and others expiring between two queries.
+
+Usage: python -m pytest tests
+"""
+import os
+import random
+import sys
+import time
+
+project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project)
+sys.path.insert(0, os.path.join(project, "taxi_project"))
+
+from announcement_index import AnnouncementIndex, to_number  # noqa: E402
+from expiry import announcement_deadline  # noqa: E402
+
+places = ["Andijan", "Bukhara", "Namangan", "Tashkent"]
+
+
+def make_announcements(count, now):
+    announcements = []
+    for number in range(count):
+        from_place, to_place = random.sample(places, 2)
+        announcements.append({
+            "from_place": from_place,
+            "to_place": to_place,
+            "price": str(random.randrange(50_000, 150_000, 10_000)),
+            "is_active": True,
+            "created_at": f"2026-01-01 00:00:{number:06d}",
+            "expires_at": now + random.choice([-3600, -1, 600, 1200, 3600]),
+            "seats": str(random.randint(1, 4)),
+        })
+    return announcements
+
+
+def full_scan(announcements, from_place, to_place, max_price, min_seats, now):
+    found = [
+        announcement for announcement in announcements
+        if announcement["from_place"] == from_place and announcement["to_place"] == to_place
+        and to_number(announcement["price"]) <= max_price and to_number(announcement["seats"]) >= min_seats
+        and announcement_deadline(announcement) > now
+    ]
+    return sorted(found, key=lambda announcement: (to_number(announcement["price"]), announcement["created_at"]))
+
+
+def test_queries_match_a_full_scan_with_expired_rows():
+    random.seed(11)
+    now = time.time()
+    announcements = make_announcements(2_000, now)
+    index = AnnouncementIndex()
+    index.add_many(announcements)
+    queries = [(*random.sample(places, 2), random.randrange(60_000, 160_000, 10_000), random.randint(1, 4))
+               for _ in range(100)]
+
+    for later in (0, 900, 2400):  # the rows that expire in 10 and 20 minutes drop out later
+        index.evict_expired(now + later)
+        for from_place, to_place, max_price, min_seats in queries:
+            expected = full_scan(announcements, from_place, to_place, max_price, min_seats, now + later)
+            got = index.query(from_place, to_place, max_price=max_price, min_seats=min_seats)
+            assert got == expected
+            assert index.query(from_place, to_place, max_price=max_price, min_seats=min_seats, limit=3) == expected[:3]
+
+    assert len(index) == sum(announcement_deadline(announcement) > now + 2400 for announcement in announcements)
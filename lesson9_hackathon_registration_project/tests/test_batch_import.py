@@ -0,0 +1,48 @@
+"""
+Checks of the team import: a row is rejected when its name looks like the
+name of a stored team or of a row imported before in the same file, and the
+import does not load the registration menu (nothing is printed).
+
+Usage: python -m pytest tests
+"""
+import json
+import os
+import subprocess
+import sys
+
+project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project)
+
+import batch_import  # noqa: E402
+import storage  # noqa: E402
+
+
+def team(leader, contact, name, *others):
+    return {"Leader_name": leader, "Leader_contact": contact, "Team_name": name, "Other_participants": list(others)}
+
+
+def test_similar_names_in_one_batch_are_reported(tmp_path):
+    target = str(tmp_path / "participants.json")
+    storage.JsonManager(target).add_many([team("Ali Valiyev", "ali@gmail.com", "Code Ninjas", "Bobur Karimov")])
+    rows = [
+        team("Sardor", "s@gmail.com", "Gamma Wolves", "Jasur", "Umid"),
+        team("Zafar", "z@gmail.com", "Gama Wolves", "Aziz", "Dilshod"),  # like the row above
+        team("Kamol", "k@gmail.com", "Kode Ninjas", "Rustam", "Timur"),  # like the stored team
+        team("Nodir", "n@gmail.com", "Orion", "Farrux", "Akmal"),
+    ]
+    input_file = tmp_path / "teams.jsonl"
+    input_file.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+    report = batch_import.import_rows("teams", str(input_file), target=target)
+
+    assert [line for line, _ in report["errors"]] == [2, 3]
+    assert "'Gamma Wolves'" in report["errors"][0][1]
+    assert [data["Team_name"] for data in storage.JsonManager(target).read_file()] == ["Code Ninjas", "Gamma Wolves", "Orion"]
+
+
+def test_import_has_no_side_effects():
+    code = "import batch_import, sys; assert 'Hackhaton' not in sys.modules"
+    result = subprocess.run([sys.executable, "-c", code], cwd=project, stdin=subprocess.DEVNULL,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ""
@@ -0,0 +1,52 @@
+"""
+Checks of the credential store: the first admin can log in with or without
+hashlib.scrypt, a scrypt hash on a Python without scrypt fails loudly, and an
+old plaintext password is upgraded to a hash in place with one record left.
+
+Usage: python -m pytest tests
+"""
+import hashlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import credentials  # noqa: E402
+import storage  # noqa: E402
+
+
+@pytest.mark.parametrize("with_scrypt", [True, False])
+def test_first_admin_can_log_in(tmp_path, monkeypatch, with_scrypt):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(credentials, "_stores", {})
+    if not with_scrypt:
+        monkeypatch.delattr(hashlib, "scrypt", raising=False)
+
+    assert credentials.get_admin_store().authenticate(credentials.admin_login, "1111")
+    stored = storage.JsonManager(credentials.admins_file).read_file()[0]["password"]
+    assert stored.startswith("scrypt$" if with_scrypt else "pbkdf2_sha256$")
+
+
+def test_scrypt_hash_without_scrypt_fails_loudly(monkeypatch):
+    monkeypatch.delattr(hashlib, "scrypt", raising=False)
+    with pytest.raises(credentials.CredentialError):
+        credentials.verify_password("1111", credentials.admin_password_hash)
+
+
+def test_plaintext_password_is_upgraded_in_place(tmp_path):
+    manager = storage.JsonManager(str(tmp_path / "clients.json"))
+    manager.add_many([
+        {"username": "ann", "password": "old"},
+        {"username": "bob", "password": "secret"},
+        {"username": "ann", "password": "old"},  # a duplicate of an old registration
+    ])
+    store = credentials.CredentialStore(manager, cost=2 ** 4)
+
+    assert store.authenticate("ann", "old")
+    rows = manager.read_file()
+    assert [row["username"] for row in rows] == ["ann", "bob"]
+    assert credentials.is_password_hash(rows[0]["password"])
+    assert store.find_user("ann")["password"] == rows[0]["password"]
+    assert store.upgrade("ann", "old") == rows[0]["password"]  # already a hash, nothing is written again
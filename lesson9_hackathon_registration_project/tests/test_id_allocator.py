@@ -0,0 +1,106 @@
+"""
+Checks of IdAllocator: ids stay unique after a restart (a new allocator over
+the same counter file), the counter is seeded from initial() only when it
+does not exist yet, and scooter ids start after the largest scooter id
+already in the scooters file, valid or not, reserve() moves the counter
+past imported ids, and processes with several threads each never get the
+same id from one counter file.
+
+Usage: python -m pytest tests
+"""
+import multiprocessing
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from id_allocator import IdAllocator  # noqa: E402
+
+
+def test_ids_are_unique_after_restart(tmp_path):
+    counter_file = str(tmp_path / "ids.counter")
+    before = IdAllocator(counter_file, block_size=10)
+    given = [before.next_id() for _ in range(3)] + list(before.allocate(5))
+
+    after = IdAllocator(counter_file, block_size=10)  # the same file read by a restarted process
+    restarted = [after.next_id() for _ in range(25)] + list(after.allocate(4))
+    given += restarted + [before.next_id()]  # the old process still owns the rest of its block
+
+    assert len(given) == len(set(given))
+    assert given[:3] == [1, 2, 3]
+    assert min(restarted) > max(given[:8])
+
+
+def test_initial_seeds_only_a_missing_counter(tmp_path):
+    counter_file = str(tmp_path / "ids.counter")
+    calls = []
+
+    def initial():
+        calls.append(1)
+        return 500
+
+    assert IdAllocator(counter_file, initial=initial).next_id() == 500
+    assert IdAllocator(counter_file, initial=initial).next_id() == 600  # after the first leased block
+    assert len(calls) == 1
+
+
+def test_scooter_ids_start_after_existing_scooters(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    import scooter
+
+    storage.JsonManager("scooter_owners.json").add_many([
+        {"username": "owner", "password": "hash"},
+        {"id": 7, "battery": 80, "location": "Tashkent", "model_name": "m12", "price_per_minute": 1000},
+        {"id": 42, "battery": 80, "location": "Tashkent"},  # fails validation, its id is still taken
+        {"id": "legacy", "battery": 80, "location": "Tashkent"},
+    ])
+
+    ids = IdAllocator("scooter_ids.counter", initial=scooter.first_scooter_id)
+    assert ids.next_id() == 43
+    assert list(ids.allocate(3)) == [143, 144, 145]
+
+
+def test_reserve_skips_imported_ids(tmp_path):
+    counter_file = str(tmp_path / "ids.counter")
+    running = IdAllocator(counter_file, block_size=10)
+    assert running.next_id() == 1
+
+    IdAllocator(counter_file).reserve(250)  # an import wrote records with ids up to 250
+    running.reserve(5)
+    given = [running.next_id() for _ in range(12)]
+    assert given[:5] == [6, 7, 8, 9, 10]  # the rest of the block leased before the import
+    assert min(given[5:]) > 250
+    running.reserve(100)  # below the counter, nothing changes
+    assert IdAllocator(counter_file).next_id() > max(given)
+
+
+def allocate_in_threads(counter_file, queue, threads=4, count=300):
+    allocator = IdAllocator(counter_file, block_size=2)  # small blocks, so the lease runs often
+    ids = []
+
+    def allocate():
+        for number in range(count):
+            ids.extend(allocator.allocate(2) if number % 10 == 0 else [allocator.next_id()])
+
+    workers = [threading.Thread(target=allocate) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    queue.put(ids)
+
+
+def test_processes_and_threads_get_unique_ids(tmp_path):
+    counter_file = str(tmp_path / "ids.counter")
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=allocate_in_threads, args=(counter_file, queue)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    given = [new_id for _ in processes for new_id in queue.get(timeout=60)]
+    for process in processes:
+        process.join()
+
+    assert len(given) == 4 * 4 * 330
+    assert len(given) == len(set(given))
@@ -0,0 +1,49 @@
+"""
+Checks of JsonLinesManager tombstones: a removed record stays removed, a
+record added again after its removal is live again, in read_file() and in
+the streamed iter_records() alike.
+
+Usage: python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jsonl_manager import JsonLinesManager  # noqa: E402
+
+
+def make_manager(tmp_path):
+    return JsonLinesManager(str(tmp_path / "participants.jsonl"), compact_every=1000)
+
+
+def test_removed_record_is_hidden(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.add_many([{'Team_name': 'X', 'n': 1}, {'Team_name': 'Y', 'n': 1}])
+    assert manager.remove_data('Team_name', 'X')
+
+    assert manager.read_file() == [{'Team_name': 'Y', 'n': 1}]
+    assert list(manager.iter_records()) == [{'Team_name': 'Y', 'n': 1}]
+
+
+def test_record_added_again_after_removal_is_live(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.add_onedata_to_file({'Team_name': 'X', 'n': 1})
+    manager.remove_data('Team_name', 'X')
+    manager.add_onedata_to_file({'Team_name': 'X', 'n': 2})
+
+    assert manager.read_file() == [{'Team_name': 'X', 'n': 2}]
+    assert list(manager.iter_records()) == [{'Team_name': 'X', 'n': 2}]
+
+
+def test_iter_records_matches_read_file_across_chunks(tmp_path, monkeypatch):
+    manager = make_manager(tmp_path)
+    for round_number in range(3):
+        manager.add_many({'Team_name': f"T{number}", 'n': round_number} for number in range(20))
+        for number in range(0, 20, 3):
+            manager.add_tombstone('Team_name', f"T{number}")
+
+    read_tombstones = manager._read_tombstones
+    monkeypatch.setattr(manager, "_read_tombstones", lambda: read_tombstones(chunk_size=64))  # lines cross chunk borders
+    assert list(manager.iter_records()) == manager.read_file()
+    assert list(manager.iter_records(offset=5, limit=10)) == manager.read_file()[5:15]
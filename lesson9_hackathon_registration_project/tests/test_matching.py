@@ -0,0 +1,80 @@
+"""
+Checks of RideMatcher: clients without a taxi wait and are seated by the
+next taxi of their route, a taxi posted by another process (a second matcher
+over the same files) seats them as well, and seats are never given out twice
+when threads post clients at the same time.
+
+Usage: python -m pytest tests
+"""
+import os
+import sys
+import threading
+
+project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project)
+sys.path.insert(0, os.path.join(project, "taxi_project"))
+
+import storage  # noqa: E402
+from announcement_models import ClientAnnouncement, TaxiAnnouncement  # noqa: E402
+from matching import RideMatcher  # noqa: E402
+
+
+def make_matcher(tmp_path):
+    taxis = storage.JsonManager(str(tmp_path / "announcements.json"))
+    clients = storage.JsonManager(str(tmp_path / "client_announcements.json"))
+    return RideMatcher(taxis, clients)
+
+
+def taxi(price, seats):
+    return TaxiAnnouncement("Andijan", "Bukhara", str(price), "Cobalt", "", "5", str(seats)).formatting_announcement()
+
+
+def client(price, seats=1):
+    return ClientAnnouncement("Andijan", "Bukhara", str(price), "5", str(seats)).formatting_announcement()
+
+
+def test_waiting_clients_get_the_next_taxi(tmp_path):
+    matcher = make_matcher(tmp_path)
+    assert matcher.post_client(client(50_000)) is None
+    assert matcher.post_client(client(90_000, seats=2)) is None
+    assert matcher.engine.waiting_count() == 2
+
+    matches = matcher.post_taxi(taxi(60_000, 2))  # only the client paying 90 000 can take it
+    assert [match['client']['price'] for match in matches] == ["90000"]
+    assert matcher.engine.waiting_count() == 1
+
+    stored_taxi, = matcher.taxi_manager.read_file()
+    stored_clients = matcher.client_manager.read_file()
+    assert stored_taxi['seats'] == "0"
+    assert [row['is_active'] for row in stored_clients] == [True, False]
+
+
+def test_taxi_of_another_process_serves_the_queue(tmp_path):
+    matcher = make_matcher(tmp_path)
+    other = make_matcher(tmp_path)  # the same files seen by another process
+    matcher.post_client(client(70_000))
+
+    assert len(other.post_taxi(taxi(60_000, 3))) == 1
+    assert matcher.post_client(client(70_000))['taxi']['seats'] == "1"  # reloaded, the first client was served
+    assert [row['is_active'] for row in matcher.client_manager.read_file()] == [False, False]
+
+
+def test_seats_are_not_booked_twice(tmp_path):
+    matcher = make_matcher(tmp_path)
+    matcher.post_taxi(taxi(10_000, 5))
+    results = []
+
+    def post_clients(matcher):
+        for _ in range(5):
+            results.append(matcher.post_client(client(20_000)))
+
+    threads = [threading.Thread(target=post_clients, args=(matcher if number % 2 else make_matcher(tmp_path),))
+               for number in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(match is not None for match in results) == 5
+    assert matcher.taxi_manager.read_file()[0]['seats'] == "0"
+    assert sum(row['is_active'] for row in matcher.client_manager.read_file()) == 15
@@ -0,0 +1,49 @@
+"""
+Checks of RecordCache.add(): the record goes through the batching writer and
+is indexed in place while the cache is up to date, and a record another
+process wrote in between (straight into the file or into the spool) is
+never lost from the cache.
+
+Usage: python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from file_lock import FileLock  # noqa: E402
+from record_cache import RecordCache  # noqa: E402
+
+
+def make_cache(tmp_path):
+    manager = storage.JsonManager(str(tmp_path / "participants.json"))
+    manager.add_many([{'Team_name': 'A'}])
+    cache = RecordCache(manager, ('Team_name',))
+    cache.refresh()
+    return cache
+
+
+def test_add_is_indexed_in_place(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.add({'Team_name': 'B'})
+
+    assert not os.path.exists(cache.manager.file_name + ".spool")  # committed through the batching writer
+    assert not cache.refresh()  # no reload needed
+    assert [row['Team_name'] for row in cache.all()] == ['A', 'B']
+
+
+def test_add_keeps_records_of_other_processes(tmp_path):
+    cache = make_cache(tmp_path)
+    other = storage.JsonManager(cache.manager.file_name)  # another process writing the same file
+    other.add_many([{'Team_name': 'C'}])
+    cache.add({'Team_name': 'B'})
+    assert cache.exists('Team_name', 'C')
+
+    with FileLock(other.file_name, shared=True):  # spooled by another process, not drained yet
+        with open(other.file_name + ".spool", "a", encoding="utf-8") as spool:
+            spool.write(storage.dumps({"token": "other", "data": {'Team_name': 'D'}}) + "\n")
+    cache.add({'Team_name': 'E'})  # drains D together with E
+
+    assert [row['Team_name'] for row in cache.all()] == ['A', 'C', 'B', 'D', 'E']
+    assert [row['Team_name'] for row in other.read_file()] == ['A', 'C', 'B', 'D', 'E']
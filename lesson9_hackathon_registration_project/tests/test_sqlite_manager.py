@@ -0,0 +1,54 @@
+"""
+Checks of SqliteManager: record keys without a column (scooter coordinates,
+announcement deadlines) survive a round trip, client announcements have a
+table of their own, and one manager can be used from many threads.
+
+Usage: python -m pytest tests
+"""
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlite_manager import SqliteManager  # noqa: E402
+
+
+def test_fields_without_a_column_are_kept(tmp_path):
+    scooters = SqliteManager(str(tmp_path / "scooters.db"), table="scooters")
+    scooter = {'id': 1, 'battery': "90", 'location': "Tashkent", 'model_name': "m1", 'price_per_minute': "500",
+               'latitude': 41.3, 'longitude': 69.2}
+    scooters.add_many([scooter])
+    assert scooters.read_file() == [scooter]
+
+    clients = SqliteManager(str(tmp_path / "client_announcements.db"), table="client_announcements")
+    announcement = {'from_place': "Andijan", 'to_place': "Bukhara", 'price': "50000", 'expire_time': "5",
+                    'is_active': False, 'created_at': "2026-01-01 00:00:00", 'expires_at': 1767243600.5, 'seats': "2"}
+    clients.add_onedata_to_file(announcement)
+    assert clients.read_file() == [announcement]
+
+
+def test_older_database_gets_the_extra_column(tmp_path):
+    file_name = str(tmp_path / "scooters.db")
+    with sqlite3.connect(file_name) as connection:
+        connection.execute("CREATE TABLE scooters (row_id INTEGER PRIMARY KEY, id INTEGER NOT NULL, battery TEXT, "
+                           "location TEXT, model_name TEXT, price_per_minute TEXT)")
+        connection.execute("INSERT INTO scooters (id, battery) VALUES (1, '50')")
+    connection.close()
+
+    scooters = SqliteManager(file_name, table="scooters")
+    scooters.add_many([{'id': 2, 'battery': "60", 'latitude': 41.0}])
+    assert scooters.read_file() == [{'id': 1, 'battery': "50"}, {'id': 2, 'battery': "60", 'latitude': 41.0}]
+
+
+def test_manager_is_shared_by_threads(tmp_path):
+    scooters = SqliteManager(str(tmp_path / "scooters.db"), table="scooters")
+
+    def add(number):
+        scooters.add_onedata_to_file({'id': number, 'battery': "80"})
+        return len(scooters.find('id', number))
+
+    with ThreadPoolExecutor(8) as pool:
+        assert list(pool.map(add, range(50))) == [1] * 50
+    assert sorted(scooter['id'] for scooter in scooters.read_file()) == list(range(50))
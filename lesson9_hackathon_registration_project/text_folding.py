@@ -0,0 +1,41 @@
+"""
+Folding of names and titles for lookups
+
+Text is compared after folding: lower case, accents and apostrophes removed
+and runs of spaces collapsed, so "Jane  DOE", "jane doe" and "Jané Doe" are
+the same person and "O‘tkan kunlar" matches "otkan kunlar".
+"""
+import re
+import unicodedata
+
+word_pattern = re.compile(r"\w+")
+# letters that do not decompose into a base letter and an accent, and apostrophes (O‘zbek -> ozbek)
+extra_folds = str.maketrans({
+    "ø": "o", "ł": "l", "đ": "d", "ı": "i", "æ": "ae", "œ": "oe", "þ": "th",
+    "'": None, "‘": None, "’": None, "ʻ": None, "ʼ": None, "`": None,
+})
+
+
+def fold(text):
+    """
+    This function folds text for searching: lower case, without accents and apostrophes
+    """
+    text = str(text)
+    if text.isascii():
+        return text.translate(extra_folds).lower()
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).translate(extra_folds)
+
+
+def words(text):
+    """
+    This function returns the folded words of a text
+    """
+    return word_pattern.findall(fold(text))
+
+
+def normalize_name(name):
+    """
+    This function returns the folded words of a name joined by single spaces, "" if it has none
+    """
+    return " ".join(words(name))
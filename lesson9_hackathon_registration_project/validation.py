@@ -0,0 +1,266 @@
+"""
+Validation rules shared by the interactive menus and the batch import
+
+Rules are described once as Schema objects. Regexes are compiled and the
+fields' checks are prepared when a schema is created, so validating a record
+is a key-set test plus one call per field. Validated records of a file are
+cached by the file's (mtime, size), so records on disk are checked again only
+after the file changes.
+"""
+import os
+import re
+import threading
+
+from storage import file_signature
+
+allowed_email_domains = frozenset({'gmail.com', 'mail.ru', 'yahoo.com'})
+email_pattern = re.compile(
+    r"[^@\s]+@(?:%s)" % "|".join(re.escape(domain) for domain in sorted(allowed_email_domains)), re.IGNORECASE
+)
+min_team_size = 3  # including the leader
+max_team_size = 5
+
+_validated = {}
+_lock = threading.Lock()
+
+
+def is_valid_email(email):
+    """
+    This function checks that an email has one of the allowed domains
+    """
+    return email_pattern.fullmatch(email) is not None
+
+
+def is_valid_team_size(size):
+    """
+    This function checks that a team has between min_team_size and max_team_size people
+    """
+    return min_team_size <= size <= max_team_size
+
+
+def read_number(value, name, low=None, high=None):
+    """
+    This function converts a number given as text and checks its range, ValueError if it is wrong
+    """
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number, got {value!r}") from None
+    if number != number:
+        raise ValueError(f"{name} must be a number, got {value!r}")
+    if low is not None and number < low:
+        raise ValueError(f"{name} must be at least {low}, got {value!r}")
+    if high is not None and number > high:
+        raise ValueError(f"{name} must be at most {high}, got {value!r}")
+    return number
+
+
+class Field:
+    """
+    This class is applied to describe and convert one key of a record
+
+    Attributes:
+        - name (str): key of the record
+        - kind: str, int, float, "number" (int when whole, else float) or list
+        - required (bool): a missing or empty value is an error, else the key is dropped
+        - pattern (str): regex a text value must fully match, compiled once
+        - low, high: allowed range of a number or of a list's length
+        - choices (dict): accepted values and the value that is stored for each
+        - clean: function applied to a text value first, e.g. str.strip
+    """
+
+    def __init__(self, name, kind=str, required=True, pattern=None, low=None, high=None, choices=None, clean=None) -> None:
+        self.name = name
+        self.kind = kind
+        self.required = required
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.low = low
+        self.high = high
+        self.choices = choices
+        self.clean = clean
+        self.convert = self.compile()
+
+    def compile(self):
+        """
+        This method builds the function that converts one value of this field
+
+        Every option is looked at here once, so the returned function only
+        does the checks this field really needs.
+        """
+        name, kind, pattern, choices, clean = self.name, self.kind, self.pattern, self.choices, self.clean
+        low = float("-inf") if self.low is None else self.low
+        high = float("inf") if self.high is None else self.high
+
+        if kind is list:
+            def convert(value):
+                if not isinstance(value, list):
+                    raise ValueError(f"{name} must be a list")
+                if not low <= len(value) <= high:
+                    raise ValueError(f"{name} must have {self.low} to {self.high} items, got {len(value)}")
+                return value
+            return convert
+
+        def text(value):
+            if value.__class__ is not str:
+                value = str(value)
+            if clean is not None:
+                value = clean(value)
+                if not value:
+                    raise ValueError(f"{name} is required")
+            if pattern is not None and pattern.fullmatch(value) is None:
+                raise ValueError(f"{name} has a wrong format: {value!r}")
+            return value
+
+        if choices is not None:
+            def convert(value):
+                value = text(value)
+                if value not in choices:
+                    if len(choices) > 10:
+                        raise ValueError(f"{name} is not one of the allowed values, got {value!r}")
+                    raise ValueError(f"{name} must be one of {', '.join(choices)}, got {value!r}")
+                return choices[value]
+            return convert
+        if kind is str:
+            return text
+
+        def convert(value):
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number, got {value!r}") from None
+            if not low <= number <= high:  # also false for NaN
+                return read_number(value, name, self.low, self.high)  # raises with the right message
+            if kind is float:
+                return number
+            if number.is_integer():
+                return int(number)
+            if kind is int:
+                raise ValueError(f"{name} must be a whole number, got {value!r}")
+            return number
+        return convert
+
+
+class Schema:
+    """
+    This class is applied to validate records and convert their values to the right types
+
+    Attributes:
+        - name (str): name of the record type, used as a part of the cache key
+        - fields (tuple): Field objects
+        - checks (tuple): functions that get the converted record and raise ValueError
+    """
+
+    def __init__(self, name, fields, checks=()) -> None:
+        self.name = name
+        self.fields = tuple(fields)
+        self.checks = tuple(checks)
+        self.required = frozenset(field.name for field in self.fields if field.required)
+        self.required_converters = tuple((field.name, field.convert) for field in self.fields if field.required)
+        self.optional_converters = tuple((field.name, field.convert) for field in self.fields if not field.required)
+
+    def validate(self, record):
+        """
+        This method returns a converted copy of the record or raises ValueError
+        """
+        if record.__class__ is not dict:
+            raise ValueError("a record must be an object")
+        if not self.required.issubset(record):
+            raise ValueError(f"missing {', '.join(sorted(self.required.difference(record)))}")
+
+        result = record.copy()
+        for name, convert in self.required_converters:
+            value = record[name]
+            if value is None or value == '':
+                raise ValueError(f"{name} is required")
+            result[name] = convert(value)
+        for name, convert in self.optional_converters:
+            if name in record:
+                value = record[name]
+                if value is None or value == '':
+                    del result[name]
+                else:
+                    result[name] = convert(value)
+        for check in self.checks:
+            check(result)
+        return result
+
+    def is_valid(self, record):
+        """
+        This method checks a record without raising
+        """
+        try:
+            self.validate(record)
+        except ValueError:
+            return False
+        return True
+
+    def iter_valid(self, records):
+        """
+        This method yields the converted valid records and skips the others
+        """
+        validate = self.validate
+        for record in records:
+            try:
+                yield validate(record)
+            except ValueError:
+                continue
+
+    def validate_many(self, records):
+        """
+        This method checks a batch in one pass and returns (valid records, [(position, error)])
+        """
+        validate = self.validate
+        valid = []
+        errors = []
+        for position, record in enumerate(records):
+            try:
+                valid.append(validate(record))
+            except ValueError as error:
+                errors.append((position, str(error)))
+        return valid, errors
+
+
+def check_email(record):
+    if not is_valid_email(record['Leader_contact']):
+        raise ValueError(f"invalid email {record['Leader_contact']!r}, allowed domains: {', '.join(sorted(allowed_email_domains))}")
+
+
+def title(text):
+    return text.title().strip()
+
+
+team_schema = Schema("team", (
+    Field('Leader_name', clean=title),
+    Field('Leader_contact', clean=str.strip),
+    Field('Team_name', clean=title),
+    Field('Other_participants', kind=list, low=min_team_size - 1, high=max_team_size - 1),
+), checks=(check_email,))
+
+scooter_schema = Schema("scooter", (
+    Field('id', kind=int, low=1),
+    Field('battery', kind="number", low=0, high=100),
+    Field('location', clean=str.strip),
+    Field('model_name', clean=str.strip),
+    Field('price_per_minute', kind="number", low=0),
+    Field('latitude', kind=float, required=False, low=-90, high=90),
+    Field('longitude', kind=float, required=False, low=-180, high=180),
+))
+
+
+def validated_records(manager, schema):
+    """
+    This function returns the valid, converted records of the manager's file
+
+    The result is cached until the file changes, so reading the same file
+    again does not validate its records again.
+    """
+    key = (os.path.abspath(manager.file_name), schema.name)
+    with _lock:  # one thread validates, the others wait for its result
+        signature = file_signature(manager.file_name)  # taken before reading, a later write only causes a reload
+        cached = _validated.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        valid = list(schema.iter_valid(manager.read_file()))
+        _validated[key] = (signature, valid)
+        return valid